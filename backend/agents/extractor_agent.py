@@ -1,29 +1,48 @@
-import base64
+import asyncio
+import copy
+import functools
+import inspect
 import json
 import mimetypes
 import os
+import sqlite3
 import ssl
+import threading
+import time
 import urllib.error
-import urllib.request
 import warnings
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Tuple
-
-try:
-    warnings.filterwarnings(
-        "ignore",
-        message="Core Pydantic V1 functionality isn't compatible with Python 3.14 or greater.",
-        module="opik\\.rest_api\\.core\\.pydantic_utilities",
-    )
-    from opik import track as opik_track
-except Exception:
-    opik_track = None
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 
 from agents.extraction_validator import validate_extraction
 from constants.app_defaults import (
+    DEFAULT_EXTRACT_CACHE_MAX_BYTES,
+    DEFAULT_EXTRACT_CACHE_MEMORY_ENTRIES,
+    DEFAULT_EXTRACT_CACHE_TTL_SECONDS,
     DEFAULT_EXTRACT_PROMPT_PREFIX,
     DEFAULT_EXTRACT_PROMPT_SUFFIX,
+    DEFAULT_LLM_RESPONSE_CACHE_BACKEND,
+    DEFAULT_LLM_RESPONSE_CACHE_MAX_BYTES,
+    DEFAULT_LLM_RESPONSE_CACHE_MEMORY_ENTRIES,
+    DEFAULT_LLM_RESPONSE_CACHE_TTL_SECONDS,
     DEFAULT_SCHEMA_FIELDS,
+    DEFAULT_TRACE_EXPORT_MODE,
+    LLM_RESPONSE_CACHE_BACKENDS,
+)
+from utils.cache_store import DirectoryCache, MemoryLRUCache, SQLiteCache, TieredCache, default_cache_dir
+from utils.hashing import canonical_hash, sha256_file
+from utils.metrics import count, observe_llm_request, stage_timer, timed_stage
+from utils.model_routing import ModelRouter, get_model_router
+from utils.rate_limit import RateLimiter, estimate_tokens, get_rate_limiter
+from utils.request_body import InlineData, build_json_body, inline_data_fingerprint
+from utils.resilience import ResilientCaller, get_resilient_caller, retry_budget
+from utils.trace_export import get_trace_exporter
+from utils.http_transport import (
+    HttpTransport,
+    get_async_http_transport,
+    get_http_transport,
+    get_ssl_context,
 )
 
 
@@ -36,17 +55,63 @@ class ExtractorConfig:
     base_url: str
 
 
-# Return Opik track decorator or a no-op decorator
+_OPIK_TRACK: Callable[..., Any] | None = None
+_OPIK_TRACK_LOADED = False
+_OPIK_TRACK_LOCK = threading.Lock()
+
+
+# Import opik on first use; returns opik.track or None when opik is unavailable
+def get_opik_track() -> Callable[..., Any] | None:
+    global _OPIK_TRACK, _OPIK_TRACK_LOADED
+    with _OPIK_TRACK_LOCK:
+        if not _OPIK_TRACK_LOADED:
+            _OPIK_TRACK_LOADED = True
+            try:
+                warnings.filterwarnings(
+                    "ignore",
+                    message="Core Pydantic V1 functionality isn't compatible with Python 3.14 or greater.",
+                    module="opik\\.rest_api\\.core\\.pydantic_utilities",
+                )
+                from opik import track as opik_track
+            except Exception:
+                opik_track = None
+            _OPIK_TRACK = opik_track
+        return _OPIK_TRACK
+
+
+def opik_disabled() -> bool:
+    return os.getenv("OPIK_TRACK_DISABLE", "").lower() in {"1", "true", "yes"}
+
+
+# Return Opik track decorator or a no-op decorator.
+# opik is imported on the first decorated call, not at import time, to keep cold start cheap.
 def get_track_decorator():
-    if os.getenv("OPIK_TRACK_DISABLE", "").lower() in {"1", "true", "yes"}:
+    if opik_disabled():
         def decorator(func):
             return func
         return decorator
-    if opik_track is None:
-        def decorator(func):
-            return func
-        return decorator
-    return opik_track()
+
+    def decorator(func):
+        tracked = None
+
+        def resolve():
+            nonlocal tracked
+            if tracked is None:
+                track = get_opik_track()
+                tracked = track()(func) if track is not None else func
+            return tracked
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await resolve()(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+        return wrapper
+    return decorator
 
 
 class Tracer:
@@ -64,6 +129,15 @@ class OpikTracer(Tracer):
         return None
 
 
+class QueuedTracer(Tracer):
+    # Hand the step to the background exporter; sampling and truncation happen there, never blocking
+    def log_step(self, name: str, payload: Dict[str, Any]) -> None:
+        if get_opik_track() is None:
+            return None
+        get_trace_exporter().record(name, payload)
+        return None
+
+
 class NoopTracer(Tracer):
     # Log a step without side effects
     def log_step(self, name: str, payload: Dict[str, Any]) -> None:
@@ -71,54 +145,168 @@ class NoopTracer(Tracer):
         return None
 
 
-# Choose Opik or no-op tracer
+# Choose Opik or no-op tracer; both Opik tracers degrade to a no-op if opik cannot be imported.
+# TRACE_EXPORT_MODE=sync logs each step as a tracked span on the request thread.
 def get_tracer() -> Tracer:
-    if opik_track is None:
+    if opik_disabled():
         return NoopTracer()
-    return OpikTracer()
+    if (os.getenv("TRACE_EXPORT_MODE") or DEFAULT_TRACE_EXPORT_MODE).strip().lower() == "sync":
+        return OpikTracer()
+    return QueuedTracer()
 
 
 def build_ssl_context() -> ssl.SSLContext | None:
-    cafile = os.getenv("SSL_CERT_FILE") or os.getenv("REQUESTS_CA_BUNDLE")
-    try:
-        import certifi
-
-        cafile = certifi.where()
-    except Exception:
-        pass
-    if cafile:
-        return ssl.create_default_context(cafile=cafile)
-    return None
+    return get_ssl_context()
 
 
 class GeminiClient:
-    def __init__(self, config: ExtractorConfig) -> None:
+    def __init__(
+        self,
+        config: ExtractorConfig,
+        transport: HttpTransport | None = None,
+        router: ModelRouter | None = None,
+        resilience: ResilientCaller | None = None,
+        limiter: RateLimiter | None = None,
+        response_cache: TieredCache | None = None,
+        agent: str = "",
+    ) -> None:
         self.config = config
+        self.transport = transport or get_http_transport()
+        self.router = router or get_model_router()
+        self.resilience = resilience or get_resilient_caller()
+        self.limiter = limiter or get_rate_limiter()
+        self.response_cache = response_cache
+        self.agent = agent
+
+    # View of this client for one agent, with the response cache when LLM_RESPONSE_CACHE_AGENTS lists it
+    def for_agent(self, agent: str) -> "GeminiClient":
+        if not response_cache_enabled(agent):
+            return self
+        view = copy.copy(self)
+        view.response_cache = get_response_cache()
+        view.agent = agent
+        return view
+
+    # Send the request to Gemini; temperature-0 payloads are served from the response cache when enabled.
+    # refresh=True skips the lookup, for retries after a response failed validation
+    def generate_content(self, payload: Dict[str, Any], refresh: bool = False) -> str:
+        cache_key = self._response_cache_key(payload)
+        if cache_key is not None and not refresh:
+            cached = self.response_cache.get(cache_key)
+            self._count_response_cache(cached is not None)
+            if cached is not None:
+                return cached["text"]
+        return self._generate_content(payload)
+
+    async def generate_content_async(self, payload: Dict[str, Any], refresh: bool = False) -> str:
+        cache_key = self._response_cache_key(payload)
+        if cache_key is not None and not refresh:
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            self._count_response_cache(cached is not None)
+            if cached is not None:
+                return cached["text"]
+        return await self._generate_content_async(payload)
+
+    # Cache a response once the caller has parsed and validated it; unvalidated responses are never stored
+    def remember_response(self, payload: Dict[str, Any], response: str) -> None:
+        cache_key = self._response_cache_key(payload)
+        if cache_key is not None:
+            self.response_cache.set(cache_key, {"text": response})
+
+    async def remember_response_async(self, payload: Dict[str, Any], response: str) -> None:
+        if self._response_cache_key(payload) is not None:
+            await asyncio.to_thread(self.remember_response, payload, response)
+
+    # Only deterministic requests are reusable: temperature 0 and no candidate sampling
+    def _response_cache_key(self, payload: Dict[str, Any]) -> str | None:
+        if self.response_cache is None:
+            return None
+        generation = payload.get("generationConfig") or {}
+        if generation.get("temperature") != 0 or (generation.get("candidateCount") or 1) != 1:
+            return None
+        return canonical_hash(
+            {"model": self.config.model, "api_version": self.config.api_version, "payload": payload},
+            default=inline_data_fingerprint,
+        )
+
+    def _count_response_cache(self, hit: bool) -> None:
+        count(
+            "vesting_buddy_llm_response_cache_total",
+            "Gemini response cache lookups by agent and outcome",
+            agent=self.agent or "default",
+            outcome="hit" if hit else "miss",
+        )
 
-    # Send the request to Gemini
-    def generate_content(self, payload: Dict[str, Any]) -> str:
-        context = build_ssl_context()
+    def _generate_content(self, payload: Dict[str, Any]) -> str:
+        route = self._known_route()
+        if route is not None:
+            # A previous call found the endpoint that serves this model; skip the 404s
+            try:
+                return self._send_request(self._build_url(*route), payload)
+            except urllib.error.HTTPError as exc:
+                if exc.code != 404:
+                    body = exc.read().decode("utf-8", errors="replace")
+                    raise RuntimeError(f"Extractor request failed: {exc.code} {body}") from exc
+                self._forget_route()
         try:
             return self._send_request(
                 self._build_url(self.config.api_version, self.config.model),
                 payload,
-                context,
             )
         except urllib.error.HTTPError as exc:
             if exc.code == 404 and self.config.api_version == "v1beta":
+                count_llm_fallback("api_version")
                 try:
-                    return self._send_request(
+                    response = self._send_request(
                         self._build_url("v1", self.config.model),
                         payload,
-                        context,
                     )
+                    self._remember_route("v1", self.config.model)
+                    return response
                 except urllib.error.HTTPError as fallback_exc:
                     return self._attempt_with_fallback_model(
-                        "v1", payload, context, fallback_exc
+                        "v1", payload, fallback_exc
                     )
             if exc.code == 404:
                 return self._attempt_with_fallback_model(
-                    self.config.api_version, payload, context, exc
+                    self.config.api_version, payload, exc
+                )
+            body = exc.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"Extractor request failed: {exc.code} {body}") from exc
+
+    # Send the request to Gemini without blocking the event loop
+    async def _generate_content_async(self, payload: Dict[str, Any]) -> str:
+        route = self._known_route()
+        if route is not None:
+            try:
+                return await self._send_request_async(self._build_url(*route), payload)
+            except urllib.error.HTTPError as exc:
+                if exc.code != 404:
+                    body = exc.read().decode("utf-8", errors="replace")
+                    raise RuntimeError(f"Extractor request failed: {exc.code} {body}") from exc
+                self._forget_route()
+        try:
+            return await self._send_request_async(
+                self._build_url(self.config.api_version, self.config.model),
+                payload,
+            )
+        except urllib.error.HTTPError as exc:
+            if exc.code == 404 and self.config.api_version == "v1beta":
+                count_llm_fallback("api_version")
+                try:
+                    response = await self._send_request_async(
+                        self._build_url("v1", self.config.model),
+                        payload,
+                    )
+                    self._remember_route("v1", self.config.model)
+                    return response
+                except urllib.error.HTTPError as fallback_exc:
+                    return await self._attempt_with_fallback_model_async(
+                        "v1", payload, fallback_exc
+                    )
+            if exc.code == 404:
+                return await self._attempt_with_fallback_model_async(
+                    self.config.api_version, payload, exc
                 )
             body = exc.read().decode("utf-8", errors="replace")
             raise RuntimeError(f"Extractor request failed: {exc.code} {body}") from exc
@@ -129,94 +317,195 @@ class GeminiClient:
             f"{model}:generateContent?key={self.config.api_key}"
         )
 
-    def _send_request(
-        self,
-        url: str,
-        payload: Dict[str, Any],
-        context: ssl.SSLContext | None,
-    ) -> str:
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            url,
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        if context is None:
-            response = urllib.request.urlopen(
-                request, timeout=self.config.timeout_seconds
-            )
-        else:
-            response = urllib.request.urlopen(
-                request, timeout=self.config.timeout_seconds, context=context
-            )
-        with response as resp:
-            return resp.read().decode("utf-8")
+    # Time one HTTP call into the LLM latency histogram, labelled by outcome
+    @contextmanager
+    def _observe(self, kind: str, url: str):
+        model = model_from_url(url) if kind == "generate" else ""
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except urllib.error.HTTPError as exc:
+            outcome = f"http_{exc.code}"
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            observe_llm_request(kind, model, outcome, time.perf_counter() - started)
+
+    # Retries, circuit breaking and hedging happen per model; 404s come back unchanged for fallback
+    def _send_request(self, url: str, payload: Dict[str, Any]) -> str:
+        # Documents are InlineData encoded once per request body; each send streams the same bytes
+        data = build_json_body(payload)
+        tokens = estimate_tokens(payload)
+
+        # Every attempt, retry or hedge spends quota, so each one goes through the limiter
+        def send() -> bytes:
+            self.limiter.acquire(tokens)
+            with self._observe("generate", url):
+                return self.transport.request(
+                    "POST",
+                    url,
+                    body=data,
+                    headers={"Content-Type": "application/json"},
+                    timeout=self.config.timeout_seconds,
+                )
+
+        try:
+            response = self.resilience.call(model_from_url(url), send)
+        except urllib.error.HTTPError:
+            raise
+        except urllib.error.URLError as exc:
+            raise RuntimeError(f"Extractor request failed: {exc.reason}") from exc
+        return response.decode("utf-8")
 
     def _attempt_with_fallback_model(
         self,
         version: str,
         payload: Dict[str, Any],
-        context: ssl.SSLContext | None,
         original_exc: urllib.error.HTTPError,
     ) -> str:
-        fallback_model = self._select_fallback_model(version, context)
+        count_llm_fallback("model")
+        fallback_model = self._select_fallback_model(version)
         if not fallback_model:
             body = original_exc.read().decode("utf-8", errors="replace")
             raise RuntimeError(
                 f"Extractor request failed: {original_exc.code} {body}"
             ) from original_exc
         try:
-            return self._send_request(
+            response = self._send_request(
                 self._build_url(version, fallback_model),
                 payload,
-                context,
             )
         except urllib.error.HTTPError as exc:
             body = exc.read().decode("utf-8", errors="replace")
             raise RuntimeError(f"Extractor request failed: {exc.code} {body}") from exc
+        self._remember_route(version, fallback_model)
+        return response
+
+    # Fallback model for an API version, from the routing table before the models catalogue
+    def _select_fallback_model(self, version: str) -> str | None:
+        known, model = self.router.fallback_model(self.config.base_url, self.config.api_key, version)
+        if known:
+            return model
+        model = pick_generate_model(self._list_models(version))
+        self.router.store_fallback_model(self.config.base_url, self.config.api_key, version, model)
+        return model
+
+    def _known_route(self) -> Tuple[str, str] | None:
+        return self.router.route(
+            self.config.base_url, self.config.api_key, self.config.api_version, self.config.model
+        )
 
-    def _select_fallback_model(
-        self, version: str, context: ssl.SSLContext | None
-    ) -> str | None:
-        models = self._list_models(version, context)
-        for model in models:
-            methods = (
-                model.get("supportedGenerationMethods")
-                or model.get("supportedMethods")
-                or []
-            )
-            if "generateContent" in methods:
-                name = model.get("name") or ""
-                return name.split("/", 1)[-1] if "/" in name else name
-        return None
+    def _remember_route(self, version: str, model: str) -> None:
+        self.router.remember(
+            self.config.base_url, self.config.api_key, self.config.api_version, self.config.model, version, model
+        )
+
+    def _forget_route(self) -> None:
+        count_llm_fallback("stale_route")
+        self.router.forget(self.config.base_url, self.config.api_key, self.config.api_version, self.config.model)
+
+    def _list_models(self, version: str) -> list[Dict[str, Any]]:
+        url = self._build_models_url(version)
+        with self._observe("list_models", url):
+            response = self.transport.request("GET", url, timeout=self.config.timeout_seconds)
+        payload = json.loads(response.decode("utf-8"))
+        return payload.get("models") or []
 
-    def _list_models(
-        self, version: str, context: ssl.SSLContext | None
-    ) -> list[Dict[str, Any]]:
-        url = (
+    def _build_models_url(self, version: str) -> str:
+        return (
             f"{self.config.base_url}/{version}/models"
             f"?key={self.config.api_key}"
         )
-        request = urllib.request.Request(url, method="GET")
-        if context is None:
-            response = urllib.request.urlopen(
-                request, timeout=self.config.timeout_seconds
-            )
-        else:
-            response = urllib.request.urlopen(
-                request, timeout=self.config.timeout_seconds, context=context
+
+    async def _send_request_async(self, url: str, payload: Dict[str, Any]) -> str:
+        data = build_json_body(payload)
+        tokens = estimate_tokens(payload)
+
+        async def send() -> bytes:
+            await self.limiter.acquire_async(tokens)
+            with self._observe("generate", url):
+                return await get_async_http_transport().request(
+                    "POST",
+                    url,
+                    body=data,
+                    headers={"Content-Type": "application/json"},
+                    timeout=self.config.timeout_seconds,
+                )
+
+        try:
+            response = await self.resilience.call_async(model_from_url(url), send)
+        except urllib.error.HTTPError:
+            raise
+        except urllib.error.URLError as exc:
+            raise RuntimeError(f"Extractor request failed: {exc.reason}") from exc
+        return response.decode("utf-8")
+
+    async def _attempt_with_fallback_model_async(
+        self,
+        version: str,
+        payload: Dict[str, Any],
+        original_exc: urllib.error.HTTPError,
+    ) -> str:
+        count_llm_fallback("model")
+        known, fallback_model = self.router.fallback_model(self.config.base_url, self.config.api_key, version)
+        if not known:
+            fallback_model = pick_generate_model(await self._list_models_async(version))
+            self.router.store_fallback_model(self.config.base_url, self.config.api_key, version, fallback_model)
+        if not fallback_model:
+            body = original_exc.read().decode("utf-8", errors="replace")
+            raise RuntimeError(
+                f"Extractor request failed: {original_exc.code} {body}"
+            ) from original_exc
+        try:
+            response = await self._send_request_async(
+                self._build_url(version, fallback_model),
+                payload,
             )
-        with response as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as exc:
+            body = exc.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"Extractor request failed: {exc.code} {body}") from exc
+        self._remember_route(version, fallback_model)
+        return response
+
+    async def _list_models_async(self, version: str) -> list[Dict[str, Any]]:
+        url = self._build_models_url(version)
+        with self._observe("list_models", url):
+            response = await get_async_http_transport().request("GET", url, timeout=self.config.timeout_seconds)
+        payload = json.loads(response.decode("utf-8"))
         return payload.get("models") or []
 
+
+def model_from_url(url: str) -> str:
+    return url.split("/models/", 1)[-1].split(":", 1)[0]
+
+
+def count_llm_fallback(kind: str) -> None:
+    count("vesting_buddy_llm_fallbacks_total", "Gemini calls retried on another API version or model", kind=kind)
+
+
+# Pick the first listed model that supports generateContent
+def pick_generate_model(models: list[Dict[str, Any]]) -> str | None:
+    for model in models:
+        methods = (
+            model.get("supportedGenerationMethods")
+            or model.get("supportedMethods")
+            or []
+        )
+        if "generateContent" in methods:
+            name = model.get("name") or ""
+            return name.split("/", 1)[-1] if "/" in name else name
+    return None
+
 MAX_EXTRACTION_RETRIES = 2
 
 class ExtractorAgent:
-    def __init__(self, client: GeminiClient, tracer: Tracer) -> None:
+    def __init__(self, client: GeminiClient, tracer: Tracer, cache: TieredCache | None = None) -> None:
         self.client = client
         self.tracer = tracer
+        self.cache = cache
 
     def _preview(self, text: str, max_len: int = 400) -> str:
         if not text:
@@ -224,8 +513,109 @@ class ExtractorAgent:
         return text[:max_len] + ("…" if len(text) > max_len else "")
 
     # Run the extraction pipeline for a file
+    def extract_from_file(
+        self,
+        file_path: str,
+        schema_fields: Iterable[Tuple[str, str]] | None = None,
+        content_hash: str | None = None,
+    ) -> Dict[str, Any]:
+        return self.extract_with_cache_status(file_path, schema_fields, content_hash)[0]
+
+    async def extract_from_file_async(
+        self,
+        file_path: str,
+        schema_fields: Iterable[Tuple[str, str]] | None = None,
+        content_hash: str | None = None,
+    ) -> Dict[str, Any]:
+        return (await self.extract_with_cache_status_async(file_path, schema_fields, content_hash))[0]
+
+    # (extraction result, whether it came from the extraction cache)
     @get_track_decorator()
-    def extract_from_file(self, file_path: str, schema_fields: Iterable[Tuple[str, str]] | None = None) -> Dict[str, Any]:
+    @timed_stage("extract")
+    def extract_with_cache_status(
+        self,
+        file_path: str,
+        schema_fields: Iterable[Tuple[str, str]] | None = None,
+        content_hash: str | None = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        mock_result = self._load_mock(file_path)
+        if mock_result is not None:
+            return mock_result, False
+        fields = tuple(schema_fields or get_schema_fields())
+        cache_key, cached = self._lookup_cache(file_path, fields, content_hash)
+        if cached is not None:
+            return cached, True
+        request_body = self._prepare_request(file_path, fields)
+        # Validation retries and the transport retries beneath them share one budget
+        with retry_budget() as budget:
+            with stage_timer("extract_llm") as timing:
+                response_text = self.client.generate_content(request_body)
+            self.tracer.log_step(
+                "response_received",
+                {"response_length": len(response_text), "full_response": response_text, "duration_ms": timing.duration_ms},
+            )
+            for attempt in range(MAX_EXTRACTION_RETRIES + 1):
+                result, errors = self._validate_response(response_text, fields, attempt)
+                if result is not None:
+                    self.client.remember_response(request_body, response_text)
+                    return self._store_cache(cache_key, result), False
+
+                if attempt < MAX_EXTRACTION_RETRIES:
+                    delay = self.client.resilience.policy.delay(attempt)
+                    if not budget.try_spend(delay):
+                        break
+                    count("vesting_buddy_extraction_retries_total", "Extractions re-requested after failed validation")
+                    time.sleep(delay)
+                    with stage_timer("extract_llm_retry"):
+                        response_text = self.client.generate_content(request_body, refresh=True)
+                    self.tracer.log_step("response_received_retry", {"response_length": len(response_text), "full_response": response_text})
+
+        raise RuntimeError(f"Extraction failed after retries: {errors}")
+
+    # Async variant of extract_with_cache_status; file encoding runs off the event loop
+    @get_track_decorator()
+    @timed_stage("extract")
+    async def extract_with_cache_status_async(
+        self,
+        file_path: str,
+        schema_fields: Iterable[Tuple[str, str]] | None = None,
+        content_hash: str | None = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        mock_result = self._load_mock(file_path)
+        if mock_result is not None:
+            return mock_result, False
+        fields = tuple(schema_fields or get_schema_fields())
+        cache_key, cached = await asyncio.to_thread(self._lookup_cache, file_path, fields, content_hash)
+        if cached is not None:
+            return cached, True
+        request_body = await asyncio.to_thread(self._prepare_request, file_path, fields)
+        # Validation retries and the transport retries beneath them share one budget
+        with retry_budget() as budget:
+            with stage_timer("extract_llm") as timing:
+                response_text = await self.client.generate_content_async(request_body)
+            self.tracer.log_step(
+                "response_received",
+                {"response_length": len(response_text), "full_response": response_text, "duration_ms": timing.duration_ms},
+            )
+            for attempt in range(MAX_EXTRACTION_RETRIES + 1):
+                result, errors = self._validate_response(response_text, fields, attempt)
+                if result is not None:
+                    await self.client.remember_response_async(request_body, response_text)
+                    return await asyncio.to_thread(self._store_cache, cache_key, result), False
+
+                if attempt < MAX_EXTRACTION_RETRIES:
+                    delay = self.client.resilience.policy.delay(attempt)
+                    if not budget.try_spend(delay):
+                        break
+                    count("vesting_buddy_extraction_retries_total", "Extractions re-requested after failed validation")
+                    await asyncio.sleep(delay)
+                    with stage_timer("extract_llm_retry"):
+                        response_text = await self.client.generate_content_async(request_body, refresh=True)
+                    self.tracer.log_step("response_received_retry", {"response_length": len(response_text), "full_response": response_text})
+
+        raise RuntimeError(f"Extraction failed after retries: {errors}")
+
+    def _load_mock(self, file_path: str) -> Dict[str, Any] | None:
         # Check for specific mocks based on filename
         fname = os.path.basename(file_path).lower()
         if "paystub" in fname:
@@ -242,17 +632,44 @@ class ExtractorAgent:
         if mock_payload:
             self.tracer.log_step("extract_mock_used", {"file_path": file_path})
             return json.loads(mock_payload)
-            
+        return None
+
+    # Look up a previous extraction of the same document content; a known hash skips rereading the file
+    def _lookup_cache(
+        self, file_path: str, fields: Tuple[Tuple[str, str], ...], content_hash: str | None = None
+    ) -> Tuple[str | None, Dict[str, Any] | None]:
+        if self.cache is None:
+            return None, None
+        cache_key = build_extraction_cache_key(
+            content_hash or sha256_file(file_path),
+            guess_mime_type(file_path),
+            fields,
+            self.client.config.model,
+        )
+        cached = self.cache.get(cache_key)
+        stats = self.cache.stats()
+        counters = {"hits": stats["hits"], "misses": stats["misses"], "hit_ratio": stats["hit_ratio"]}
+        if cached is None:
+            self.tracer.log_step("extract_cache_miss", {"cache_key": cache_key, **counters})
+            return cache_key, None
+        self.tracer.log_step("extract_cache_hit", {"cache_key": cache_key, **counters})
+        return cache_key, cached
+
+    def _store_cache(self, cache_key: str | None, result: Dict[str, Any]) -> Dict[str, Any]:
+        if self.cache is not None and cache_key:
+            self.cache.set(cache_key, result)
+        return result
+
+    @timed_stage("extract_encode")
+    def _prepare_request(self, file_path: str, fields: Tuple[Tuple[str, str], ...]) -> Dict[str, Any]:
         self.tracer.log_step("guess_mime_type", {"file_path": file_path})
         mime_type = guess_mime_type(file_path)
         self.tracer.log_step("mime_type_resolved", {"mime_type": mime_type})
-        data = read_file_base64(file_path)
-        approx_bytes = (len(data) * 3) // 4
+        data = InlineData.from_file(file_path)
         self.tracer.log_step(
             "file_loaded",
-            {"base64_length": len(data), "approx_size_bytes": approx_bytes, "mime_type": mime_type},
+            {"base64_length": len(data), "approx_size_bytes": data.raw_size, "mime_type": mime_type},
         )
-        fields = schema_fields or get_schema_fields()
         prompt_text = build_prompt_text(fields)
         self.tracer.log_step(
             "extract_prompt_preview",
@@ -262,29 +679,28 @@ class ExtractorAgent:
         self.tracer.log_step(
             "request_built", {"schema_fields": len(fields)}
         )
-        response_text = self.client.generate_content(request_body)
-        self.tracer.log_step("response_received", {"response_length": len(response_text), "full_response": response_text})
-        for attempt in range(MAX_EXTRACTION_RETRIES + 1):
-            result = parse_response(response_text)
-            valid, errors = validate_extraction(result, fields)
+        return request_body
 
-            self.tracer.log_step(
-            "extraction_validation",
-            {"valid": valid, "errors": errors, "attempt": attempt},
-            )
-
-            if valid:
-                result["_extraction_confidence"] = 1.0 if attempt == 0 else 0.7
-                return result
+    def _validate_response(
+        self, response_text: str, fields: Tuple[Tuple[str, str], ...], attempt: int
+    ) -> Tuple[Dict[str, Any] | None, List[str]]:
+        result = parse_response(response_text)
+        valid, errors = validate_extraction(result, fields)
 
-            if attempt < MAX_EXTRACTION_RETRIES:
-                response_text = self.client.generate_content(request_body)
-                self.tracer.log_step("response_received_retry", {"response_length": len(response_text), "full_response": response_text})
+        self.tracer.log_step(
+        "extraction_validation",
+        {"valid": valid, "errors": errors, "attempt": attempt},
+        )
 
-        raise RuntimeError(f"Extraction failed after retries: {errors}")
+        if valid:
+            result["_extraction_confidence"] = 1.0 if attempt == 0 else 0.7
+            return result, errors
+        return None, errors
 
 # Build the Gemini request payload
-def build_request(mime_type: str, base64_data: str, schema_fields: Iterable[Tuple[str, str]] | None = None) -> Dict[str, Any]:
+def build_request(
+    mime_type: str, base64_data: InlineData | str, schema_fields: Iterable[Tuple[str, str]] | None = None
+) -> Dict[str, Any]:
     fields = schema_fields or get_schema_fields()
     prompt = {"text": build_prompt_text(fields)}
     return {
@@ -316,6 +732,24 @@ def build_prompt_text(schema_fields: Iterable[Tuple[str, str]]) -> str:
     return f"{prompt_prefix} " + "{" + schema_items + "}" + prompt_suffix
 
 
+# Key an extraction by document content and everything that shapes the prompt
+def build_extraction_cache_key(
+    content_hash: str,
+    mime_type: str,
+    schema_fields: Iterable[Tuple[str, str]],
+    model: str,
+) -> str:
+    return canonical_hash(
+        {
+            "content_sha256": content_hash,
+            "mime_type": mime_type,
+            "schema_fields": [list(field) for field in schema_fields],
+            "prompt": build_prompt_text(schema_fields),
+            "model": model,
+        }
+    )
+
+
 # Parse Gemini response into JSON
 def parse_response(response_text: str) -> Dict[str, Any]:
     payload = json.loads(response_text)
@@ -346,27 +780,109 @@ def guess_mime_type(file_path: str) -> str:
     return mime_type or "application/octet-stream"
 
 
-# Read a file and return base64 string
-def read_file_base64(file_path: str) -> str:
-    with open(file_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
-
-
-# Build an extractor agent using env configuration
-def load_extractor_from_env() -> ExtractorAgent:
-    api_key = get_env_value("GEMINI_API_KEY", required=True)
-    model = get_env_value("GEMINI_MODEL", required=True)
-    timeout = int(get_env_value("GEMINI_TIMEOUT_SECONDS", required=True))
-    api_version = get_env_value("GEMINI_API_VERSION", required=True)
-    base_url = get_env_value("GEMINI_BASE_URL", required=True)
-    config = ExtractorConfig(
-        api_key=api_key,
-        model=model,
-        timeout_seconds=timeout,
-        api_version=api_version,
-        base_url=base_url,
+# Gemini connection settings shared by every agent
+def load_gemini_config() -> ExtractorConfig:
+    return ExtractorConfig(
+        api_key=get_env_value("GEMINI_API_KEY", required=True),
+        model=get_env_value("GEMINI_MODEL", required=True),
+        timeout_seconds=int(get_env_value("GEMINI_TIMEOUT_SECONDS", required=True)),
+        api_version=get_env_value("GEMINI_API_VERSION", required=True),
+        base_url=get_env_value("GEMINI_BASE_URL", required=True),
     )
-    return ExtractorAgent(GeminiClient(config), get_tracer())
+
+
+# Build an extractor agent using env configuration; pass client/tracer to share them
+def load_extractor_from_env(client: GeminiClient | None = None, tracer: Tracer | None = None) -> ExtractorAgent:
+    return ExtractorAgent(
+        (client or GeminiClient(load_gemini_config())).for_agent("extractor"),
+        tracer or get_tracer(),
+        get_extraction_cache(),
+    )
+
+
+_EXTRACTION_CACHE: TieredCache | None = None
+_EXTRACTION_CACHE_LOADED = False
+_EXTRACTION_CACHE_LOCK = threading.Lock()
+
+
+# Return the process-wide extraction cache, or None when EXTRACT_CACHE_ENABLED is off
+def get_extraction_cache() -> TieredCache | None:
+    global _EXTRACTION_CACHE, _EXTRACTION_CACHE_LOADED
+    with _EXTRACTION_CACHE_LOCK:
+        if _EXTRACTION_CACHE_LOADED:
+            return _EXTRACTION_CACHE
+        _EXTRACTION_CACHE_LOADED = True
+        if get_env_value("EXTRACT_CACHE_ENABLED", default="true").lower() not in {"1", "true", "yes"}:
+            return None
+        ttl = float(get_env_value("EXTRACT_CACHE_TTL_SECONDS", default=str(DEFAULT_EXTRACT_CACHE_TTL_SECONDS)))
+        memory_entries = int(
+            get_env_value("EXTRACT_CACHE_MEMORY_ENTRIES", default=str(DEFAULT_EXTRACT_CACHE_MEMORY_ENTRIES))
+        )
+        max_bytes = int(get_env_value("EXTRACT_CACHE_MAX_BYTES", default=str(DEFAULT_EXTRACT_CACHE_MAX_BYTES)))
+        path = get_env_value(
+            "EXTRACT_CACHE_PATH",
+            default=os.path.join(default_cache_dir(), "extraction_cache.sqlite3"),
+        )
+        disk = None
+        if max_bytes > 0:
+            try:
+                disk = SQLiteCache(path, ttl_seconds=ttl, max_bytes=max_bytes)
+            except (OSError, sqlite3.Error):
+                # Read-only or missing filesystem: keep the in-memory tier only
+                disk = None
+        _EXTRACTION_CACHE = TieredCache(MemoryLRUCache(memory_entries, ttl), disk)
+        return _EXTRACTION_CACHE
+
+
+# Comma separated LLM_RESPONSE_CACHE_AGENTS, e.g. "policy_scout,strategist"
+def response_cache_enabled(agent: str) -> bool:
+    raw = get_env_value("LLM_RESPONSE_CACHE_AGENTS")
+    agents = {name.strip().lower() for name in raw.split(",") if name.strip()}
+    return agent.lower() in agents or "all" in agents
+
+
+_RESPONSE_CACHE: TieredCache | None = None
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+# Process-wide Gemini response cache; LLM_RESPONSE_CACHE_BACKEND picks memory, sqlite or directory
+def get_response_cache() -> TieredCache:
+    global _RESPONSE_CACHE
+    with _RESPONSE_CACHE_LOCK:
+        if _RESPONSE_CACHE is not None:
+            return _RESPONSE_CACHE
+        backend = get_env_value("LLM_RESPONSE_CACHE_BACKEND", default=DEFAULT_LLM_RESPONSE_CACHE_BACKEND).lower()
+        if backend not in LLM_RESPONSE_CACHE_BACKENDS:
+            raise RuntimeError(f"LLM_RESPONSE_CACHE_BACKEND must be one of {', '.join(LLM_RESPONSE_CACHE_BACKENDS)}")
+        ttl = float(
+            get_env_value("LLM_RESPONSE_CACHE_TTL_SECONDS", default=str(DEFAULT_LLM_RESPONSE_CACHE_TTL_SECONDS))
+        )
+        memory_entries = int(
+            get_env_value(
+                "LLM_RESPONSE_CACHE_MEMORY_ENTRIES", default=str(DEFAULT_LLM_RESPONSE_CACHE_MEMORY_ENTRIES)
+            )
+        )
+        max_bytes = int(
+            get_env_value("LLM_RESPONSE_CACHE_MAX_BYTES", default=str(DEFAULT_LLM_RESPONSE_CACHE_MAX_BYTES))
+        )
+        disk = None
+        try:
+            if backend == "sqlite":
+                path = get_env_value(
+                    "LLM_RESPONSE_CACHE_PATH",
+                    default=os.path.join(default_cache_dir(), "llm_response_cache.sqlite3"),
+                )
+                disk = SQLiteCache(path, ttl_seconds=ttl, max_bytes=max_bytes)
+            elif backend == "directory":
+                path = get_env_value(
+                    "LLM_RESPONSE_CACHE_PATH", default=os.path.join(default_cache_dir(), "llm_responses")
+                )
+                disk = DirectoryCache(path, ttl_seconds=ttl, max_bytes=max_bytes)
+        except (OSError, sqlite3.Error):
+            # Read-only or missing filesystem: keep the in-memory tier only
+            disk = None
+        _RESPONSE_CACHE = TieredCache(MemoryLRUCache(memory_entries, ttl), disk)
+        return _RESPONSE_CACHE
 
 
 def get_env_value(name: str, required: bool = False, default: str | None = None) -> str:
@@ -1,7 +1,11 @@
+import functools
+import hashlib
 import json
+import os
 import re
-from dataclasses import dataclass
-from typing import Dict, List, Any
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Any, Tuple
 
 from agents.extractor_agent import (
     Tracer, 
@@ -9,14 +13,21 @@ from agents.extractor_agent import (
     get_track_decorator, 
     get_tracer,
     GeminiClient,
-    ExtractorConfig,
-    extract_json
+    extract_json,
+    load_gemini_config,
 )
 from constants.app_defaults import (
     DEFAULT_GUARDRAIL_BLOCKLIST,
     DEFAULT_GUARDRAIL_REPLACEMENT,
-    DEFAULT_GUARDRAIL_PROMPT
+    DEFAULT_GUARDRAIL_PROMPT,
+    DEFAULT_GUARDRAIL_PROMPT_MAX_TERMS,
+    DEFAULT_GUARDRAIL_VERDICT_CACHE_ENTRIES,
+    DEFAULT_GUARDRAIL_VERDICT_CACHE_TTL_SECONDS,
 )
+from utils.cache_store import MemoryLRUCache
+from utils.hashing import canonical_hash
+from utils.metrics import count, stage_timer, timed_stage
+from utils.term_matcher import TermMatch, get_term_matcher
 
 
 @dataclass
@@ -24,101 +35,236 @@ class GuardrailConfig:
     blocked_terms: List[str]
     replacement_text: str
     prompt_template: str = DEFAULT_GUARDRAIL_PROMPT
+    trust_templates: bool = True
 
 
 class GuardrailAgent:
-    def __init__(self, client: GeminiClient, tracer: Tracer, config: GuardrailConfig) -> None:
+    def __init__(
+        self,
+        client: GeminiClient,
+        tracer: Tracer,
+        config: GuardrailConfig,
+        verdict_cache: MemoryLRUCache | None = None,
+    ) -> None:
         self.client = client
         self.tracer = tracer
         self.config = config
+        self.verdict_cache = verdict_cache
+        self.matcher = get_term_matcher(tuple(config.blocked_terms))
 
+    # source="template" marks text generated by format_recommendation rather than an LLM
     @get_track_decorator()
-    def enforce(self, content: str) -> Dict[str, Any]:
+    @timed_stage("guardrail")
+    def enforce(self, content: str, source: str | None = None) -> Dict[str, Any]:
+        violations, matches = self._term_violations(content)
+        decided, cache_key = self._decide_without_llm(content, violations, matches, source)
+        if decided is not None:
+            return decided
+        llm_ok = False
+        try:
+            request_body = self._build_llm_request(content)
+            with stage_timer("guardrail_llm"):
+                response_text = self.client.generate_content(request_body)
+            llm_ok = self._apply_llm_response(response_text, violations)
+            if llm_ok:
+                self.client.remember_response(request_body, response_text)
+        except Exception as e:
+            self.tracer.log_step("guardrail_llm_error", {"error": str(e)})
+        return self._store_verdict(cache_key, self._verdict(content, violations), llm_ok)
+
+    # Async variant of enforce
+    @get_track_decorator()
+    @timed_stage("guardrail")
+    async def enforce_async(self, content: str, source: str | None = None) -> Dict[str, Any]:
+        violations, matches = self._term_violations(content)
+        decided, cache_key = self._decide_without_llm(content, violations, matches, source)
+        if decided is not None:
+            return decided
+        llm_ok = False
+        try:
+            request_body = self._build_llm_request(content)
+            with stage_timer("guardrail_llm"):
+                response_text = await self.client.generate_content_async(request_body)
+            llm_ok = self._apply_llm_response(response_text, violations)
+            if llm_ok:
+                await self.client.remember_response_async(request_body, response_text)
+        except Exception as e:
+            self.tracer.log_step("guardrail_llm_error", {"error": str(e)})
+        return self._store_verdict(cache_key, self._verdict(content, violations), llm_ok)
+
+    @timed_stage("guardrail_terms")
+    def _term_violations(self, content: str) -> Tuple[List[str], List[TermMatch]]:
         violations = []
         
-        # 1. Regex check (Fast pass)
-        if self.config.blocked_terms:
-             pattern = r"\b(" + "|".join(map(re.escape, self.config.blocked_terms)) + r")\b"
-             found = re.findall(pattern, content, re.I)
-             if found:
-                 violations.append(f"Blocked terms detected: {', '.join(set(found))}")
+        # 1. Blocklist check (Fast pass)
+        matches = self.matcher.find_all(content)
+        if matches:
+            found = dict.fromkeys(match.text for match in matches)
+            violations.append(f"Blocked terms detected: {', '.join(found)}")
+        return violations, matches
 
+    # Settle the verdict locally when the LLM cannot change it; returns (verdict, cache key)
+    def _decide_without_llm(
+        self, content: str, violations: List[str], matches: List[TermMatch], source: str | None
+    ) -> Tuple[Dict[str, Any] | None, str | None]:
+        if violations:
+            # Blocked terms already decide the outcome; the LLM could only add reasons
+            self.tracer.log_step("guardrail_fast_path", {"reason": "blocked_terms"})
+            count_fast_path("blocked_terms")
+            return self._verdict(content, violations, matches), None
+        if source == "template" and self.config.trust_templates:
+            self.tracer.log_step("guardrail_fast_path", {"reason": "trusted_template"})
+            count_fast_path("trusted_template")
+            return self._verdict(content, violations), None
+        if self.verdict_cache is None:
+            return None, None
+        cache_key = canonical_hash(
+            {
+                "content_sha256": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+                "blocked_terms": self.matcher.fingerprint,
+                "prompt": self.config.prompt_template,
+                "model": self.client.config.model,
+            }
+        )
+        cached = self.verdict_cache.get(cache_key)
+        if cached is None:
+            return None, cache_key
+        self.tracer.log_step("guardrail_fast_path", {"reason": "cached_verdict"})
+        count_fast_path("cached_verdict")
+        return self._verdict(content, cached["violations"]), cache_key
+
+    def _store_verdict(self, cache_key: str | None, verdict: Dict[str, Any], llm_ok: bool) -> Dict[str, Any]:
+        # Only LLM-confirmed verdicts are reused; a failed call should be retried next time
+        if self.verdict_cache is not None and cache_key and llm_ok:
+            self.verdict_cache.set(cache_key, {"violations": verdict.get("violations", [])})
+        return verdict
+
+    def _build_llm_request(self, content: str) -> Dict[str, Any]:
         # 2. LLM Check (Smarter pass)
-        # Only run LLM if regex didn't already block it? 
-        # Or always run to find "topics" that regex misses?
-        # The prompt implies checking for "topics" too.
-        # If I want to optimize the LLM prompt, I must run it.
-        # But for efficiency, if it's already blocked by regex, maybe skip LLM?
-        # However, for the purpose of "optimizing the agent", let's run it 
-        # or at least make it capable.
         # If I want to catch "crypto speculation" without the word "bitcoin", I need LLM.
         
+        # Simple formatting; very large lists are left to the fast pass instead of the prompt
+        terms = self.matcher.terms
+        blocked_terms = ", ".join(terms[:DEFAULT_GUARDRAIL_PROMPT_MAX_TERMS])
+        if len(terms) > DEFAULT_GUARDRAIL_PROMPT_MAX_TERMS:
+            blocked_terms += f" (and {len(terms) - DEFAULT_GUARDRAIL_PROMPT_MAX_TERMS} more)"
+        prompt = self.config.prompt_template.format(
+            blocked_terms=blocked_terms,
+            blocked_topics="financial advice, stock picking, crypto speculation"
+        )
+        # Add content to check
+        prompt += f"\n\nContent:\n{content}"
+        
+        request_body = {
+            "contents": [{
+                "role": "user",
+                "parts": [{"text": prompt}]
+            }],
+            "generationConfig": {"temperature": 0}
+        }
+        
+        self.tracer.log_step("guardrail_llm_request", {"prompt_len": len(prompt)})
+        return request_body
+
+    def _apply_llm_response(self, response_text: str, violations: List[str]) -> bool:
+        self.tracer.log_step("guardrail_llm_response", {"response": response_text})
+        
+        # Parse response
         try:
-            # Simple formatting
-            prompt = self.config.prompt_template.format(
-                blocked_terms=", ".join(self.config.blocked_terms),
-                blocked_topics="financial advice, stock picking, crypto speculation"
-            )
-            # Add content to check
-            prompt += f"\n\nContent:\n{content}"
-            
-            request_body = {
-                "contents": [{
-                    "role": "user",
-                    "parts": [{"text": prompt}]
-                }],
-                "generationConfig": {"temperature": 0}
-            }
-            
-            self.tracer.log_step("guardrail_llm_request", {"prompt_len": len(prompt)})
-            response_text = self.client.generate_content(request_body)
-            self.tracer.log_step("guardrail_llm_response", {"response": response_text})
-            
-            # Parse response
-            try:
-                llm_result = json.loads(extract_json(response_text))
-                if llm_result.get("status") == "blocked":
-                    violations.extend(llm_result.get("violations", []))
-            except Exception as e:
-                self.tracer.log_step("guardrail_llm_parse_error", {"error": str(e)})
-                
+            llm_result = json.loads(extract_json(response_text))
+            if llm_result.get("status") == "blocked":
+                violations.extend(llm_result.get("violations", []))
+            return True
         except Exception as e:
-            self.tracer.log_step("guardrail_llm_error", {"error": str(e)})
+            self.tracer.log_step("guardrail_llm_parse_error", {"error": str(e)})
+            return False
 
+    def _verdict(
+        self, content: str, violations: List[str], matches: List[TermMatch] | None = None
+    ) -> Dict[str, Any]:
         self.tracer.log_step(
             "guardrail_evaluation",
             {"violations": violations},
         )
 
         if violations:
-            return {
+            verdict = {
                 "status": "blocked",
                 "content": self.config.replacement_text,
                 "violations": list(set(violations)),
             }
+            if matches:
+                # Offsets into the original content, for highlighting
+                verdict["matches"] = [asdict(match) for match in matches]
+            return verdict
 
         return {"status": "allowed", "content": content}
 
-def load_guardrail_from_env() -> GuardrailAgent:
+def count_fast_path(reason: str) -> None:
+    count("vesting_buddy_guardrail_fast_path_total", "Guardrail verdicts decided without an LLM call", reason=reason)
+
+
+# Parse a comma or newline separated blocklist once per distinct value
+@functools.lru_cache(maxsize=16)
+def parse_blocklist(raw: str) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(term.strip() for term in re.split(r"[,\n]+", raw) if term.strip()))
+
+
+@functools.lru_cache(maxsize=4)
+def _read_blocklist_file(path: str, mtime_ns: int) -> Tuple[str, ...]:
+    with open(path, "r", encoding="utf-8") as file:
+        return parse_blocklist(file.read())
+
+
+# Terms from GUARDRAIL_BLOCKLIST_FILE, re-read only when the file changes
+def load_blocklist_file(path: str) -> Tuple[str, ...]:
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError as e:
+        raise RuntimeError(f"Guardrail blocklist file not readable: {path}") from e
+    return _read_blocklist_file(path, mtime_ns)
+
+
+_VERDICT_CACHE: MemoryLRUCache | None = None
+_VERDICT_CACHE_LOCK = threading.Lock()
+
+
+# Process-wide cache of LLM guardrail verdicts keyed by content hash
+def get_guardrail_verdict_cache() -> MemoryLRUCache:
+    global _VERDICT_CACHE
+    with _VERDICT_CACHE_LOCK:
+        if _VERDICT_CACHE is None:
+            _VERDICT_CACHE = MemoryLRUCache(
+                max_entries=int(
+                    get_env_value(
+                        "GUARDRAIL_VERDICT_CACHE_ENTRIES", default=str(DEFAULT_GUARDRAIL_VERDICT_CACHE_ENTRIES)
+                    )
+                ),
+                ttl_seconds=float(
+                    get_env_value(
+                        "GUARDRAIL_VERDICT_CACHE_TTL_SECONDS",
+                        default=str(DEFAULT_GUARDRAIL_VERDICT_CACHE_TTL_SECONDS),
+                    )
+                ),
+            )
+        return _VERDICT_CACHE
+
+
+def load_guardrail_from_env(client: GeminiClient | None = None, tracer: Tracer | None = None) -> GuardrailAgent:
     raw = get_env_value("GUARDRAIL_BLOCKLIST", default=",".join(DEFAULT_GUARDRAIL_BLOCKLIST))
-    blocked_terms = [term.strip() for term in re.split(r"[,\n]+", raw) if term.strip()]
+    blocked_terms = list(parse_blocklist(raw))
+    blocklist_file = get_env_value("GUARDRAIL_BLOCKLIST_FILE")
+    if blocklist_file:
+        blocked_terms = list(dict.fromkeys(blocked_terms + list(load_blocklist_file(blocklist_file))))
     replacement_text = get_env_value("GUARDRAIL_REPLACEMENT", default=DEFAULT_GUARDRAIL_REPLACEMENT)
-    
-    # Load Gemini Config
-    # We reuse ExtractorConfig and environment variables
-    api_key = get_env_value("GEMINI_API_KEY", required=True)
-    model = get_env_value("GEMINI_MODEL", required=True)
-    timeout = int(get_env_value("GEMINI_TIMEOUT_SECONDS", required=True))
-    api_version = get_env_value("GEMINI_API_VERSION", required=True)
-    base_url = get_env_value("GEMINI_BASE_URL", required=True)
-    
-    gemini_config = ExtractorConfig(
-        api_key=api_key,
-        model=model,
-        timeout_seconds=timeout,
-        api_version=api_version,
-        base_url=base_url,
+
+    trust_templates = get_env_value("GUARDRAIL_TRUST_TEMPLATES", default="true").lower() in {"1", "true", "yes"}
+    config = GuardrailConfig(
+        blocked_terms=blocked_terms, replacement_text=replacement_text, trust_templates=trust_templates
+    )
+    return GuardrailAgent(
+        (client or GeminiClient(load_gemini_config())).for_agent("guardrail"),
+        tracer or get_tracer(),
+        config,
+        get_guardrail_verdict_cache(),
     )
-    
-    config = GuardrailConfig(blocked_terms=blocked_terms, replacement_text=replacement_text)
-    return GuardrailAgent(GeminiClient(gemini_config), get_tracer(), config)
@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Tuple
+
+import numpy as np
+
+from agents.strategist_agent import MatchFormula, parse_date, to_float
+
+INTEGRITY_UNKNOWN = 0
+INTEGRITY_CORRECT = 1
+INTEGRITY_INCORRECT = 2
+INTEGRITY_STATUS_NAMES = ("unknown", "correct", "incorrect")
+
+
+@dataclass
+class CohortArrays:
+    gross_pay: np.ndarray
+    current_401k: np.ndarray
+    period_days: np.ndarray
+    net_pay: np.ndarray
+    total_taxes: np.ndarray
+    total_deductions: np.ndarray
+
+
+@dataclass
+class CohortResult:
+    contribution_rate: np.ndarray
+    gap_rate: np.ndarray
+    annual_opportunity_cost: np.ndarray
+    pay_periods_per_year: np.ndarray
+    integrity_status: np.ndarray
+    taxes_in_deductions: np.ndarray
+
+
+# Columnar copy of the paystub fields the engine reads; unknown pay periods become NaN days
+def cohort_from_paystubs(paystubs: Iterable[Dict[str, Any]]) -> CohortArrays:
+    gross, current, days, net, taxes, deductions = [], [], [], [], [], []
+    for paystub in paystubs:
+        gross.append(to_float(paystub.get("gross_pay") or paystub.get("base_pay")))
+        current.append(to_float(paystub.get("pre_tax_401k")) + to_float(paystub.get("roth_401k")))
+        start = parse_date(paystub.get("pay_period_start"))
+        end = parse_date(paystub.get("pay_period_end"))
+        days.append(abs((end - start).days) + 1 if start and end else np.nan)
+        net.append(to_float(paystub.get("net_pay")))
+        taxes.append(to_float(paystub.get("total_taxes")))
+        deductions.append(to_float(paystub.get("total_deductions")))
+    return CohortArrays(
+        gross_pay=np.asarray(gross, dtype=np.float64),
+        current_401k=np.asarray(current, dtype=np.float64),
+        period_days=np.asarray(days, dtype=np.float64),
+        net_pay=np.asarray(net, dtype=np.float64),
+        total_taxes=np.asarray(taxes, dtype=np.float64),
+        total_deductions=np.asarray(deductions, dtype=np.float64),
+    )
+
+
+# Vector form of estimate_periods_per_year; NaN or missing lengths fall back to monthly
+def periods_per_year_from_days(period_days: np.ndarray) -> np.ndarray:
+    days = np.asarray(period_days, dtype=np.float64)
+    periods = np.full(days.shape, 12, dtype=np.int64)
+    known = ~np.isnan(days)
+    periods[known & (days <= 23)] = 24
+    periods[known & (days <= 16)] = 26
+    periods[known & (days <= 8)] = 52
+    return periods
+
+
+def contribution_rates(gross_pay: np.ndarray, current_401k: np.ndarray) -> np.ndarray:
+    gross = np.asarray(gross_pay, dtype=np.float64)
+    current = np.asarray(current_401k, dtype=np.float64)
+    rates = np.zeros(gross.shape, dtype=np.float64)
+    np.divide(current, gross, out=rates, where=gross != 0)
+    return rates
+
+
+# Same sequential walk as compute_match_from_tiers, one tier at a time across the cohort
+def match_from_tiers(contribution_rate: np.ndarray, tiers: Tuple[Tuple[float, float], ...]) -> np.ndarray:
+    remaining = np.maximum(np.asarray(contribution_rate, dtype=np.float64), 0.0)
+    match_percent = np.zeros(remaining.shape, dtype=np.float64)
+    for rate, limit in tiers:
+        active = remaining > 0
+        applied = np.where(active, np.minimum(remaining, limit), 0.0)
+        match_percent = np.where(active, match_percent + applied * rate, match_percent)
+        remaining = np.where(active, remaining - applied, remaining)
+    return match_percent
+
+
+def leaked_value(
+    gross_pay: np.ndarray,
+    contribution_rate: np.ndarray,
+    pay_periods_per_year: np.ndarray,
+    formula: MatchFormula,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (gap_rate, annual_opportunity_cost) for every employee.
+    Both are rounded like Python's round (4 and 2 places), so each value
+    equals what compute_leaked_value returns for the same paystub.
+    """
+    gross = np.asarray(gross_pay, dtype=np.float64)
+    rate = np.asarray(contribution_rate, dtype=np.float64)
+    periods = np.asarray(pay_periods_per_year)
+    if formula.tiered:
+        current_match = match_from_tiers(rate, formula.tiers)
+        gap_rate = np.maximum(formula.max_contribution_percent - rate, 0.0)
+        annual = gross * np.maximum(formula.max_match_percent - current_match, 0.0) * periods
+    else:
+        gap_rate = np.maximum(formula.match_up_to - rate, 0.0)
+        annual = gross * gap_rate * formula.match_rate * periods
+    return round_like_python(gap_rate, 4), round_like_python(annual, 2)
+
+
+# Vector form of verify_paystub_math: status codes plus whether taxes sit inside deductions
+def payroll_integrity(
+    gross_pay: np.ndarray, net_pay: np.ndarray, total_taxes: np.ndarray, total_deductions: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    gross = np.asarray(gross_pay, dtype=np.float64)
+    net = np.asarray(net_pay, dtype=np.float64)
+    taxes = np.asarray(total_taxes, dtype=np.float64)
+    deductions = np.asarray(total_deductions, dtype=np.float64)
+    unknown = (taxes == 0) & (deductions == 0)
+    direct = np.abs(gross - taxes - deductions - net) < 1.0
+    taxes_in_deductions = ~unknown & ~direct & (np.abs(gross - deductions - net) < 1.0)
+    status = np.full(gross.shape, INTEGRITY_INCORRECT, dtype=np.int8)
+    status[direct | taxes_in_deductions] = INTEGRITY_CORRECT
+    status[unknown] = INTEGRITY_UNKNOWN
+    return status, taxes_in_deductions
+
+
+def analyze_cohort(cohort: CohortArrays, formula: MatchFormula) -> CohortResult:
+    rates = contribution_rates(cohort.gross_pay, cohort.current_401k)
+    periods = periods_per_year_from_days(cohort.period_days)
+    gap_rate, annual_cost = leaked_value(cohort.gross_pay, rates, periods, formula)
+    status, taxes_in_deductions = payroll_integrity(
+        cohort.gross_pay, cohort.net_pay, cohort.total_taxes, cohort.total_deductions
+    )
+    return CohortResult(
+        contribution_rate=rates,
+        gap_rate=gap_rate,
+        annual_opportunity_cost=annual_cost,
+        pay_periods_per_year=periods,
+        integrity_status=status,
+        taxes_in_deductions=taxes_in_deductions,
+    )
+
+
+# Cohort-level "money left on the table" report
+def summarize_cohort(result: CohortResult) -> Dict[str, Any]:
+    costs = result.annual_opportunity_cost
+    leaking = costs > 0
+    status_counts = np.bincount(result.integrity_status, minlength=len(INTEGRITY_STATUS_NAMES))
+    return {
+        "employees": int(costs.size),
+        "employees_leaking": int(leaking.sum()),
+        "total_annual_opportunity_cost": round(float(costs.sum()), 2),
+        "mean_annual_opportunity_cost": round(float(costs.mean()), 2) if costs.size else 0.0,
+        "median_annual_opportunity_cost": round(float(np.median(costs[leaking])), 2) if leaking.any() else 0.0,
+        "mean_gap_rate": round(float(result.gap_rate[leaking].mean()), 4) if leaking.any() else 0.0,
+        "payroll_integrity": {
+            name: int(count) for name, count in zip(INTEGRITY_STATUS_NAMES, status_counts)
+        },
+    }
+
+
+def round_like_python(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Element-wise equivalent of Python's round(value, digits).
+    np.round rounds the scaled product, which can land on the other side of
+    a half and differ in the last place. Away from a half the scaled product
+    has the same nearest integer as the exact value, and integer / 10**digits
+    is then the same correctly rounded float Python returns. The few
+    elements close to a half, huge or non-finite, go through round() itself.
+    """
+    array = np.asarray(values, dtype=np.float64)
+    scale = 10.0**digits
+    scaled = array * scale
+    with np.errstate(invalid="ignore"):
+        rounded = np.rint(scaled) / scale
+        # Generous margin around a half: several ulps of the scaled value, and never below 1e-9
+        margin = np.abs(scaled) * 1e-12 + 1e-9
+        ambiguous = ~(np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) > margin) | ~(np.abs(scaled) < 2.0**52)
+    if ambiguous.any():
+        rounded[ambiguous] = [round(value, digits) for value in array[ambiguous].tolist()]
+    return rounded
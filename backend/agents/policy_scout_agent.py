@@ -1,28 +1,52 @@
+import asyncio
 import json
 import os
 import re
+import sqlite3
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from functools import partial
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
 from agents.extractor_agent import (
-    ExtractorConfig,
     GeminiClient,
     Tracer,
     get_env_value,
     get_track_decorator,
     get_tracer,
     guess_mime_type,
-    read_file_base64,
+    load_gemini_config,
 )
 from constants.app_defaults import (
     DEFAULT_POLICY_CHUNK_OVERLAP,
     DEFAULT_POLICY_CHUNK_SIZE,
+    DEFAULT_POLICY_FALLBACK_MAX_PAGES,
+    DEFAULT_POLICY_INDEX_MAX_HANDBOOKS,
+    DEFAULT_POLICY_INDEX_MEMORY_ENTRIES,
+    DEFAULT_POLICY_PDF_BATCH_PAGES,
+    DEFAULT_POLICY_PDF_MAX_WORKERS,
+    DEFAULT_POLICY_PDF_MIN_TEXT_CHARS,
+    DEFAULT_POLICY_PDF_PARALLEL_MIN_PAGES,
     DEFAULT_POLICY_PROMPT_PREFIX,
     DEFAULT_POLICY_PROMPT_SUFFIX,
     DEFAULT_POLICY_TOP_K,
+    HANDBOOK_INDEX_VERSION,
 )
-from constants.policy_constants import BOOSTED_QUERY, KEYWORDS
+from constants.policy_constants import BOOSTED_QUERY, EARLY_STOP_TERM_GROUPS, KEYWORDS
 from utils.asset_picker import pick_handbook
+from utils.bm25_index import BM25Index, build_postings
+from utils.cache_store import default_cache_dir
+from utils.handbook_index import HandbookIndex, HandbookRecord
+from utils.hashing import canonical_hash, sha256_file
+from utils.metrics import count, stage_timer, timed_stage
+from utils.pdf_text import prune_pdf, read_pdf_text as read_pdf_pages_text
+from utils.request_body import InlineData
+
+
+@dataclass
+class PendingPolicyAnswer:
+    request_body: Dict[str, Any]
+    finalize: Callable[[str], Dict[str, Any]]
 
 
 @dataclass
@@ -33,13 +57,24 @@ class PolicyScoutConfig:
     chunk_overlap: int
     prompt_prefix: str
     prompt_suffix: str
+    pdf_workers: int = 0
+    pdf_early_stop: bool = False
+    handbook_sha256: str | None = None
+    fallback_max_pages: int = DEFAULT_POLICY_FALLBACK_MAX_PAGES
 
 
 class PolicyScoutAgent:
-    def __init__(self, client: GeminiClient, tracer: Tracer, config: PolicyScoutConfig) -> None:
+    def __init__(
+        self,
+        client: GeminiClient,
+        tracer: Tracer,
+        config: PolicyScoutConfig,
+        index: HandbookIndex | None = None,
+    ) -> None:
         self.client = client
         self.tracer = tracer
         self.config = config
+        self.index = index
 
     def _preview(self, text: str, max_len: int = 400) -> str:
         if not text:
@@ -47,7 +82,32 @@ class PolicyScoutAgent:
         return text[:max_len] + ("…" if len(text) > max_len else "")
 
     @get_track_decorator()
+    @timed_stage("policy_scout")
     def answer(self, question: str) -> Dict[str, Any]:
+        prepared = self._prepare_answer(question)
+        if isinstance(prepared, PendingPolicyAnswer):
+            with stage_timer("policy_llm"):
+                response_text = self.client.generate_content(prepared.request_body)
+            result = prepared.finalize(response_text)
+            self.client.remember_response(prepared.request_body, response_text)
+            return result
+        return prepared
+
+    # Async variant of answer; handbook parsing runs off the event loop
+    @get_track_decorator()
+    @timed_stage("policy_scout")
+    async def answer_async(self, question: str) -> Dict[str, Any]:
+        prepared = await asyncio.to_thread(self._prepare_answer, question)
+        if isinstance(prepared, PendingPolicyAnswer):
+            with stage_timer("policy_llm"):
+                response_text = await self.client.generate_content_async(prepared.request_body)
+            result = prepared.finalize(response_text)
+            await self.client.remember_response_async(prepared.request_body, response_text)
+            return result
+        return prepared
+
+    # Resolve the answer locally, or return the LLM request still needed to finish it
+    def _prepare_answer(self, question: str) -> Dict[str, Any] | PendingPolicyAnswer:
         # Locate raw policy text for matching and vesting math
         self.tracer.log_step("policy_question_received", {"question": question})
         mock_response = os.getenv("POLICY_MOCK_RESPONSE")
@@ -60,59 +120,164 @@ class PolicyScoutAgent:
                 "conflicts": False,
             }
         try:
-            text = load_handbook_text(self.config.handbook_path)
-            self.tracer.log_step("policy_handbook_loaded", {"characters": len(text)})
-            sections, conflicts = find_policy_sections(text)
-            self.tracer.log_step(
-                "policy_sections_found",
-                {"count": len(sections), "conflicts": conflicts},
-            )
-            if sections:
-                answer_text = "\n\n---\n\n".join(sections)
-                return {
-                    "question": question,
-                    "answer": answer_text,
-                    "sources": [],
-                    "conflicts": conflicts,
-                }
-            self.tracer.log_step("policy_section_fallback", {"reason": "no sections matched"})
-            chunks = chunk_text(text, self.config.chunk_size, self.config.chunk_overlap)
-            self.tracer.log_step("policy_chunks_created", {"count": len(chunks)})
-            matches = retrieve_chunks(BOOSTED_QUERY, chunks, self.config.top_k)
-            self.tracer.log_step("policy_chunks_retrieved", {"count": len(matches)})
-            prompt = build_prompt(question, matches, self.config.prompt_prefix, self.config.prompt_suffix)
-            self.tracer.log_step("policy_prompt_built", {"length": len(prompt)})
-            self.tracer.log_step("policy_prompt_preview", {"preview": self._preview(prompt), "full_prompt": prompt})
-            response_text = self.client.generate_content(build_request(prompt))
-            self.tracer.log_step("policy_response_received", {"length": len(response_text), "full_response": response_text})
-            answer_text = extract_text_response(response_text)
-            self.tracer.log_step("policy_answer_preview", {"preview": self._preview(answer_text), "full_answer": answer_text})
-            return {
-                "question": question,
-                "answer": answer_text,
-                "sources": matches,
-                "conflicts": conflicts,
-                "confidence": classify_policy_confidence(sections, conflicts),
-            }
+            with stage_timer("handbook_load") as timing:
+                handbook, chunk_index = self._load_handbook()
         except RuntimeError as exc:
             if not self.config.handbook_path.lower().endswith(".pdf"):
                 raise
             if "PDF support requires" not in str(exc):
                 raise
-            self.tracer.log_step("policy_pdf_fallback", {"reason": str(exc)})
-            data = read_file_base64(self.config.handbook_path)
-            mime_type = guess_mime_type(self.config.handbook_path)
-            prompt = build_direct_prompt(question, self.config.prompt_prefix, self.config.prompt_suffix)
-            response_text = self.client.generate_content(build_file_request(prompt, mime_type, data))
-            self.tracer.log_step("policy_response_received", {"length": len(response_text), "full_response": response_text})
-            answer_text = extract_text_response(response_text)
-            self.tracer.log_step("policy_answer_preview", {"preview": self._preview(answer_text), "full_answer": answer_text})
+            return self._prepare_file_fallback(question, str(exc))
+        self.tracer.log_step(
+            "policy_handbook_loaded", {"characters": len(handbook.text), "duration_ms": timing.duration_ms}
+        )
+        if (
+            self.config.handbook_path.lower().endswith(".pdf")
+            and len(handbook.text.strip()) < DEFAULT_POLICY_PDF_MIN_TEXT_CHARS
+        ):
+            # Scanned handbook without a text layer: let the model read the pages
+            return self._prepare_file_fallback(question, "no extractable text")
+        sections, conflicts = list(handbook.sections), handbook.conflicts
+        self.tracer.log_step(
+            "policy_sections_found",
+            {"count": len(sections), "conflicts": conflicts},
+        )
+        if sections:
+            answer_text = "\n\n---\n\n".join(sections)
             return {
                 "question": question,
                 "answer": answer_text,
                 "sources": [],
-                "conflicts": False,
+                "conflicts": conflicts,
             }
+        self.tracer.log_step("policy_section_fallback", {"reason": "no sections matched"})
+        chunks = list(handbook.chunks)
+        self.tracer.log_step("policy_chunks_created", {"count": len(chunks)})
+        with stage_timer("policy_retrieval") as timing:
+            matches = retrieve_from_index(BOOSTED_QUERY, chunk_index, chunks, self.config.top_k)
+        self.tracer.log_step("policy_chunks_retrieved", {"count": len(matches), "duration_ms": timing.duration_ms})
+        prompt = build_prompt(question, matches, self.config.prompt_prefix, self.config.prompt_suffix)
+        self.tracer.log_step("policy_prompt_built", {"length": len(prompt)})
+        self.tracer.log_step("policy_prompt_preview", {"preview": self._preview(prompt), "full_prompt": prompt})
+        return PendingPolicyAnswer(
+            request_body=build_request(prompt),
+            finalize=lambda response_text: self._finalize_answer(
+                question,
+                response_text,
+                sources=matches,
+                conflicts=conflicts,
+                confidence=classify_policy_confidence(sections, conflicts),
+            ),
+        )
+
+    # Send the handbook itself to the model, cut down to the pages likely to hold the policy.
+    # Scanned handbooks can only be cut down through their outline; otherwise the whole file is sent
+    def _prepare_file_fallback(self, question: str, reason: str) -> PendingPolicyAnswer:
+        self.tracer.log_step("policy_pdf_fallback", {"reason": reason})
+        path = self.config.handbook_path
+        pruned = None
+        if self.config.fallback_max_pages > 0:
+            with stage_timer("handbook_prune") as timing:
+                try:
+                    pruned = prune_pdf(path, KEYWORDS, self.config.fallback_max_pages)
+                    outcome = "pruned" if pruned is not None else "unmatched"
+                except Exception as exc:
+                    # No PyPDF2 or an unreadable file: send the whole document as before
+                    self.tracer.log_step("policy_pdf_prune_skipped", {"reason": str(exc)})
+                    outcome = "error"
+            if outcome == "unmatched":
+                # No page text or outline title matched, or every page would be kept
+                self.tracer.log_step("policy_pdf_prune_skipped", {"reason": "no candidate pages"})
+            count_pdf_prune(outcome)
+        if pruned is not None:
+            data = InlineData.from_bytes(pruned.data)
+            self.tracer.log_step(
+                "policy_pdf_pruned",
+                {
+                    "pages": [page + 1 for page in pruned.pages],
+                    "total_pages": pruned.total_pages,
+                    "bytes": len(pruned.data),
+                    "original_bytes": os.path.getsize(path),
+                    "duration_ms": timing.duration_ms,
+                },
+            )
+            mime_type = "application/pdf"
+        else:
+            data = InlineData.from_file(path)
+            mime_type = guess_mime_type(path)
+        prompt = build_direct_prompt(question, self.config.prompt_prefix, self.config.prompt_suffix)
+        return PendingPolicyAnswer(
+            request_body=build_file_request(prompt, mime_type, data),
+            finalize=lambda response_text: self._finalize_answer(
+                question, response_text, sources=[], conflicts=False
+            ),
+        )
+
+    # Parse the handbook once per distinct content, reusing the persistent index when enabled
+    def _load_handbook(self) -> Tuple[HandbookRecord, BM25Index]:
+        path = self.config.handbook_path
+        if not os.path.isfile(path):
+            raise RuntimeError(f"Handbook not found: {path}")
+        content_hash = self.config.handbook_sha256 or sha256_file(path)
+        index_key = build_handbook_index_key(
+            content_hash,
+            self.config.chunk_size,
+            self.config.chunk_overlap,
+            pdf_early_stop=self.config.pdf_early_stop,
+        )
+        if self.index is not None:
+            record = self.index.get(index_key)
+            if record is not None:
+                self.tracer.log_step("policy_index_hit", {"index_key": index_key})
+                return record, BM25Index(
+                    record.chunk_lengths,
+                    postings_lookup=partial(self.index.postings, index_key),
+                )
+        record, postings = build_handbook_record(
+            index_key,
+            content_hash,
+            path,
+            self.config.chunk_size,
+            self.config.chunk_overlap,
+            pdf_workers=self.config.pdf_workers,
+            pdf_early_stop=self.config.pdf_early_stop,
+        )
+        if self.index is not None:
+            self.index.put(record, postings)
+            self.tracer.log_step(
+                "policy_index_built",
+                {"index_key": index_key, "chunks": len(record.chunks), "terms": len(postings)},
+            )
+        return record, BM25Index(record.chunk_lengths, postings=postings)
+
+    def _finalize_answer(
+        self,
+        question: str,
+        response_text: str,
+        sources: List[Dict[str, Any]],
+        conflicts: bool,
+        confidence: str | None = None,
+    ) -> Dict[str, Any]:
+        self.tracer.log_step("policy_response_received", {"length": len(response_text), "full_response": response_text})
+        answer_text = extract_text_response(response_text)
+        self.tracer.log_step("policy_answer_preview", {"preview": self._preview(answer_text), "full_answer": answer_text})
+        result = {
+            "question": question,
+            "answer": answer_text,
+            "sources": sources,
+            "conflicts": conflicts,
+        }
+        if confidence is not None:
+            result["confidence"] = confidence
+        return result
+
+
+def count_pdf_prune(outcome: str) -> None:
+    count(
+        "vesting_buddy_policy_pdf_prune_total",
+        "Handbook PDF fallbacks by page pruning outcome (pruned, unmatched, error)",
+        outcome=outcome,
+    )
 
 
 def build_request(prompt: str) -> Dict[str, Any]:
@@ -127,7 +292,7 @@ def build_request(prompt: str) -> Dict[str, Any]:
     }
 
 
-def build_file_request(prompt: str, mime_type: str, base64_data: str) -> Dict[str, Any]:
+def build_file_request(prompt: str, mime_type: str, base64_data: InlineData | str) -> Dict[str, Any]:
     return {
         "contents": [
             {
@@ -220,23 +385,29 @@ def extract_keyword_windows(text: str) -> List[str]:
 
 
 def retrieve_chunks(question: str, chunks: List[str], top_k: int) -> List[Dict[str, Any]]:
-    query_tokens = normalize_tokens(question)
-    if not query_tokens:
-        return []
-    scored: List[Tuple[int, float, str]] = []
-    for index, chunk in enumerate(chunks):
-        tokens = normalize_tokens(chunk)
-        if not tokens:
-            continue
-        token_set = set(tokens)
-        score = sum(1 for token in query_tokens if token in token_set)
-        if score:
-            scored.append((index, score / max(len(tokens), 1), chunk))
-    scored.sort(key=lambda item: item[1], reverse=True)
-    results = []
-    for index, score, text in scored[:top_k]:
-        results.append({"index": index, "score": score, "text": text})
-    return results
+    index = BM25Index.from_documents(chunks, normalize_tokens)
+    return retrieve_from_index(question, index, chunks, top_k)
+
+
+# Rank chunks for a question with BM25 against a prebuilt index
+def retrieve_from_index(
+    question: str, index: BM25Index, chunks: Sequence[str], top_k: int
+) -> List[Dict[str, Any]]:
+    return [
+        {"index": chunk_index, "score": score, "text": chunks[chunk_index]}
+        for chunk_index, score in index.search(normalize_tokens(question), top_k)
+    ]
+
+
+# Rank chunks for many questions against one index in a single pass
+def retrieve_many_from_index(
+    questions: Sequence[str], index: BM25Index, chunks: Sequence[str], top_k: int
+) -> List[List[Dict[str, Any]]]:
+    ranked = index.search_many([normalize_tokens(question) for question in questions], top_k)
+    return [
+        [{"index": chunk_index, "score": score, "text": chunks[chunk_index]} for chunk_index, score in hits]
+        for hits in ranked
+    ]
 
 
 def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
@@ -292,7 +463,55 @@ def apply_overlap(chunks: List[str], overlap: int) -> List[str]:
     return overlapped
 
 
-def load_handbook_text(path: str) -> str:
+def build_handbook_index_key(
+    content_hash: str, chunk_size: int, chunk_overlap: int, pdf_early_stop: bool = False
+) -> str:
+    return canonical_hash(
+        {
+            "content_sha256": content_hash,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            # A truncated parse must never be served for a full-parse lookup
+            "pdf_early_stop": pdf_early_stop,
+            "version": HANDBOOK_INDEX_VERSION,
+        }
+    )
+
+
+# Parse, section and chunk a handbook, returning the record and its token postings
+def build_handbook_record(
+    index_key: str,
+    content_hash: str,
+    path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    pdf_workers: int = 0,
+    pdf_early_stop: bool = False,
+) -> Tuple[HandbookRecord, Dict[str, Dict[int, int]]]:
+    stop_when = PolicySectionScanner() if pdf_early_stop else None
+    with stage_timer("handbook_parse"):
+        raw_text = load_handbook_text(path, stop_when=stop_when, pdf_workers=pdf_workers)
+    text = re.sub(r"\s+", " ", raw_text).strip()
+    with stage_timer("handbook_sections"):
+        sections, conflicts = find_policy_sections(text)
+    with stage_timer("handbook_chunking"):
+        chunks = chunk_text(text, chunk_size, chunk_overlap)
+        postings, chunk_lengths = build_postings(chunks, normalize_tokens)
+    record = HandbookRecord(
+        index_key=index_key,
+        content_hash=content_hash,
+        text=text,
+        sections=tuple(sections),
+        conflicts=conflicts,
+        chunks=tuple(chunks),
+        chunk_lengths=tuple(chunk_lengths),
+    )
+    return record, postings
+
+
+def load_handbook_text(
+    path: str, stop_when: Callable[[str], bool] | None = None, pdf_workers: int = 0
+) -> str:
     if not os.path.isfile(path):
         raise RuntimeError(f"Handbook not found: {path}")
     ext = os.path.splitext(path)[1].lower()
@@ -301,7 +520,7 @@ def load_handbook_text(path: str) -> str:
     if ext == ".json":
         return read_json_text(path)
     if ext == ".pdf":
-        return read_pdf_text(path)
+        return read_pdf_text(path, stop_when=stop_when, workers=pdf_workers)
     return read_text_file(path)
 
 
@@ -325,55 +544,132 @@ def read_json_text(path: str) -> str:
     return str(payload)
 
 
-def read_pdf_text(path: str) -> str:
-    try:
-        from PyPDF2 import PdfReader
+# Stream page text, fanning large documents out over worker processes
+def read_pdf_text(path: str, stop_when: Callable[[str], bool] | None = None, workers: int = 0) -> str:
+    return read_pdf_pages_text(
+        path,
+        stop_when=stop_when,
+        workers=workers,
+        min_parallel_pages=int(
+            get_env_value("POLICY_PDF_PARALLEL_MIN_PAGES", default=str(DEFAULT_POLICY_PDF_PARALLEL_MIN_PAGES))
+        ),
+        batch_pages=int(get_env_value("POLICY_PDF_BATCH_PAGES", default=str(DEFAULT_POLICY_PDF_BATCH_PAGES))),
+    )
 
-        reader = PdfReader(path)
-        return "\n".join(page.extract_text() or "" for page in reader.pages)
-    except Exception:
-        try:
-            import pdfplumber
-        except Exception as exc:
-            raise RuntimeError("PDF support requires PyPDF2 or pdfplumber") from exc
-        text_parts: List[str] = []
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                text_parts.append(page.extract_text() or "")
-        return "\n".join(text_parts)
-
-
-def load_policy_scout_from_env(handbook_path: str | None = None) -> PolicyScoutAgent:
-    handbook_path = handbook_path or os.getenv("POLICY_HANDBOOK_PATH")
+
+class PolicySectionScanner:
+    """
+    Page-by-page stop condition for PDF extraction.
+    Stops once every EARLY_STOP_TERM_GROUPS group has been seen and a later
+    page without policy terms opens a new section, closing the last hit.
+    """
+
+    def __init__(self) -> None:
+        self.seen: set[str] = set()
+        self.section_open = False
+        self.header_pattern = re.compile(r"section\s+\d+(?:\.\d+)?\s*:", re.IGNORECASE)
+
+    def __call__(self, page_text: str) -> bool:
+        lowered = page_text.lower()
+        hits = {name for name, terms in EARLY_STOP_TERM_GROUPS if any(term in lowered for term in terms)}
+        if hits:
+            self.seen.update(hits)
+            self.section_open = True
+        elif self.section_open and self.header_pattern.search(page_text):
+            self.section_open = False
+        return not self.section_open and len(self.seen) == len(EARLY_STOP_TERM_GROUPS)
+
+
+# Handbook used when none is passed: POLICY_HANDBOOK_PATH, else the bundled assets
+def default_handbook_path() -> str:
+    handbook_path = os.getenv("POLICY_HANDBOOK_PATH")
     if not handbook_path:
         asset_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
         handbook_path = pick_handbook(asset_dir)
+    return handbook_path
+
+
+def load_policy_scout_config(
+    handbook_path: str | None = None, handbook_sha256: str | None = None
+) -> PolicyScoutConfig:
     top_k = int(get_env_value("POLICY_TOP_K", default=str(DEFAULT_POLICY_TOP_K)))
     chunk_size = int(get_env_value("POLICY_CHUNK_SIZE", default=str(DEFAULT_POLICY_CHUNK_SIZE)))
     chunk_overlap = int(get_env_value("POLICY_CHUNK_OVERLAP", default=str(DEFAULT_POLICY_CHUNK_OVERLAP)))
     prompt_prefix = get_env_value("POLICY_PROMPT_PREFIX", default=DEFAULT_POLICY_PROMPT_PREFIX)
     prompt_suffix = get_env_value("POLICY_PROMPT_SUFFIX", default=DEFAULT_POLICY_PROMPT_SUFFIX)
-    config = PolicyScoutConfig(
-        handbook_path=handbook_path,
+    pdf_workers = int(
+        get_env_value(
+            "POLICY_PDF_WORKERS",
+            default=str(min(DEFAULT_POLICY_PDF_MAX_WORKERS, os.cpu_count() or 1)),
+        )
+    )
+    pdf_early_stop = get_env_value("POLICY_PDF_EARLY_STOP", default="false").lower() in {"1", "true", "yes"}
+    fallback_max_pages = int(
+        get_env_value("POLICY_FALLBACK_MAX_PAGES", default=str(DEFAULT_POLICY_FALLBACK_MAX_PAGES))
+    )
+    return PolicyScoutConfig(
+        handbook_path=handbook_path or "",
         top_k=top_k,
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
         prompt_prefix=prompt_prefix,
         prompt_suffix=prompt_suffix,
+        pdf_workers=pdf_workers,
+        pdf_early_stop=pdf_early_stop,
+        handbook_sha256=handbook_sha256,
+        fallback_max_pages=fallback_max_pages,
     )
-    client = GeminiClient(load_gemini_config())
-    return PolicyScoutAgent(client, get_tracer(), config)
 
 
-def load_gemini_config() -> ExtractorConfig:
-    return ExtractorConfig(
-        api_key=get_env_value("GEMINI_API_KEY", required=True),
-        model=get_env_value("GEMINI_MODEL", required=True),
-        timeout_seconds=int(get_env_value("GEMINI_TIMEOUT_SECONDS", required=True)),
-        api_version=get_env_value("GEMINI_API_VERSION", required=True),
-        base_url=get_env_value("GEMINI_BASE_URL", required=True),
+def load_policy_scout_from_env(
+    handbook_path: str | None = None,
+    handbook_sha256: str | None = None,
+    client: GeminiClient | None = None,
+    tracer: Tracer | None = None,
+) -> PolicyScoutAgent:
+    config = load_policy_scout_config(handbook_path or default_handbook_path(), handbook_sha256)
+    return PolicyScoutAgent(
+        (client or GeminiClient(load_gemini_config())).for_agent("policy_scout"),
+        tracer or get_tracer(),
+        config,
+        get_handbook_index(),
     )
 
+
+_HANDBOOK_INDEX: HandbookIndex | None = None
+_HANDBOOK_INDEX_LOADED = False
+_HANDBOOK_INDEX_LOCK = threading.Lock()
+
+
+# Return the process-wide handbook index, or None when POLICY_INDEX_ENABLED is off
+def get_handbook_index() -> HandbookIndex | None:
+    global _HANDBOOK_INDEX, _HANDBOOK_INDEX_LOADED
+    with _HANDBOOK_INDEX_LOCK:
+        if _HANDBOOK_INDEX_LOADED:
+            return _HANDBOOK_INDEX
+        _HANDBOOK_INDEX_LOADED = True
+        if get_env_value("POLICY_INDEX_ENABLED", default="true").lower() not in {"1", "true", "yes"}:
+            return None
+        path = get_env_value(
+            "POLICY_INDEX_PATH",
+            default=os.path.join(default_cache_dir(), "handbook_index.sqlite3"),
+        )
+        try:
+            _HANDBOOK_INDEX = HandbookIndex(
+                path,
+                memory_entries=int(
+                    get_env_value("POLICY_INDEX_MEMORY_ENTRIES", default=str(DEFAULT_POLICY_INDEX_MEMORY_ENTRIES))
+                ),
+                max_handbooks=int(
+                    get_env_value("POLICY_INDEX_MAX_HANDBOOKS", default=str(DEFAULT_POLICY_INDEX_MAX_HANDBOOKS))
+                ),
+            )
+        except (OSError, sqlite3.Error):
+            # Read-only or missing filesystem: parse per request as before
+            _HANDBOOK_INDEX = None
+        return _HANDBOOK_INDEX
+
+
 def classify_policy_confidence(sections: list[str], conflicts: bool) -> str:
     if not sections:
         return "low"
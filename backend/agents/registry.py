@@ -0,0 +1,103 @@
+import threading
+from dataclasses import dataclass, replace
+
+from agents.extractor_agent import (
+    ExtractorAgent,
+    ExtractorConfig,
+    GeminiClient,
+    Tracer,
+    get_tracer,
+    load_extractor_from_env,
+    load_gemini_config,
+)
+from agents.guardrail_agent import GuardrailAgent, load_guardrail_from_env
+from agents.policy_scout_agent import (
+    PolicyScoutAgent,
+    PolicyScoutConfig,
+    default_handbook_path,
+    get_handbook_index,
+    load_policy_scout_config,
+)
+from agents.strategist_agent import StrategistAgent, load_strategist_from_env
+from config_loader import load_env
+
+
+@dataclass(frozen=True)
+class AgentSet:
+    generation: int
+    gemini_config: ExtractorConfig
+    client: GeminiClient
+    policy_client: GeminiClient
+    tracer: Tracer
+    extractor: ExtractorAgent
+    strategist: StrategistAgent
+    guardrail: GuardrailAgent
+    policy_config: PolicyScoutConfig
+
+    # Policy scouts are bound to one handbook, so they are cheap per-request views over the shared client
+    def policy_scout(self, handbook_path: str | None = None, handbook_sha256: str | None = None) -> PolicyScoutAgent:
+        config = replace(
+            self.policy_config,
+            handbook_path=handbook_path or default_handbook_path(),
+            handbook_sha256=handbook_sha256,
+        )
+        return PolicyScoutAgent(self.policy_client, self.tracer, config, get_handbook_index())
+
+
+def build_agent_set(generation: int = 0) -> AgentSet:
+    gemini_config = load_gemini_config()
+    client = GeminiClient(gemini_config)
+    tracer = get_tracer()
+    return AgentSet(
+        generation=generation,
+        gemini_config=gemini_config,
+        client=client,
+        policy_client=client.for_agent("policy_scout"),
+        tracer=tracer,
+        extractor=load_extractor_from_env(client, tracer),
+        strategist=load_strategist_from_env(client, tracer),
+        guardrail=load_guardrail_from_env(client, tracer),
+        policy_config=load_policy_scout_config(),
+    )
+
+
+class AgentRegistry:
+    """
+    Application-scoped agents built once from env and shared by every request.
+    reload() re-reads the environment and swaps in a new AgentSet atomically;
+    requests already holding the previous set finish with it. A reload that
+    fails to build keeps the current set.
+    """
+
+    def __init__(self) -> None:
+        self._agents: AgentSet | None = None
+        self._lock = threading.Lock()
+
+    def current(self) -> AgentSet:
+        agents = self._agents
+        if agents is not None:
+            return agents
+        with self._lock:
+            if self._agents is None:
+                self._agents = build_agent_set()
+            return self._agents
+
+    def reload(self, env_path: str | None = None) -> AgentSet:
+        with self._lock:
+            load_env(env_path)
+            generation = self._agents.generation + 1 if self._agents is not None else 0
+            self._agents = build_agent_set(generation)
+            return self._agents
+
+
+_AGENT_REGISTRY: AgentRegistry | None = None
+_AGENT_REGISTRY_LOCK = threading.Lock()
+
+
+# Process-wide registry; agents are built on first use or at API startup
+def get_agent_registry() -> AgentRegistry:
+    global _AGENT_REGISTRY
+    with _AGENT_REGISTRY_LOCK:
+        if _AGENT_REGISTRY is None:
+            _AGENT_REGISTRY = AgentRegistry()
+        return _AGENT_REGISTRY
@@ -0,0 +1,139 @@
+import math
+import re
+from typing import Any, Dict
+
+import numpy as np
+
+from agents.leaked_value_engine import match_from_tiers, round_like_python
+from agents.strategist_agent import (
+    MatchFormula,
+    analyze_rsu,
+    estimate_periods_per_year,
+    to_float,
+)
+from constants.app_defaults import (
+    DEFAULT_SIMULATION_HORIZON_YEARS,
+    DEFAULT_SIMULATION_SWEEP_MAX_RATE,
+    DEFAULT_SIMULATION_SWEEP_STEP,
+)
+
+
+# Per-period employer match as a fraction of gross pay, for every contribution rate at once
+def match_percent_for_rates(rates: np.ndarray, formula: MatchFormula) -> np.ndarray:
+    rates = np.asarray(rates, dtype=np.float64)
+    if formula.tiered:
+        return match_from_tiers(rates, formula.tiers)
+    return np.minimum(np.maximum(rates, 0.0), formula.match_up_to) * formula.match_rate
+
+
+# Contribution rate at which the full employer match is captured
+def full_match_rate(formula: MatchFormula) -> float:
+    return formula.max_contribution_percent if formula.tiered else formula.match_up_to
+
+
+def contribution_grid(
+    max_rate: float = DEFAULT_SIMULATION_SWEEP_MAX_RATE, step: float = DEFAULT_SIMULATION_SWEEP_STEP
+) -> np.ndarray:
+    if step <= 0:
+        raise RuntimeError("Simulation step must be positive")
+    count = int(math.floor(max_rate / step + 1e-9)) + 1
+    return np.round(np.arange(count) * step, 6)
+
+
+def contribution_sweep(
+    paystub: Dict[str, Any], formula: MatchFormula, rates: np.ndarray | None = None
+) -> Dict[str, Any]:
+    """
+    What-if curve over employee contribution rates for one paystub.
+    Missed match uses the same formula as compute_leaked_value, so the point
+    at the paystub's own rate equals its annual_opportunity_cost.
+    """
+    rates = contribution_grid() if rates is None else np.asarray(rates, dtype=np.float64)
+    gross_pay = to_float(paystub.get("gross_pay") or paystub.get("base_pay"))
+    periods = estimate_periods_per_year(paystub)
+    match_percent = match_percent_for_rates(rates, formula)
+    annual_gross = gross_pay * periods
+    employee_annual = gross_pay * rates * periods
+    employer_annual = gross_pay * match_percent * periods
+    if formula.tiered:
+        missed = gross_pay * np.maximum(formula.max_match_percent - match_percent, 0.0) * periods
+    else:
+        missed = gross_pay * np.maximum(formula.match_up_to - rates, 0.0) * formula.match_rate * periods
+    current_401k = to_float(paystub.get("pre_tax_401k")) + to_float(paystub.get("roth_401k"))
+    return {
+        "pay_periods_per_year": periods,
+        "annual_gross_pay": round(annual_gross, 2),
+        "current_rate": round(current_401k / gross_pay, 4) if gross_pay else 0.0,
+        "full_match_rate": round(full_match_rate(formula), 4),
+        "rates": rates.tolist(),
+        "employee_annual_contribution": round_like_python(employee_annual, 2).tolist(),
+        "employer_annual_match": round_like_python(employer_annual, 2).tolist(),
+        "missed_annual_match": round_like_python(missed, 2).tolist(),
+        "total_annual_savings": round_like_python(employee_annual + employer_annual, 2).tolist(),
+    }
+
+
+# Vested fraction of employer money after each tenure; unknown schedules are treated as immediate
+def vesting_fraction(schedule: str | None, tenure_years: np.ndarray) -> np.ndarray:
+    tenure = np.asarray(tenure_years, dtype=np.float64)
+    text = (schedule or "").lower()
+    cliff = re.search(r"(\d+)-year cliff", text)
+    if cliff:
+        return np.where(tenure >= int(cliff.group(1)), 1.0, 0.0)
+    graded = re.search(r"graded over (\d+) years", text)
+    if graded:
+        return np.clip(np.floor(tenure) / int(graded.group(1)), 0.0, 1.0)
+    return np.ones(tenure.shape, dtype=np.float64)
+
+
+def project_horizon(
+    paystub: Dict[str, Any],
+    formula: MatchFormula,
+    contribution_rate: float | None = None,
+    rsu_data: Dict[str, Any] | None = None,
+    years: int = DEFAULT_SIMULATION_HORIZON_YEARS,
+    salary_growth: float = 0.0,
+    annual_return: float = 0.0,
+    tenure_years: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Year-by-year projection of contributions, employer match and vesting.
+    Contributions land at year end and balances grow at annual_return.
+    The next RSU vest is placed in the year it falls due.
+    """
+    gross_pay = to_float(paystub.get("gross_pay") or paystub.get("base_pay"))
+    periods = estimate_periods_per_year(paystub)
+    if contribution_rate is None:
+        current_401k = to_float(paystub.get("pre_tax_401k")) + to_float(paystub.get("roth_401k"))
+        contribution_rate = current_401k / gross_pay if gross_pay else 0.0
+    year_index = np.arange(1, max(years, 0) + 1, dtype=np.float64)
+    salary = gross_pay * periods * (1.0 + salary_growth) ** (year_index - 1)
+    match_percent = float(match_percent_for_rates(np.array([contribution_rate]), formula)[0])
+    employee = salary * contribution_rate
+    employer = salary * match_percent
+    # Future value of each year's deposit at the end of every later year
+    growth = (1.0 + annual_return) ** (year_index[:, None] - year_index[None, :])
+    deposited = np.tril(np.ones((year_index.size, year_index.size)))
+    employee_balance = (growth * deposited) @ employee
+    employer_balance = (growth * deposited) @ employer
+    vested = vesting_fraction(formula.vesting_schedule, tenure_years + year_index)
+    rsu_value = np.zeros(year_index.shape, dtype=np.float64)
+    rsu = analyze_rsu(rsu_data) if rsu_data else None
+    if rsu and rsu["days_remaining"] >= 0:
+        vest_year = int(rsu["days_remaining"] // 365)
+        if vest_year < year_index.size:
+            rsu_value[vest_year] = rsu["value_estimate"]
+    return {
+        "years": year_index.astype(int).tolist(),
+        "contribution_rate": round(contribution_rate, 4),
+        "vesting_schedule": formula.vesting_schedule or "immediate (assumed)",
+        "salary": round_like_python(salary, 2).tolist(),
+        "employee_contribution": round_like_python(employee, 2).tolist(),
+        "employer_match": round_like_python(employer, 2).tolist(),
+        "employee_balance": round_like_python(employee_balance, 2).tolist(),
+        "employer_balance": round_like_python(employer_balance, 2).tolist(),
+        "vested_fraction": vested.tolist(),
+        "vested_employer_balance": round_like_python(employer_balance * vested, 2).tolist(),
+        "rsu_vesting_value": round_like_python(rsu_value, 2).tolist(),
+        "rsu_analysis": rsu,
+    }
@@ -1,22 +1,27 @@
 import json
 import os
 import re
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Tuple
 
 from agents.extractor_agent import (
-    ExtractorConfig,
     GeminiClient,
     Tracer,
     get_env_value,
     get_track_decorator,
     get_tracer,
+    load_gemini_config,
 )
 from constants.app_defaults import (
+    DEFAULT_MATCH_FORMULA_CACHE_ENTRIES,
     DEFAULT_STRATEGIST_PROMPT_PREFIX,
     DEFAULT_STRATEGIST_PROMPT_SUFFIX,
 )
+from utils.hashing import canonical_hash
+from utils.metrics import stage_timer, timed_stage
 
 
 @dataclass
@@ -25,6 +30,39 @@ class StrategistConfig:
     prompt_suffix: str
 
 
+@dataclass(frozen=True)
+class MatchFormula:
+    """
+    An employer match policy parsed once from a policy answer.
+    Tiered formulas apply tiers up to max_contribution_percent; flat ones pay
+    match_rate up to match_up_to. Instances are immutable and shared from cache.
+    """
+
+    source_hash: str
+    tiered: bool
+    tiers: Tuple[Tuple[float, float], ...]
+    max_match_percent: float
+    max_contribution_percent: float
+    match_rate: float
+    match_up_to: float
+    cap_percent: float | None = None
+    true_up: bool | None = None
+    vesting_schedule: str | None = None
+
+    @property
+    def missing_match(self) -> bool:
+        return (self.match_rate == 0 or self.match_up_to == 0) and not self.tiered
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        payload["tiers"] = [list(tier) for tier in self.tiers]
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "MatchFormula":
+        return cls(**{**payload, "tiers": tuple((float(rate), float(limit)) for rate, limit in payload["tiers"])})
+
+
 class StrategistAgent:
     def __init__(self, client: GeminiClient, tracer: Tracer, config: StrategistConfig) -> None:
         self.client = client
@@ -37,11 +75,62 @@ class StrategistAgent:
         return text[:max_len] + ("…" if len(text) > max_len else "")
 
     @get_track_decorator()
-    def synthesize(self, paystub_data: Dict[str, Any], policy_answer: Dict[str, Any], rsu_data: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    @timed_stage("strategist")
+    def synthesize(
+        self,
+        paystub_data: Dict[str, Any],
+        policy_answer: Dict[str, Any],
+        rsu_data: Dict[str, Any] | None = None,
+        match_formula: MatchFormula | None = None,
+    ) -> Dict[str, Any]:
+        output = self._compute_output(paystub_data, policy_answer, rsu_data, match_formula)
+        if strategist_uses_llm():
+            request_body = self._build_llm_request(paystub_data, policy_answer, rsu_data)
+            with stage_timer("strategist_llm"):
+                response_text = self.client.generate_content(request_body)
+            self._apply_llm_response(output, response_text)
+            self.client.remember_response(request_body, response_text)
+        else:
+            self._apply_template_recommendation(output)
+        return output
+
+    # Async variant of synthesize; only the optional LLM call awaits
+    @get_track_decorator()
+    @timed_stage("strategist")
+    async def synthesize_async(
+        self,
+        paystub_data: Dict[str, Any],
+        policy_answer: Dict[str, Any],
+        rsu_data: Dict[str, Any] | None = None,
+        match_formula: MatchFormula | None = None,
+    ) -> Dict[str, Any]:
+        output = self._compute_output(paystub_data, policy_answer, rsu_data, match_formula)
+        if strategist_uses_llm():
+            request_body = self._build_llm_request(paystub_data, policy_answer, rsu_data)
+            with stage_timer("strategist_llm"):
+                response_text = await self.client.generate_content_async(request_body)
+            self._apply_llm_response(output, response_text)
+            await self.client.remember_response_async(request_body, response_text)
+        else:
+            self._apply_template_recommendation(output)
+        return output
+
+    @timed_stage("strategist_math")
+    def _compute_output(
+        self,
+        paystub_data: Dict[str, Any],
+        policy_answer: Dict[str, Any],
+        rsu_data: Dict[str, Any] | None,
+        match_formula: MatchFormula | None = None,
+    ) -> Dict[str, Any]:
         self.tracer.log_step("strategist_input_received", {"paystub_keys": sorted(paystub_data.keys())})
-        policy = parse_policy_answer(policy_answer.get("answer"))
-        self.tracer.log_step("strategist_policy_parsed", {"policy_keys": sorted(policy.keys())})
-        metrics = compute_leaked_value(paystub_data, policy)
+        # Callers analysing many employees against one policy pass the formula in pre-compiled
+        formula = match_formula or compile_match_formula(policy_answer.get("answer"))
+        self.tracer.log_step(
+            "strategist_policy_parsed",
+            {"formula": formula.source_hash, "tiered": formula.tiered, "precompiled": match_formula is not None},
+        )
+        metrics = compute_leaked_value(paystub_data, formula)
         metrics["employee_name"] = paystub_data.get("employee_name", "Employee")
         
         # Paystub Verification
@@ -52,36 +141,44 @@ class StrategistAgent:
         rsu_analysis = analyze_rsu(rsu_data) if rsu_data else None
 
         self.tracer.log_step("strategist_metrics_computed", metrics)
-        steps = build_action_plan(metrics, policy)
+        steps = build_action_plan(metrics, formula)
         reasoning = build_reasoning(metrics)
-        output = {
+        return {
             "leaked_value": metrics,
             "reasoning": reasoning,
             "action_plan": steps,
             "policy_conflicts": policy_answer.get("conflicts"),
             "rsu_analysis": rsu_analysis,
         }
-        use_llm = os.getenv("STRATEGIST_USE_LLM", "").lower() in {"1", "true", "yes"}
-        if use_llm:
-            prompt = build_prompt(self.config.prompt_prefix, paystub_data, policy_answer, self.config.prompt_suffix)
-            if rsu_data:
-                prompt += f"\n\nRSU Data:\n{json.dumps(rsu_data, ensure_ascii=False)}"
-            self.tracer.log_step("strategist_prompt_built", {"length": len(prompt)})
-            self.tracer.log_step("strategist_prompt_preview", {"preview": self._preview(prompt), "full_prompt": prompt})
-            response_text = self.client.generate_content(build_request(prompt))
-            self.tracer.log_step("strategist_response_received", {"length": len(response_text), "full_response": response_text})
-            output["recommendation"] = extract_text_response(response_text)
-            self.tracer.log_step(
-                "strategist_recommendation_preview",
-                {"preview": self._preview(output["recommendation"]), "full_recommendation": output["recommendation"]},
-            )
-        else:
-            output["recommendation"] = format_recommendation(output)
-            self.tracer.log_step(
-                "strategist_recommendation_preview",
-                {"preview": self._preview(output["recommendation"]), "full_recommendation": output["recommendation"]},
-            )
-        return output
+
+    def _build_llm_request(self, paystub_data: Dict[str, Any], policy_answer: Dict[str, Any], rsu_data: Dict[str, Any] | None) -> Dict[str, Any]:
+        prompt = build_prompt(self.config.prompt_prefix, paystub_data, policy_answer, self.config.prompt_suffix)
+        if rsu_data:
+            prompt += f"\n\nRSU Data:\n{json.dumps(rsu_data, ensure_ascii=False)}"
+        self.tracer.log_step("strategist_prompt_built", {"length": len(prompt)})
+        self.tracer.log_step("strategist_prompt_preview", {"preview": self._preview(prompt), "full_prompt": prompt})
+        return build_request(prompt)
+
+    def _apply_llm_response(self, output: Dict[str, Any], response_text: str) -> None:
+        self.tracer.log_step("strategist_response_received", {"length": len(response_text), "full_response": response_text})
+        output["recommendation"] = extract_text_response(response_text)
+        output["recommendation_source"] = "llm"
+        self.tracer.log_step(
+            "strategist_recommendation_preview",
+            {"preview": self._preview(output["recommendation"]), "full_recommendation": output["recommendation"]},
+        )
+
+    def _apply_template_recommendation(self, output: Dict[str, Any]) -> None:
+        output["recommendation"] = format_recommendation(output)
+        output["recommendation_source"] = "template"
+        self.tracer.log_step(
+            "strategist_recommendation_preview",
+            {"preview": self._preview(output["recommendation"]), "full_recommendation": output["recommendation"]},
+        )
+
+
+def strategist_uses_llm() -> bool:
+    return os.getenv("STRATEGIST_USE_LLM", "").lower() in {"1", "true", "yes"}
 
 
 def build_request(prompt: str) -> Dict[str, Any]:
@@ -177,51 +274,107 @@ def estimate_periods_per_year(paystub: Dict[str, Any]) -> int:
     return 12
 
 
-def compute_leaked_value(paystub: Dict[str, Any], policy: Dict[str, Any]) -> Dict[str, Any]:
+def compute_leaked_value(paystub: Dict[str, Any], policy: Dict[str, Any] | MatchFormula) -> Dict[str, Any]:
+    formula = policy if isinstance(policy, MatchFormula) else match_formula_from_policy(policy)
     gross_pay = to_float(paystub.get("gross_pay") or paystub.get("base_pay"))
     pre_tax = to_float(paystub.get("pre_tax_401k"))
     roth = to_float(paystub.get("roth_401k"))
     current_401k = pre_tax + roth
     contribution_rate = (current_401k / gross_pay) if gross_pay else 0.0
-    match_rate = to_percent(policy.get("match_percent"))
-    match_up_to = to_percent(policy.get("match_up_to_percent"))
-    tiers = []
-    tier_metadata = None
-    if (match_rate == 0 or match_up_to == 0) and policy.get("raw"):
-        extracted = extract_match_from_raw(policy.get("raw") or "")
-        match_rate = match_rate or extracted.get("match_percent", 0.0)
-        match_up_to = match_up_to or extracted.get("match_up_to_percent", 0.0)
-        tiers = extracted.get("tiers", [])
-        tier_metadata = extracted
-    tiers_present = bool(tiers)
-    if tiers_present:
-        max_match_percent = tier_metadata.get("max_match_percent", 0.0)
-        max_contribution_percent = tier_metadata.get("max_contribution_percent", 0.0)
-        current_match_percent = compute_match_from_tiers(contribution_rate, tiers)
-        gap_rate = max(max_contribution_percent - contribution_rate, 0.0)
-        annual_opportunity = gross_pay * max(max_match_percent - current_match_percent, 0.0) * periods_per_year(paystub=paystub)
-        match_rate = max_match_percent / max_contribution_percent if max_contribution_percent else 0.0
-        match_up_to = max_contribution_percent
+    periods = estimate_periods_per_year(paystub)
+    if formula.tiered:
+        current_match_percent = compute_match_from_tiers(contribution_rate, formula.tiers)
+        gap_rate = max(formula.max_contribution_percent - contribution_rate, 0.0)
+        annual_opportunity = gross_pay * max(formula.max_match_percent - current_match_percent, 0.0) * periods
         annual_opportunity_cost = round(annual_opportunity, 2)
     else:
-        gap_rate = max(match_up_to - contribution_rate, 0.0)
-        annual_opportunity_cost = round(gross_pay * gap_rate * match_rate * estimate_periods_per_year(paystub), 2)
-    periods = estimate_periods_per_year(paystub)
+        gap_rate = max(formula.match_up_to - contribution_rate, 0.0)
+        annual_opportunity_cost = round(gross_pay * gap_rate * formula.match_rate * periods, 2)
     return {
         "gross_pay": gross_pay,
         "current_401k": current_401k,
         "current_401k_rate": round(contribution_rate, 4),
-        "match_rate": round(match_rate, 4),
-        "match_up_to": round(match_up_to, 4),
+        "match_rate": round(formula.match_rate, 4),
+        "match_up_to": round(formula.match_up_to, 4),
         "gap_rate": round(gap_rate, 4),
         "annual_opportunity_cost": annual_opportunity_cost,
         "pay_periods_per_year": periods,
-        "policy_missing_match": (match_rate == 0 or match_up_to == 0) and not tiers_present,
-        "tiers_present": tiers_present,
-        "tiers": tiers,
+        "policy_missing_match": formula.missing_match,
+        "tiers_present": formula.tiered,
+        "tiers": list(formula.tiers),
     }
 
 
+_MATCH_FORMULAS: "OrderedDict[str, MatchFormula]" = OrderedDict()
+_MATCH_FORMULAS_LOCK = threading.Lock()
+
+
+# Parse a policy answer into a MatchFormula once per distinct answer text
+def compile_match_formula(answer_text: str | None) -> MatchFormula:
+    source_hash = canonical_hash(answer_text or "")
+    with _MATCH_FORMULAS_LOCK:
+        formula = _MATCH_FORMULAS.get(source_hash)
+        if formula is not None:
+            _MATCH_FORMULAS.move_to_end(source_hash)
+            return formula
+    formula = match_formula_from_policy(parse_policy_answer(answer_text), source_hash)
+    with _MATCH_FORMULAS_LOCK:
+        _MATCH_FORMULAS[source_hash] = formula
+        while len(_MATCH_FORMULAS) > DEFAULT_MATCH_FORMULA_CACHE_ENTRIES:
+            _MATCH_FORMULAS.popitem(last=False)
+    return formula
+
+
+def match_formula_from_policy(policy: Dict[str, Any], source_hash: str | None = None) -> MatchFormula:
+    raw = policy.get("raw") or ""
+    match_rate = to_percent(policy.get("match_percent"))
+    match_up_to = to_percent(policy.get("match_up_to_percent"))
+    extracted: Dict[str, Any] = {}
+    if (match_rate == 0 or match_up_to == 0) and raw:
+        extracted = extract_match_from_raw(raw)
+        match_rate = match_rate or extracted.get("match_percent", 0.0)
+        match_up_to = match_up_to or extracted.get("match_up_to_percent", 0.0)
+    tiers = tuple(extracted.get("tiers", []))
+    max_match_percent = extracted.get("max_match_percent", 0.0) if tiers else 0.0
+    max_contribution_percent = extracted.get("max_contribution_percent", 0.0) if tiers else 0.0
+    if tiers:
+        match_rate = max_match_percent / max_contribution_percent if max_contribution_percent else 0.0
+        match_up_to = max_contribution_percent
+    vesting = policy.get("vesting_schedule")
+    return MatchFormula(
+        source_hash=source_hash or canonical_hash(policy),
+        tiered=bool(tiers),
+        tiers=tiers,
+        max_match_percent=max_match_percent,
+        max_contribution_percent=max_contribution_percent,
+        match_rate=match_rate,
+        match_up_to=match_up_to,
+        cap_percent=extracted.get("cap_percent"),
+        true_up=detect_true_up(raw),
+        vesting_schedule=str(vesting) if vesting else detect_vesting_schedule(raw),
+    )
+
+
+def detect_true_up(raw_text: str) -> bool | None:
+    text = raw_text.lower()
+    if not re.search(r"true[\s-]?up", text):
+        return None
+    return not re.search(r"\b(?:no|not|without|never)\s+(?:\w+\s+){0,3}true[\s-]?up", text)
+
+
+def detect_vesting_schedule(raw_text: str) -> str | None:
+    text = raw_text.lower()
+    if re.search(r"(?:immediately|fully|100%)\s+vested|vest(?:s|ed)?\s+immediately", text):
+        return "immediate"
+    cliff = re.search(r"(\d+)[\s-]*years?\s+cliff|cliff\s+(?:vesting\s+)?(?:of|after)\s+(\d+)\s+years?", text)
+    if cliff:
+        return f"{cliff.group(1) or cliff.group(2)}-year cliff"
+    graded = re.search(r"(?:graded|graduated|ratabl[ey])\D{0,40}?(\d+)\s+years?", text)
+    if graded:
+        return f"graded over {graded.group(1)} years"
+    return None
+
+
 def build_reasoning(metrics: Dict[str, Any]) -> List[Dict[str, str]]:
     return [
         {
@@ -243,7 +396,7 @@ def build_reasoning(metrics: Dict[str, Any]) -> List[Dict[str, str]]:
 
 
 
-def build_action_plan(metrics: Dict[str, Any], policy: Dict[str, Any]) -> List[Dict[str, Any]]:
+def build_action_plan(metrics: Dict[str, Any], policy: MatchFormula | Dict[str, Any]) -> List[Dict[str, Any]]:
     actions = []
 
     if metrics["policy_missing_match"]:
@@ -477,7 +630,8 @@ def extract_match_from_raw(raw_text: str) -> Dict[str, float]:
     for rate, limit in re.findall(r"match\s+(\d+(?:\.\d+)?)\s*%\s+of\s+the\s+next\s+(\d+(?:\.\d+)?)\s*%", text):
         tiers.append((to_percent(rate), to_percent(limit)))
     cap_match = re.search(r"capped at\s+(\d+(?:\.\d+)?)\s*%", text)
-    max_match_percent = to_percent(cap_match.group(1)) if cap_match else 0.0
+    cap_percent = to_percent(cap_match.group(1)) if cap_match else None
+    max_match_percent = cap_percent or 0.0
     max_contribution_percent = sum(limit for _, limit in tiers)
     if tiers and max_match_percent == 0.0:
         max_match_percent = sum(rate * limit for rate, limit in tiers)
@@ -487,10 +641,11 @@ def extract_match_from_raw(raw_text: str) -> Dict[str, float]:
         "tiers": tiers,
         "max_match_percent": max_match_percent,
         "max_contribution_percent": max_contribution_percent,
+        "cap_percent": cap_percent,
     }
 
 
-def compute_match_from_tiers(contribution_rate: float, tiers: List[tuple[float, float]]) -> float:
+def compute_match_from_tiers(contribution_rate: float, tiers: Sequence[tuple[float, float]]) -> float:
     remaining = max(contribution_rate, 0.0)
     match_percent = 0.0
     for rate, limit in tiers:
@@ -506,19 +661,10 @@ def periods_per_year(paystub: Dict[str, Any]) -> int:
     return estimate_periods_per_year(paystub)
 
 
-def load_strategist_from_env() -> StrategistAgent:
+def load_strategist_from_env(client: GeminiClient | None = None, tracer: Tracer | None = None) -> StrategistAgent:
     prompt_prefix = get_env_value("STRATEGIST_PROMPT_PREFIX", default=DEFAULT_STRATEGIST_PROMPT_PREFIX)
     prompt_suffix = get_env_value("STRATEGIST_PROMPT_SUFFIX", default=DEFAULT_STRATEGIST_PROMPT_SUFFIX)
     config = StrategistConfig(prompt_prefix=prompt_prefix, prompt_suffix=prompt_suffix)
-    client = GeminiClient(load_gemini_config())
-    return StrategistAgent(client, get_tracer(), config)
-
-
-def load_gemini_config() -> ExtractorConfig:
-    return ExtractorConfig(
-        api_key=get_env_value("GEMINI_API_KEY", required=True),
-        model=get_env_value("GEMINI_MODEL", required=True),
-        timeout_seconds=int(get_env_value("GEMINI_TIMEOUT_SECONDS", required=True)),
-        api_version=get_env_value("GEMINI_API_VERSION", required=True),
-        base_url=get_env_value("GEMINI_BASE_URL", required=True),
+    return StrategistAgent(
+        (client or GeminiClient(load_gemini_config())).for_agent("strategist"), tracer or get_tracer(), config
     )
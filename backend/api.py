@@ -4,36 +4,118 @@ Run: uvicorn api:app --reload (from backend dir) or uvicorn api:app --reload --a
 Production: set BACKEND_CORS_ORIGINS; frontend uses NEXT_PUBLIC_BACKEND_URL.
 Chat model: set GEMINI_CHAT_MODEL (e.g. gemini-2.0-flash) or falls back to GEMINI_MODEL.
 """
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
+import contextvars
+import hmac
 import json
+import math
 import os
-import ssl
+import signal
+import threading
 import urllib.error
-import urllib.request
 import uuid
-from contextlib import asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack, asynccontextmanager
 from datetime import datetime
-from typing import Any, Callable
+from functools import partial
+from typing import Any, Awaitable, Callable
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, HttpUrl
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 from app import configure_opik
 from config_loader import load_env
-from constants.app_defaults import DEFAULT_POLICY_QUESTION
+from constants.app_defaults import (
+    DEFAULT_ANALYZE_EXECUTION_MODE,
+    DEFAULT_ANALYZE_MAX_WORKERS,
+    DEFAULT_BATCH_MAX_CONCURRENCY,
+    DEFAULT_POLICY_QUESTION,
+    DEFAULT_SIMULATION_HORIZON_YEARS,
+    DEFAULT_SIMULATION_SWEEP_MAX_RATE,
+    DEFAULT_SIMULATION_SWEEP_STEP,
+    MAX_SIMULATION_ANNUAL_RATE,
+    MAX_SIMULATION_HORIZON_YEARS,
+    MAX_SIMULATION_SWEEP_POINTS,
+    MAX_SIMULATION_TENURE_YEARS,
+)
 from constants.chat_prompt import VESTING_BUDDY_CHAT_SYSTEM_PROMPT
-from utils.url_download import download_url_to_temp
+from utils.http_transport import get_http_transport
+from utils.document_store import StoredDocument, get_document_store
+from utils.metrics import get_metrics_registry, stage_timer
+from utils.rate_limit import estimate_tokens, get_rate_limiter
+from utils.startup import import_modules, prewarm_targets, start_prewarm, startup_mode
+from utils.url_download import DownloadedFile, download_urls, remove_temp_file
+
+_IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+_STARTUP: dict[str, Any] = {"import_ms": round(_IMPORT_MS, 2), "prewarm": {}}
+
+
+# Agents are imported on first use so cold start only pays for FastAPI and the request models
+def get_agent_registry():
+    from agents.registry import get_agent_registry as registry
+
+    return registry()
+
+
+def _build_agents() -> None:
+    get_agent_registry().current()
+
+
+_PREWARMERS: dict[str, Callable[[], Any]] = {
+    "opik": configure_opik,
+    "agents": _build_agents,
+    "pdf": partial(import_modules, "PyPDF2", "pdfplumber"),
+    "numpy": partial(import_modules, "numpy", "agents.leaked_value_engine", "agents.simulation_engine"),
+}
+
 
 def _ensure_env() -> None:
     load_env(os.path.join(os.path.dirname(__file__), ".env"))
-    configure_opik()
+    # Budget mode leaves opik to the first traced call or STARTUP_PREWARM=opik
+    if startup_mode() == "eager":
+        configure_opik()
+
+
+# SIGHUP reloads agent config in this worker, like POST /admin/reload
+def _install_reload_signal() -> None:
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGHUP, lambda: asyncio.create_task(asyncio.to_thread(_reload_agents))
+        )
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        # No SIGHUP on this platform, or not running in the main thread
+        pass
+
+
+def _reload_agents() -> None:
+    try:
+        get_agent_registry().reload()
+    except RuntimeError:
+        # Keep serving with the previous agents; the admin endpoint reports the error
+        pass
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    started = time.perf_counter()
     _ensure_env()
+    mode = startup_mode()
+    if mode == "eager":
+        try:
+            # Build agents up front so the first request does not pay for it
+            await asyncio.to_thread(_build_agents)
+        except RuntimeError:
+            # Missing Gemini settings surface per request instead of blocking startup
+            pass
+    _install_reload_signal()
+    _STARTUP.update(mode=mode, lifespan_ms=round((time.perf_counter() - started) * 1000, 2))
+    start_prewarm(prewarm_targets(), _PREWARMERS, _STARTUP["prewarm"])
     yield
 
 app = FastAPI(title="Vesting Buddy API", lifespan=lifespan)
@@ -55,29 +137,120 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency by route template, so /documents/{document_id} stays one series
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        get_metrics_registry().histogram(
+            "vesting_buddy_http_request_duration_seconds",
+            "Time to response headers; streaming bodies continue after this",
+            ("method", "route", "status"),
+        ).observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+
 @app.exception_handler(RuntimeError)
 def runtime_error_handler(request, exc: RuntimeError):
     raise HTTPException(status_code=502, detail=str(exc))
 
+# Each document can be given as a URL or as an ID returned by /documents
+def _require_document(model: BaseModel, *names: str) -> None:
+    for name in names:
+        if not getattr(model, f"{name}_url") and not getattr(model, f"{name}_id"):
+            raise ValueError(f"{name}_url or {name}_id is required")
+
+
 class FileUrlRequest(BaseModel):
-    file_url: HttpUrl
+    file_url: HttpUrl | None = None
+    file_id: str | None = None
+
+    @model_validator(mode="after")
+    def _check_document(self):
+        _require_document(self, "file")
+        return self
 
 
 class PolicyAnswerRequest(BaseModel):
-    handbook_url: HttpUrl
+    handbook_url: HttpUrl | None = None
+    handbook_id: str | None = None
     question: str = DEFAULT_POLICY_QUESTION
 
+    @model_validator(mode="after")
+    def _check_document(self):
+        _require_document(self, "handbook")
+        return self
+
 class AnalyzeRequest(BaseModel):
-    paystub_url: HttpUrl
-    handbook_url: HttpUrl
+    paystub_url: HttpUrl | None = None
+    paystub_id: str | None = None
+    handbook_url: HttpUrl | None = None
+    handbook_id: str | None = None
     rsu_url: HttpUrl | None = None
+    rsu_id: str | None = None
     policy_question: str | None = None
 
+    @model_validator(mode="after")
+    def _check_document(self):
+        _require_document(self, "paystub", "handbook")
+        return self
+
+class BatchEmployeeRequest(BaseModel):
+    employee_id: str | None = None
+    paystub_url: HttpUrl | None = None
+    paystub_id: str | None = None
+    rsu_url: HttpUrl | None = None
+    rsu_id: str | None = None
+
+    @model_validator(mode="after")
+    def _check_document(self):
+        _require_document(self, "paystub")
+        return self
+
+class AnalyzeBatchRequest(BaseModel):
+    handbook_url: HttpUrl | None = None
+    handbook_id: str | None = None
+    employees: list[BatchEmployeeRequest]
+    policy_question: str | None = None
+    max_concurrency: int | None = None
+
+    @model_validator(mode="after")
+    def _check_document(self):
+        _require_document(self, "handbook")
+        return self
+
+class SimulateRequest(BaseModel):
+    paystub: dict[str, Any]
+    policy_answer: dict[str, Any] | None = None
+    match_formula: dict[str, Any] | None = None
+    rsu_data: dict[str, Any] | None = None
+    horizon_years: int = DEFAULT_SIMULATION_HORIZON_YEARS
+    max_rate: float = DEFAULT_SIMULATION_SWEEP_MAX_RATE
+    step: float = DEFAULT_SIMULATION_SWEEP_STEP
+    contribution_rate: float | None = Field(default=None, ge=0.0, le=1.0, allow_inf_nan=False)
+    # Rates at or below -100% would make (1 + rate) ** years negative, zero or infinite
+    salary_growth: float = Field(default=0.0, gt=-1.0, le=MAX_SIMULATION_ANNUAL_RATE, allow_inf_nan=False)
+    annual_return: float = Field(default=0.0, gt=-1.0, le=MAX_SIMULATION_ANNUAL_RATE, allow_inf_nan=False)
+    tenure_years: float = Field(default=0.0, ge=0.0, le=MAX_SIMULATION_TENURE_YEARS, allow_inf_nan=False)
+
+class RegisterDocumentRequest(BaseModel):
+    url: HttpUrl
+
 class ChatRequest(BaseModel):
     message: str
     context: str | None = None
 
-def _gemini_chat(message: str, system_prompt: str, context: ssl.SSLContext | None) -> str:
+def _gemini_chat(message: str, system_prompt: str) -> str:
     api_key = os.getenv("GEMINI_API_KEY") or ""
     base_url = (os.getenv("GEMINI_BASE_URL") or "").rstrip("/")
     model = os.getenv("GEMINI_CHAT_MODEL") or os.getenv("GEMINI_MODEL") or "gemini-2.0-flash"
@@ -91,16 +264,16 @@ def _gemini_chat(message: str, system_prompt: str, context: ssl.SSLContext | Non
         "generationConfig": {"temperature": 0.7},
     }
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url, data=data, headers={"Content-Type": "application/json"}, method="POST"
-    )
+    get_rate_limiter().acquire(estimate_tokens(payload))
     try:
-        if context is None:
-            resp = urllib.request.urlopen(req, timeout=timeout)
-        else:
-            resp = urllib.request.urlopen(req, timeout=timeout, context=context)
-        with resp as r:
-            body = json.loads(r.read().decode("utf-8"))
+        raw = get_http_transport().request(
+            "POST",
+            url,
+            body=data,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
+        body = json.loads(raw.decode("utf-8"))
     except urllib.error.HTTPError as e:
         err_body = e.read().decode("utf-8", errors="replace")
         raise RuntimeError(f"Chat request failed: {e.code} {err_body}") from e
@@ -115,111 +288,258 @@ def _gemini_chat(message: str, system_prompt: str, context: ssl.SSLContext | Non
     return (parts[0].get("text") or "").strip()
 
 
+# Resolve (url, document_id) pairs to local files; the stack removes downloads and releases leases
+def _open_documents(
+    stack: ExitStack, refs: list[tuple[HttpUrl | None, str | None]]
+) -> list[DownloadedFile | None]:
+    files: list[DownloadedFile | None] = [None] * len(refs)
+    for position, (_, document_id) in enumerate(refs):
+        if document_id:
+            store = _require_document_store()
+            try:
+                document = stack.enter_context(store.lease(document_id))
+            except KeyError:
+                raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
+            files[position] = DownloadedFile(
+                path=document.path, size_bytes=document.size_bytes, sha256=document.document_id
+            )
+    urls = [str(url) if url and not document_id else None for url, document_id in refs]
+    with stage_timer("download"):
+        downloaded_files = download_urls(urls)
+    for position, downloaded in enumerate(downloaded_files):
+        if downloaded is not None:
+            stack.callback(remove_temp_file, downloaded.path)
+            files[position] = downloaded
+    return files
+
+
+def _require_document_store():
+    store = get_document_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Document store is disabled")
+    return store
+
+
+def _document_payload(document: StoredDocument) -> dict[str, Any]:
+    return {
+        "document_id": document.document_id,
+        "size_bytes": document.size_bytes,
+        "suffix": document.suffix,
+        "refcount": document.refcount,
+    }
+
+
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/extract/paystub")
-def extract_paystub(body: FileUrlRequest) -> dict[str, Any]:
-    from agents.extractor_agent import load_extractor_from_env
+# Prometheus text exposition of stage, LLM and request latency histograms
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    if (os.getenv("METRICS_ENABLED") or "true").lower() not in {"1", "true", "yes"}:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(get_metrics_registry().render(), media_type="text/plain; version=0.0.4")
+
 
-    path = None
+# Upload raw document bytes (request body, not multipart); pass ?filename= to keep the extension
+@app.post("/documents")
+async def upload_document(request: Request, filename: str | None = None) -> dict[str, Any]:
+    store = _require_document_store()
+    writer = store.writer(filename)
     try:
-        path = download_url_to_temp(str(body.file_url))
-        agent = load_extractor_from_env()
-        return agent.extract_from_file(path)
-    finally:
-        if path and os.path.isfile(path):
-            try:
-                os.unlink(path)
-            except OSError:
-                pass
+        async for chunk in request.stream():
+            if chunk:
+                writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return _document_payload(await asyncio.to_thread(writer.commit))
+
+
+@app.post("/documents/register")
+def register_document(body: RegisterDocumentRequest) -> dict[str, Any]:
+    return _document_payload(_require_document_store().register_url(str(body.url)))
+
+
+@app.get("/documents/{document_id}")
+def get_document(document_id: str) -> dict[str, Any]:
+    document = _require_document_store().get(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
+    return _document_payload(document)
+
+
+@app.delete("/documents/{document_id}")
+def delete_document(document_id: str) -> dict[str, Any]:
+    document = _require_document_store().release(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
+    return {**_document_payload(document), "deleted": document.refcount == 0}
+
+
+# Admin endpoints exist only when ADMIN_API_TOKEN is set
+def _require_admin(token: str | None) -> None:
+    expected = os.getenv("ADMIN_API_TOKEN") or ""
+    if not expected:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+# Re-read .env and rebuild the shared agents without restarting
+@app.post("/admin/reload")
+def reload_agents(x_admin_token: str | None = Header(default=None)) -> dict[str, Any]:
+    _require_admin(x_admin_token)
+    agents = get_agent_registry().reload()
+    return {"status": "reloaded", "generation": agents.generation, "model": agents.gemini_config.model}
+
+
+# Cold start of this worker; ?profile=true adds an -X importtime run in a fresh interpreter
+@app.get("/admin/startup")
+def startup_report(profile: bool = False, x_admin_token: str | None = Header(default=None)) -> dict[str, Any]:
+    from utils.startup import import_time_report
+
+    _require_admin(x_admin_token)
+    report: dict[str, Any] = {**_STARTUP, "prewarm": dict(_STARTUP["prewarm"])}
+    if profile:
+        report["importtime"] = import_time_report("api")
+    return report
+
+
+# Hit ratios of the extraction cache and, when any agent opted in, the Gemini response cache
+@app.get("/admin/cache")
+def cache_report(x_admin_token: str | None = Header(default=None)) -> dict[str, Any]:
+    from agents.extractor_agent import get_extraction_cache, get_response_cache, response_cache_enabled
+
+    _require_admin(x_admin_token)
+    extraction = get_extraction_cache()
+    report: dict[str, Any] = {"extraction": extraction.stats() if extraction is not None else None}
+    agents = [name for name in ("extractor", "policy_scout", "strategist", "guardrail") if response_cache_enabled(name)]
+    report["responses"] = {"agents": agents, **get_response_cache().stats()} if agents else None
+    return report
+
+
+@app.post("/extract/paystub")
+def extract_paystub(body: FileUrlRequest) -> dict[str, Any]:
+    with ExitStack() as stack:
+        (document,) = _open_documents(stack, [(body.file_url, body.file_id)])
+        agent = get_agent_registry().current().extractor
+        return agent.extract_from_file(document.path, content_hash=document.sha256)
 
 
 @app.post("/extract/rsu")
 def extract_rsu(body: FileUrlRequest) -> dict[str, Any]:
-    from agents.extractor_agent import load_extractor_from_env
     from constants.app_defaults import RSU_SCHEMA_FIELDS
 
-    path = None
-    try:
-        path = download_url_to_temp(str(body.file_url))
-        agent = load_extractor_from_env()
-        return agent.extract_from_file(path, schema_fields=RSU_SCHEMA_FIELDS)
-    finally:
-        if path and os.path.isfile(path):
-            try:
-                os.unlink(path)
-            except OSError:
-                pass
+    with ExitStack() as stack:
+        (document,) = _open_documents(stack, [(body.file_url, body.file_id)])
+        agent = get_agent_registry().current().extractor
+        return agent.extract_from_file(
+            document.path, schema_fields=RSU_SCHEMA_FIELDS, content_hash=document.sha256
+        )
 
 
 @app.post("/policy/answer")
 def policy_answer(body: PolicyAnswerRequest) -> dict[str, Any]:
-    from agents.policy_scout_agent import load_policy_scout_from_env
-
-    path = None
-    try:
-        path = download_url_to_temp(str(body.handbook_url))
-        policy = load_policy_scout_from_env(handbook_path=path)
+    with ExitStack() as stack:
+        (document,) = _open_documents(stack, [(body.handbook_url, body.handbook_id)])
+        policy = get_agent_registry().current().policy_scout(document.path, document.sha256)
         return policy.answer(body.question)
-    finally:
-        if path and os.path.isfile(path):
-            try:
-                os.unlink(path)
-            except OSError:
-                pass
+
+
+_STAGE_EXECUTOR: ThreadPoolExecutor | None = None
+_STAGE_EXECUTOR_LOCK = threading.Lock()
+
+
+# Resolve how independent analysis stages run: "parallel" or "sequential"
+def _analysis_execution_mode() -> str:
+    mode = (os.getenv("ANALYZE_EXECUTION_MODE") or DEFAULT_ANALYZE_EXECUTION_MODE).strip().lower()
+    if mode not in {"parallel", "sequential"}:
+        return DEFAULT_ANALYZE_EXECUTION_MODE
+    return mode
+
+
+# Shared, bounded worker pool for the extraction and policy stages
+def _get_stage_executor() -> ThreadPoolExecutor:
+    global _STAGE_EXECUTOR
+    with _STAGE_EXECUTOR_LOCK:
+        if _STAGE_EXECUTOR is None:
+            workers = int(os.getenv("ANALYZE_MAX_WORKERS") or DEFAULT_ANALYZE_MAX_WORKERS)
+            _STAGE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(workers, 1), thread_name_prefix="analyze-stage"
+            )
+        return _STAGE_EXECUTOR
+
+
+def _submit_stage(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    # Copy the caller's context so Opik spans nest under the request trace
+    context = contextvars.copy_context()
+    return _get_stage_executor().submit(context.run, func, *args, **kwargs)
+
+
+def _analysis_document_refs(body: AnalyzeRequest) -> list[tuple[HttpUrl | None, str | None]]:
+    return [
+        (body.paystub_url, body.paystub_id),
+        (body.handbook_url, body.handbook_id),
+        (body.rsu_url, body.rsu_id),
+    ]
 
 
 @app.post("/analyze")
 def analyze(body: AnalyzeRequest) -> dict[str, Any]:
-    from agents.extractor_agent import load_extractor_from_env
-    from agents.guardrail_agent import load_guardrail_from_env
-    from agents.policy_scout_agent import load_policy_scout_from_env
-    from agents.strategist_agent import load_strategist_from_env
     from constants.app_defaults import DEFAULT_POLICY_QUESTION, RSU_SCHEMA_FIELDS
+    from pipeline import build_analysis_result
 
-    paystub_path = None
-    handbook_path = None
-    rsu_path = None
     question = body.policy_question or DEFAULT_POLICY_QUESTION
-    try:
-        paystub_path = download_url_to_temp(str(body.paystub_url))
-        handbook_path = download_url_to_temp(str(body.handbook_url))
-        if body.rsu_url:
-            rsu_path = download_url_to_temp(str(body.rsu_url))
+    with ExitStack() as stack:
+        paystub_file, handbook_file, rsu_file = _open_documents(stack, _analysis_document_refs(body))
+        paystub_path = paystub_file.path
+        handbook_path = handbook_file.path
+        rsu_path = rsu_file.path if rsu_file else None
+
+        agents = get_agent_registry().current()
+        extractor = agents.extractor
+        policy = agents.policy_scout(handbook_path, handbook_file.sha256)
+        strategist = agents.strategist
+        guardrail = agents.guardrail
 
-        extractor = load_extractor_from_env()
-        policy = load_policy_scout_from_env(handbook_path=handbook_path)
-        strategist = load_strategist_from_env()
-        guardrail = load_guardrail_from_env()
-
-        paystub = extractor.extract_from_file(paystub_path)
         rsu_data = None
-        if rsu_path:
-            rsu_data = extractor.extract_from_file(rsu_path, schema_fields=RSU_SCHEMA_FIELDS)
-        policy_answer = policy.answer(question)
+        if _analysis_execution_mode() == "parallel":
+            # Extractions and the policy lookup are independent; only the strategist needs all three
+            paystub_future = _submit_stage(
+                extractor.extract_from_file, paystub_path, content_hash=paystub_file.sha256
+            )
+            rsu_future = (
+                _submit_stage(
+                    extractor.extract_from_file,
+                    rsu_path,
+                    schema_fields=RSU_SCHEMA_FIELDS,
+                    content_hash=rsu_file.sha256,
+                )
+                if rsu_path
+                else None
+            )
+            policy_future = _submit_stage(policy.answer, question)
+            # Wait for every stage before reading results so temp files outlive all workers
+            wait([f for f in (paystub_future, rsu_future, policy_future) if f is not None])
+            paystub = paystub_future.result()
+            if rsu_future is not None:
+                rsu_data = rsu_future.result()
+            policy_answer = policy_future.result()
+        else:
+            paystub = extractor.extract_from_file(paystub_path, content_hash=paystub_file.sha256)
+            if rsu_path:
+                rsu_data = extractor.extract_from_file(
+                    rsu_path, schema_fields=RSU_SCHEMA_FIELDS, content_hash=rsu_file.sha256
+                )
+            policy_answer = policy.answer(question)
         strategist_output = strategist.synthesize(paystub, policy_answer, rsu_data=rsu_data)
-        guarded = guardrail.enforce(strategist_output["recommendation"])
-
-        return {
-            "question": question,
-            "paystub": paystub,
-            "policy": policy_answer,
-            "leaked_value": strategist_output.get("leaked_value"),
-            "reasoning": strategist_output.get("reasoning"),
-            "action_plan": strategist_output.get("action_plan"),
-            "recommendation": guarded["content"],
-            "guardrail_status": guarded["status"],
-        }
-    finally:
-        for p in (paystub_path, handbook_path, rsu_path):
-            if p and os.path.isfile(p):
-                try:
-                    os.unlink(p)
-                except OSError:
-                    pass
+        guarded = guardrail.enforce(
+            strategist_output["recommendation"], source=strategist_output.get("recommendation_source")
+        )
+
+        return build_analysis_result(question, paystub, policy_answer, strategist_output, guarded)
 
 
 class TraceEvent:
@@ -227,105 +547,146 @@ class TraceEvent:
         self.analysis_id = analysis_id
         self.trace_callback = trace_callback
         self.step = 0
+        self.started: dict[str, float] = {}
 
     def log(self, step_name: str, status: str, payload: dict[str, Any] | None = None) -> None:
         self.step += 1
-        self.trace_callback(
-            {
-                "step": self.step,
-                "name": step_name,
-                "status": status,
-                "payload": payload or {},
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        )
+        event = {
+            "step": self.step,
+            "name": step_name,
+            "status": status,
+            "payload": payload or {},
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        # Monotonic duration from the step's "processing" event to its closing event
+        if status == "processing":
+            self.started[step_name] = time.perf_counter()
+        elif step_name in self.started:
+            event["duration_ms"] = round((time.perf_counter() - self.started.pop(step_name)) * 1000, 3)
+        self.trace_callback(event)
+
+
+# Cache hit flag for one extraction plus the process-wide hit/miss counters
+def _extraction_cache_payload(cache_hit: bool) -> dict[str, Any]:
+    from agents.extractor_agent import get_extraction_cache
+
+    payload: dict[str, Any] = {"cache_hit": cache_hit}
+    cache = get_extraction_cache()
+    if cache is not None:
+        stats = cache.stats()
+        payload["cache_hits"] = stats["hits"]
+        payload["cache_misses"] = stats["misses"]
+    return payload
+
+
+async def _run_traced_stage(
+    tracer: TraceEvent,
+    step_name: str,
+    stage: Callable[..., Awaitable[Any]],
+    *args: Any,
+    summarize: Callable[[Any], dict[str, Any]] | None = None,
+    **kwargs: Any,
+) -> Any:
+    tracer.log(step_name, "processing")
+    result = await stage(*args, **kwargs)
+    tracer.log(step_name, "completed", summarize(result) if summarize else None)
+    return result
 
 
 async def run_analysis_with_traces(body: AnalyzeRequest, tracer: TraceEvent) -> dict[str, Any]:
-    from agents.extractor_agent import load_extractor_from_env
-    from agents.guardrail_agent import load_guardrail_from_env
-    from agents.policy_scout_agent import load_policy_scout_from_env
-    from agents.strategist_agent import load_strategist_from_env
     from constants.app_defaults import DEFAULT_POLICY_QUESTION, RSU_SCHEMA_FIELDS
+    from pipeline import build_analysis_result
 
-    paystub_path = None
-    handbook_path = None
-    rsu_path = None
     question = body.policy_question or DEFAULT_POLICY_QUESTION
 
-    try:
+    with ExitStack() as stack:
         tracer.log("download_files", "processing")
-        await asyncio.sleep(0)
-        paystub_path = download_url_to_temp(str(body.paystub_url))
-        handbook_path = download_url_to_temp(str(body.handbook_url))
-        if body.rsu_url:
-            rsu_path = download_url_to_temp(str(body.rsu_url))
-        tracer.log("download_files", "completed", {"files": 3 if rsu_path else 2})
-        await asyncio.sleep(0)
+        paystub_file, handbook_file, rsu_file = await asyncio.to_thread(
+            _open_documents, stack, _analysis_document_refs(body)
+        )
+        paystub_path = paystub_file.path
+        handbook_path = handbook_file.path
+        rsu_path = rsu_file.path if rsu_file else None
+        downloaded = [f for f in (paystub_file, handbook_file, rsu_file) if f is not None]
+        tracer.log(
+            "download_files",
+            "completed",
+            {"files": len(downloaded), "bytes": sum(f.size_bytes for f in downloaded)},
+        )
 
         tracer.log("load_agents", "processing")
-        await asyncio.sleep(0)
-        extractor = load_extractor_from_env()
-        policy = load_policy_scout_from_env(handbook_path=handbook_path)
-        strategist = load_strategist_from_env()
-        guardrail = load_guardrail_from_env()
+        agents = get_agent_registry().current()
+        extractor = agents.extractor
+        policy = agents.policy_scout(handbook_path, handbook_file.sha256)
+        strategist = agents.strategist
+        guardrail = agents.guardrail
         tracer.log("load_agents", "completed")
-        await asyncio.sleep(0)
 
-        tracer.log("extract_paystub", "processing")
-        await asyncio.sleep(0)
-        paystub = extractor.extract_from_file(paystub_path)
-        tracer.log("extract_paystub", "completed", {"fields": len(paystub)})
-        await asyncio.sleep(0)
+        paystub_stage = partial(
+            _run_traced_stage,
+            tracer,
+            "extract_paystub",
+            extractor.extract_with_cache_status_async,
+            paystub_path,
+            summarize=lambda outcome: {"fields": len(outcome[0]), **_extraction_cache_payload(outcome[1])},
+            content_hash=paystub_file.sha256,
+        )
+        rsu_stage = (
+            partial(
+                _run_traced_stage,
+                tracer,
+                "extract_rsu",
+                extractor.extract_with_cache_status_async,
+                rsu_path,
+                summarize=lambda outcome: _extraction_cache_payload(outcome[1]),
+                schema_fields=RSU_SCHEMA_FIELDS,
+                content_hash=rsu_file.sha256,
+            )
+            if rsu_path
+            else None
+        )
+        policy_stage = partial(
+            _run_traced_stage,
+            tracer,
+            "policy_scout",
+            policy.answer_async,
+            question,
+            summarize=lambda result: {"sources": len(result.get("sources", []))},
+        )
 
         rsu_data = None
-        if rsu_path:
-            tracer.log("extract_rsu", "processing")
-            await asyncio.sleep(0)
-            rsu_data = extractor.extract_from_file(rsu_path, schema_fields=RSU_SCHEMA_FIELDS)
-            tracer.log("extract_rsu", "completed")
-            await asyncio.sleep(0)
-
-        tracer.log("policy_scout", "processing")
-        await asyncio.sleep(0)
-        policy_answer = policy.answer(question)
-        tracer.log("policy_scout", "completed", {"sources": len(policy_answer.get("sources", []))})
-        await asyncio.sleep(0)
+        if _analysis_execution_mode() == "parallel":
+            stages = [paystub_stage(), policy_stage()] + ([rsu_stage()] if rsu_stage else [])
+            # return_exceptions keeps every stage running to completion before temp files are removed
+            results = await asyncio.gather(*stages, return_exceptions=True)
+            for outcome in results:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            (paystub, _), policy_answer = results[0], results[1]
+            if rsu_stage:
+                rsu_data, _ = results[2]
+        else:
+            paystub, _ = await paystub_stage()
+            if rsu_stage:
+                rsu_data, _ = await rsu_stage()
+            policy_answer = await policy_stage()
 
         tracer.log("strategist", "processing")
-        await asyncio.sleep(0)
-        strategist_output = strategist.synthesize(paystub, policy_answer, rsu_data=rsu_data)
+        strategist_output = await strategist.synthesize_async(paystub, policy_answer, rsu_data=rsu_data)
         leaked_val = strategist_output.get("leaked_value") or {}
         tracer.log(
             "strategist",
             "completed",
             {"annual_opportunity_cost": leaked_val.get("annual_opportunity_cost")},
         )
-        await asyncio.sleep(0)
 
         tracer.log("guardrail", "processing")
-        await asyncio.sleep(0)
-        guarded = guardrail.enforce(strategist_output["recommendation"])
+        guarded = await guardrail.enforce_async(
+            strategist_output["recommendation"], source=strategist_output.get("recommendation_source")
+        )
         tracer.log("guardrail", "completed", {"status": guarded["status"]})
-        await asyncio.sleep(0)
-
-        return {
-            "question": question,
-            "paystub": paystub,
-            "policy": policy_answer,
-            "leaked_value": strategist_output.get("leaked_value"),
-            "reasoning": strategist_output.get("reasoning"),
-            "action_plan": strategist_output.get("action_plan"),
-            "recommendation": guarded["content"],
-            "guardrail_status": guarded["status"],
-        }
-    finally:
-        for p in (paystub_path, handbook_path, rsu_path):
-            if p and os.path.isfile(p):
-                try:
-                    os.unlink(p)
-                except OSError:
-                    pass
+
+        return build_analysis_result(question, paystub, policy_answer, strategist_output, guarded)
 
 
 @app.post("/analyze/stream")
@@ -402,13 +763,100 @@ async def analyze_stream(body: AnalyzeRequest) -> StreamingResponse:
     )
 
 
+def _open_batch_employee(
+    stack: ExitStack, employee: BatchEmployeeRequest
+) -> tuple[DownloadedFile, DownloadedFile | None]:
+    paystub_file, rsu_file = _open_documents(
+        stack, [(employee.paystub_url, employee.paystub_id), (employee.rsu_url, employee.rsu_id)]
+    )
+    return paystub_file, rsu_file
+
+
+# Analyse many employees against one handbook; streams one JSON object per line
+@app.post("/analyze/batch")
+async def analyze_batch(body: AnalyzeBatchRequest) -> StreamingResponse:
+    from pipeline import iter_batch_events
+
+    limit = int(os.getenv("BATCH_MAX_CONCURRENCY") or DEFAULT_BATCH_MAX_CONCURRENCY)
+    max_concurrency = max(1, min(body.max_concurrency or limit, limit))
+    question = body.policy_question or DEFAULT_POLICY_QUESTION
+
+    async def ndjson_generator():
+        with ExitStack() as stack:
+            try:
+                (handbook,) = await asyncio.to_thread(
+                    _open_documents, stack, [(body.handbook_url, body.handbook_id)]
+                )
+                async for event in iter_batch_events(
+                    handbook,
+                    body.employees,
+                    _open_batch_employee,
+                    question,
+                    max_concurrency,
+                    employee_label=lambda index, employee: employee.employee_id or str(index),
+                ):
+                    yield json.dumps(event) + "\n"
+            except Exception as exc:
+                yield json.dumps({"type": "error", "error": str(exc)}) + "\n"
+
+    return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+
+
+# Instant what-if curves from already extracted data; no LLM calls
+@app.post("/simulate")
+def simulate(body: SimulateRequest) -> dict[str, Any]:
+    from agents.simulation_engine import contribution_grid, contribution_sweep, project_horizon
+    from agents.strategist_agent import MatchFormula, compile_match_formula
+
+    if not 0 <= body.horizon_years <= MAX_SIMULATION_HORIZON_YEARS:
+        raise HTTPException(
+            status_code=422, detail=f"horizon_years must be between 0 and {MAX_SIMULATION_HORIZON_YEARS}"
+        )
+    if body.step <= 0 or body.max_rate < 0 or body.max_rate / body.step + 1 > MAX_SIMULATION_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=422, detail=f"Sweep must be non-empty and at most {MAX_SIMULATION_SWEEP_POINTS} points"
+        )
+    if body.match_formula:
+        try:
+            formula = MatchFormula.from_dict(body.match_formula)
+        except (TypeError, KeyError, ValueError) as exc:
+            raise HTTPException(status_code=422, detail=f"Invalid match_formula: {exc}") from exc
+    else:
+        formula = compile_match_formula((body.policy_answer or {}).get("answer"))
+    result = {
+        "match_formula": formula.to_dict(),
+        "sweep": contribution_sweep(body.paystub, formula, contribution_grid(body.max_rate, body.step)),
+        "projection": project_horizon(
+            body.paystub,
+            formula,
+            contribution_rate=body.contribution_rate,
+            rsu_data=body.rsu_data,
+            years=body.horizon_years,
+            salary_growth=body.salary_growth,
+            annual_return=body.annual_return,
+            tenure_years=body.tenure_years,
+        ),
+    }
+    # Huge paystub amounts or formula values can still overflow; JSON cannot carry inf or NaN
+    if not _all_finite(result):
+        raise HTTPException(status_code=422, detail="Simulation inputs produce non-finite values")
+    return result
+
+
+def _all_finite(value: Any) -> bool:
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, dict):
+        return all(_all_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_all_finite(item) for item in value)
+    return True
+
+
 @app.post("/chat")
 def chat(body: ChatRequest) -> dict[str, str]:
-    from agents.extractor_agent import build_ssl_context
-
     system_prompt = VESTING_BUDDY_CHAT_SYSTEM_PROMPT
     if body.context and body.context.strip():
         system_prompt = system_prompt + "\n\nRelevant user data:\n" + body.context.strip()
-    ctx = build_ssl_context()
-    reply = _gemini_chat(body.message, system_prompt, ctx)
+    reply = _gemini_chat(body.message, system_prompt)
     return {"reply": reply}
@@ -5,7 +5,6 @@ import os
 import sys
 import warnings
 
-from agents.extractor_agent import load_extractor_from_env
 from utils.asset_picker import pick_paystub
 
 
@@ -73,6 +72,8 @@ def resolve_file_path(args: list[str]) -> str:
 
 # Run extractor and return JSON
 def run() -> dict:
+    from agents.extractor_agent import load_extractor_from_env
+
     load_env(os.path.join(os.path.dirname(__file__), ".env"))
     configure_opik()
     file_path = resolve_file_path(sys.argv)
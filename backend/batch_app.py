@@ -0,0 +1,113 @@
+import config_loader
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from contextlib import ExitStack
+from typing import Dict, List, Tuple
+
+from app import configure_opik
+from constants.app_defaults import DEFAULT_BATCH_MAX_CONCURRENCY, DEFAULT_POLICY_QUESTION
+from pipeline import iter_batch_events
+from utils.hashing import sha256_file
+from utils.url_download import DownloadedFile
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run Vesting Buddy for many employees against one handbook.",
+    )
+    parser.add_argument("handbook", help="Path to the company handbook")
+    parser.add_argument(
+        "manifest",
+        help="CSV with columns employee_id, paystub and optional rsu (paths relative to the CSV)",
+    )
+    parser.add_argument("--question", default=os.getenv("POLICY_QUESTION") or DEFAULT_POLICY_QUESTION)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("BATCH_MAX_CONCURRENCY") or DEFAULT_BATCH_MAX_CONCURRENCY),
+    )
+    parser.add_argument("--output", help="Write NDJSON results here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def load_manifest(path: str) -> List[Dict[str, str]]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    employees = []
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        for row in csv.DictReader(file):
+            paystub = (row.get("paystub") or "").strip()
+            if not paystub:
+                continue
+            rsu = (row.get("rsu") or "").strip()
+            employees.append(
+                {
+                    "employee_id": (row.get("employee_id") or "").strip() or str(len(employees)),
+                    "paystub": os.path.join(base_dir, paystub),
+                    "rsu": os.path.join(base_dir, rsu) if rsu else "",
+                }
+            )
+    return employees
+
+
+def local_document(path: str) -> DownloadedFile:
+    if not os.path.isfile(path):
+        raise RuntimeError(f"File not found: {path}")
+    return DownloadedFile(path=path, size_bytes=os.path.getsize(path), sha256=sha256_file(path))
+
+
+def open_employee(stack: ExitStack, employee: Dict[str, str]) -> Tuple[DownloadedFile, DownloadedFile | None]:
+    # Local files need no cleanup, so the stack is left untouched
+    rsu = local_document(employee["rsu"]) if employee["rsu"] else None
+    return local_document(employee["paystub"]), rsu
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    configure_opik()
+    employees = load_manifest(args.manifest)
+    print(f"🏢 Batch of {len(employees)} employees against {os.path.basename(args.handbook)}", file=sys.stderr)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    summary: Dict = {}
+    try:
+        async for event in iter_batch_events(
+            local_document(args.handbook),
+            employees,
+            open_employee,
+            args.question,
+            max(args.concurrency, 1),
+            employee_label=lambda index, employee: employee["employee_id"],
+        ):
+            if event["type"] == "policy":
+                print("📘 Policy answer computed once for the whole batch", file=sys.stderr)
+            elif event["type"] in {"result", "error"}:
+                progress = event["progress"]
+                print(
+                    f"⏳ {progress['completed'] + progress['failed']}/{progress['total']} "
+                    f"({progress['failed']} failed)",
+                    file=sys.stderr,
+                )
+            elif event["type"] == "complete":
+                summary = event
+            output.write(json.dumps(event) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return summary
+
+
+if __name__ == "__main__":
+    summary = asyncio.run(run(parse_args(sys.argv[1:])))
+    print(
+        f"✅ {summary.get('completed', 0)} completed, {summary.get('failed', 0)} failed "
+        f"in {summary.get('elapsed_seconds', 0)}s",
+        file=sys.stderr,
+    )
+    try:
+        import opik
+        opik.flush_tracker()
+    except Exception:
+        pass
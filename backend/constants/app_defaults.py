@@ -58,3 +58,96 @@ DEFAULT_GUARDRAIL_BLOCKLIST = (
     "eth",
 )
 DEFAULT_GUARDRAIL_REPLACEMENT = "Avoid individual stock picks. Prefer diversified index funds or employer plan defaults aligned with your risk tolerance."
+
+DEFAULT_ANALYZE_EXECUTION_MODE = "parallel"
+DEFAULT_ANALYZE_MAX_WORKERS = 8
+
+DEFAULT_HTTP_POOL_SIZE = 10
+DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS = 10
+DEFAULT_HTTP_IDLE_TIMEOUT_SECONDS = 60
+
+DEFAULT_EXTRACT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_EXTRACT_CACHE_MEMORY_ENTRIES = 256
+DEFAULT_EXTRACT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+HANDBOOK_INDEX_VERSION = 1
+DEFAULT_POLICY_INDEX_MEMORY_ENTRIES = 8
+DEFAULT_POLICY_INDEX_MAX_HANDBOOKS = 200
+
+DEFAULT_BM25_K1 = 1.2
+DEFAULT_BM25_B = 0.75
+
+DEFAULT_POLICY_PDF_MAX_WORKERS = 4
+DEFAULT_POLICY_PDF_PARALLEL_MIN_PAGES = 48
+DEFAULT_POLICY_PDF_BATCH_PAGES = 16
+# Multimodal fallback: pages copied into the request PDF (scanned handbooks are only pruned via their bookmarks),
+# and the text below which a PDF counts as scanned
+DEFAULT_POLICY_FALLBACK_MAX_PAGES = 6
+DEFAULT_POLICY_PDF_MIN_TEXT_CHARS = 200
+
+DEFAULT_DOWNLOAD_MAX_BYTES = 20 * 1024 * 1024
+DEFAULT_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+DEFAULT_DOWNLOAD_MAX_WORKERS = 4
+
+DEFAULT_DOCUMENT_STORE_MAX_BYTES = 512 * 1024 * 1024
+
+DEFAULT_BATCH_MAX_CONCURRENCY = 8
+
+DEFAULT_MATCH_FORMULA_CACHE_ENTRIES = 256
+
+DEFAULT_SIMULATION_HORIZON_YEARS = 10
+DEFAULT_SIMULATION_SWEEP_MAX_RATE = 0.25
+DEFAULT_SIMULATION_SWEEP_STEP = 0.005
+MAX_SIMULATION_HORIZON_YEARS = 50
+MAX_SIMULATION_SWEEP_POINTS = 1001
+# Upper bound for salary growth and investment return, as a yearly fraction
+MAX_SIMULATION_ANNUAL_RATE = 1.0
+MAX_SIMULATION_TENURE_YEARS = 100
+
+DEFAULT_GUARDRAIL_VERDICT_CACHE_ENTRIES = 1024
+DEFAULT_GUARDRAIL_VERDICT_CACHE_TTL_SECONDS = 24 * 60 * 60
+# Larger blocklists are enforced by the term matcher and summarised in the LLM prompt
+DEFAULT_GUARDRAIL_PROMPT_MAX_TERMS = 200
+
+STARTUP_MODES = ("eager", "budget")
+DEFAULT_STARTUP_MODE = "eager"
+DEFAULT_STARTUP_BUDGET_MS = 300
+DEFAULT_STARTUP_REPORT_TOP = 25
+
+DEFAULT_METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DEFAULT_TRACE_EXPORT_MODE = "async"
+DEFAULT_TRACE_BUFFER_SPANS = 2048
+DEFAULT_TRACE_BATCH_SPANS = 100
+DEFAULT_TRACE_FLUSH_SECONDS = 1.0
+DEFAULT_TRACE_MAX_FIELD_CHARS = 2000
+DEFAULT_TRACE_SAMPLE_RATE = 1.0
+
+DEFAULT_MODEL_ROUTE_TTL_SECONDS = 60 * 60
+DEFAULT_MODEL_LIST_TTL_SECONDS = 60 * 60
+DEFAULT_MODEL_ROUTE_MAX_ENTRIES = 256
+
+DEFAULT_LLM_RETRY_ATTEMPTS = 4
+DEFAULT_LLM_RETRY_BASE_DELAY_SECONDS = 0.5
+DEFAULT_LLM_RETRY_MAX_DELAY_SECONDS = 8.0
+# Retries one request may spend across transport and validation retries
+DEFAULT_LLM_RETRY_BUDGET = 6
+DEFAULT_LLM_RETRY_DEADLINE_SECONDS = 120.0
+DEFAULT_LLM_CIRCUIT_FAILURES = 5
+DEFAULT_LLM_CIRCUIT_RESET_SECONDS = 30.0
+DEFAULT_LLM_HEDGE_QUANTILE = 0.95
+DEFAULT_LLM_HEDGE_MIN_DELAY_SECONDS = 0.5
+DEFAULT_LLM_HEDGE_MIN_SAMPLES = 20
+DEFAULT_LLM_LATENCY_WINDOW = 200
+
+RATE_LIMIT_PRIORITIES = ("interactive", "batch")
+DEFAULT_RATE_LIMIT_CHARS_PER_TOKEN = 4
+# Gemini bills a PDF page as ~258 tokens; ~64 bytes per token over-estimates typical pages slightly
+DEFAULT_RATE_LIMIT_INLINE_BYTES_PER_TOKEN = 64
+DEFAULT_RATE_LIMIT_BATCH_MAX_WAIT_SECONDS = 30.0
+
+LLM_RESPONSE_CACHE_BACKENDS = ("memory", "sqlite", "directory")
+DEFAULT_LLM_RESPONSE_CACHE_BACKEND = "sqlite"
+DEFAULT_LLM_RESPONSE_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_LLM_RESPONSE_CACHE_MEMORY_ENTRIES = 512
+DEFAULT_LLM_RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
@@ -14,3 +14,9 @@ KEYWORDS = (
 BOOSTED_QUERY = (
     "Find the section describing the specific percentage formula for employer 401k matching contributions."
 )
+
+# Term groups that must all appear before PDF extraction may stop early
+EARLY_STOP_TERM_GROUPS = (
+    ("match", ("match",)),
+    ("vesting", ("vesting", "vested", "cliff")),
+)
@@ -2,10 +2,8 @@ import config_loader
 import os
 import sys
 
-from agents.extractor_agent import get_track_decorator, get_tracer, load_extractor_from_env
-from agents.guardrail_agent import load_guardrail_from_env
-from agents.policy_scout_agent import load_policy_scout_from_env
-from agents.strategist_agent import load_strategist_from_env
+from agents.extractor_agent import get_track_decorator, get_tracer
+from agents.registry import get_agent_registry
 from app import configure_opik
 from constants.app_defaults import DEFAULT_POLICY_QUESTION, RSU_SCHEMA_FIELDS
 from utils.asset_picker import pick_documents, pick_rsu_document
@@ -51,10 +49,11 @@ def run() -> dict:
             "rsu_grant": os.path.basename(rsu_path) if rsu_path else None,
         },
     )
-    extractor = load_extractor_from_env()
-    policy = load_policy_scout_from_env(handbook_path=handbook_path)
-    strategist = load_strategist_from_env()
-    guardrail = load_guardrail_from_env()
+    agents = get_agent_registry().current()
+    extractor = agents.extractor
+    policy = agents.policy_scout(handbook_path)
+    strategist = agents.strategist
+    guardrail = agents.guardrail
     print("📄 Reading paystub...")
     tracer.log_step("paystub_read_started", {"file": paystub_path})
     paystub = extractor.extract_from_file(paystub_path)
@@ -73,7 +72,9 @@ def run() -> dict:
     strategist_output = strategist.synthesize(paystub, policy_answer, rsu_data=rsu_data)
     print("🛡️ Running safety checks...")
     tracer.log_step("guardrail_started", {})
-    guarded = guardrail.enforce(strategist_output["recommendation"])
+    guarded = guardrail.enforce(
+        strategist_output["recommendation"], source=strategist_output.get("recommendation_source")
+    )
     return {
         "question": question,
         "paystub": paystub,
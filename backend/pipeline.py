@@ -0,0 +1,135 @@
+import asyncio
+import time
+from contextlib import ExitStack
+from typing import Any, AsyncIterator, Callable, Dict, Sequence, Tuple
+
+from agents.registry import get_agent_registry
+from agents.strategist_agent import compile_match_formula
+from constants.app_defaults import RSU_SCHEMA_FIELDS
+from utils.rate_limit import request_priority
+from utils.url_download import DownloadedFile
+
+OpenEmployee = Callable[[ExitStack, Any], Tuple[DownloadedFile, DownloadedFile | None]]
+
+
+# Shape the final payload shared by /analyze, /analyze/stream and batch runs
+def build_analysis_result(
+    question: str,
+    paystub: Dict[str, Any],
+    policy_answer: Dict[str, Any],
+    strategist_output: Dict[str, Any],
+    guarded: Dict[str, Any],
+) -> Dict[str, Any]:
+    return {
+        "question": question,
+        "paystub": paystub,
+        "policy": policy_answer,
+        "leaked_value": strategist_output.get("leaked_value"),
+        "reasoning": strategist_output.get("reasoning"),
+        "action_plan": strategist_output.get("action_plan"),
+        "recommendation": guarded["content"],
+        "guardrail_status": guarded["status"],
+    }
+
+
+async def iter_batch_events(
+    handbook: DownloadedFile,
+    employees: Sequence[Any],
+    open_employee: OpenEmployee,
+    question: str,
+    max_concurrency: int,
+    employee_label: Callable[[int, Any], str] | None = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyse many employees against one handbook.
+    The policy answer and its match formula are computed once; employees
+    are processed by at most max_concurrency workers and yielded as they
+    finish, so results arrive out of input order and carry their input index.
+    open_employee resolves an employee to (paystub, rsu) files and registers
+    cleanup on the given stack; it runs in a worker thread.
+    """
+    total = len(employees)
+    started_at = time.monotonic()
+    yield {"type": "start", "total": total}
+
+    # One agent set for the whole batch, even if config is reloaded mid-run
+    agents = get_agent_registry().current()
+    policy = agents.policy_scout(handbook.path, handbook.sha256)
+    # Batch calls queue behind interactive ones for the shared Gemini quota
+    with request_priority("batch"):
+        policy_answer = await policy.answer_async(question)
+    match_formula = compile_match_formula(policy_answer.get("answer"))
+    yield {"type": "policy", "policy": policy_answer, "match_formula": match_formula.to_dict()}
+
+    extractor = agents.extractor
+    strategist = agents.strategist
+    guardrail = agents.guardrail
+
+    async def analyze_employee(employee: Any) -> Dict[str, Any]:
+        with ExitStack() as stack:
+            paystub_file, rsu_file = await asyncio.to_thread(open_employee, stack, employee)
+            stages = [extractor.extract_from_file_async(paystub_file.path, content_hash=paystub_file.sha256)]
+            if rsu_file is not None:
+                stages.append(
+                    extractor.extract_from_file_async(
+                        rsu_file.path, schema_fields=RSU_SCHEMA_FIELDS, content_hash=rsu_file.sha256
+                    )
+                )
+            results = await asyncio.gather(*stages, return_exceptions=True)
+        for outcome in results:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        paystub = results[0]
+        rsu_data = results[1] if rsu_file is not None else None
+        strategist_output = await strategist.synthesize_async(
+            paystub, policy_answer, rsu_data=rsu_data, match_formula=match_formula
+        )
+        guarded = await guardrail.enforce_async(
+            strategist_output["recommendation"], source=strategist_output.get("recommendation_source")
+        )
+        return build_analysis_result(question, paystub, policy_answer, strategist_output, guarded)
+
+    # Workers pull from one shared iterator so only max_concurrency employees are in flight
+    pending = iter(enumerate(employees))
+    events: asyncio.Queue = asyncio.Queue(maxsize=max(max_concurrency, 1) * 2)
+
+    async def worker() -> None:
+        with request_priority("batch"):
+            for index, employee in pending:
+                event: Dict[str, Any] = {"index": index}
+                if employee_label is not None:
+                    event["employee_id"] = employee_label(index, employee)
+                try:
+                    event.update({"type": "result", "result": await analyze_employee(employee)})
+                except Exception as exc:
+                    event.update({"type": "error", "error": str(exc)})
+                await events.put(event)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(max_concurrency, total)))]
+    completed = failed = 0
+    try:
+        while completed + failed < total:
+            event = await events.get()
+            if event["type"] == "result":
+                completed += 1
+            else:
+                failed += 1
+            event["progress"] = {
+                "completed": completed,
+                "failed": failed,
+                "total": total,
+                "elapsed_seconds": round(time.monotonic() - started_at, 3),
+            }
+            yield event
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    yield {
+        "type": "complete",
+        "completed": completed,
+        "failed": failed,
+        "total": total,
+        "elapsed_seconds": round(time.monotonic() - started_at, 3),
+    }
@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from constants.app_defaults import DEFAULT_STARTUP_BUDGET_MS, DEFAULT_STARTUP_REPORT_TOP
+from utils.startup import import_time_report
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure cold-start import time of a backend module in a fresh interpreter.",
+    )
+    parser.add_argument("module", nargs="?", default="api", help="Module to import (default: api)")
+    parser.add_argument("--top", type=int, default=DEFAULT_STARTUP_REPORT_TOP)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("STARTUP_BUDGET_MS") or DEFAULT_STARTUP_BUDGET_MS),
+        help="Exit non-zero when the import takes longer than this",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Report the fastest of this many runs")
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> dict:
+    # First run also refreshes .pyc files, so the fastest run is the realistic warm-disk cold start
+    reports = [
+        import_time_report(args.module, top=args.top, budget_ms=args.budget_ms) for _ in range(max(args.runs, 1))
+    ]
+    return min(reports, key=lambda report: report["import_ms"])
+
+
+def format_report(report: dict) -> str:
+    status = "✅ within" if report["within_budget"] else "❌ over"
+    lines = [
+        f"⏱️  import {report['module']}: {report['import_ms']:.1f} ms "
+        f"({status} {report['budget_ms']:.0f} ms budget, {report['modules_imported']} modules)",
+        f"   repo modules: {report['local_import_ms']:.1f} ms, "
+        f"interpreter wall clock: {report['interpreter_wall_ms']:.1f} ms",
+        "   self ms   cumulative ms   module",
+    ]
+    for entry in report["slowest"]:
+        lines.append(f"   {entry['self_ms']:8.2f}   {entry['cumulative_ms']:13.2f}   {entry['module']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    sys.exit(0 if report["within_budget"] else 1)
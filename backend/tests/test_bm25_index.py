@@ -0,0 +1,107 @@
+import math
+import random
+from collections import Counter
+
+from agents.policy_scout_agent import normalize_tokens, retrieve_chunks, retrieve_many_from_index
+from constants.app_defaults import DEFAULT_BM25_B, DEFAULT_BM25_K1
+from utils.bm25_index import BM25Index, build_postings
+from utils.handbook_index import HandbookIndex, HandbookRecord
+
+CHUNKS = [
+    "Employees may enroll in the 401k plan after 30 days of service.",
+    "The company matches 100% of contributions up to 6% of eligible pay.",
+    "Paid time off accrues at 1.5 days per month for full-time staff.",
+    "Employer match contributions vest over a three year graded vesting schedule.",
+    "Restricted stock units vest quarterly after a one year cliff.",
+]
+
+
+# BM25 computed by scanning every chunk, the way the retrieval loop used to walk all chunks
+def linear_bm25(chunks, query, top_k, k1=DEFAULT_BM25_K1, b=DEFAULT_BM25_B):
+    documents = [normalize_tokens(chunk) for chunk in chunks]
+    average = sum(len(tokens) for tokens in documents) / len(documents)
+    query_counts = Counter(normalize_tokens(query))
+    scored = []
+    for index, tokens in enumerate(documents):
+        counts = Counter(tokens)
+        score = 0.0
+        for token, query_tf in query_counts.items():
+            tf = counts.get(token, 0)
+            if not tf:
+                continue
+            df = sum(1 for other in documents if token in other)
+            idf = math.log(1.0 + (len(documents) - df + 0.5) / (df + 0.5))
+            norm = 1.0 - b + b * len(tokens) / average
+            score += query_tf * idf * tf * (k1 + 1.0) / (tf + k1 * norm)
+        if score:
+            scored.append((index, score))
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:top_k]
+
+
+# The pre-BM25 retrieval: share of query tokens present, normalised by chunk length
+def old_linear_scan(chunks, query, top_k):
+    query_tokens = normalize_tokens(query)
+    scored = []
+    for index, chunk in enumerate(chunks):
+        tokens = normalize_tokens(chunk)
+        token_set = set(tokens)
+        score = sum(1 for token in query_tokens if token in token_set)
+        if score:
+            scored.append((index, score / max(len(tokens), 1)))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return [index for index, _ in scored[:top_k]]
+
+
+def test_index_search_matches_linear_bm25_scan():
+    index = BM25Index.from_documents(CHUNKS, normalize_tokens)
+    for query in ("employer match vesting schedule", "401k match", "stock units vest", "holiday"):
+        expected = linear_bm25(CHUNKS, query, top_k=3)
+        actual = index.search(normalize_tokens(query), top_k=3)
+        assert [doc for doc, _ in actual] == [doc for doc, _ in expected]
+        for (_, got), (_, want) in zip(actual, expected):
+            assert math.isclose(got, want, rel_tol=1e-12)
+
+
+def test_index_search_matches_linear_bm25_on_random_corpus():
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(40)]
+    chunks = [" ".join(rng.choices(vocabulary, k=rng.randint(5, 30))) for _ in range(60)]
+    index = BM25Index.from_documents(chunks, normalize_tokens)
+    for _ in range(25):
+        query = " ".join(rng.sample(vocabulary, 3))
+        expected = linear_bm25(chunks, query, top_k=5)
+        actual = index.search(normalize_tokens(query), top_k=5)
+        assert [doc for doc, _ in actual] == [doc for doc, _ in expected]
+
+
+def test_bm25_agrees_with_old_scan_on_the_best_chunk():
+    for query in ("When does the employer match vest?", "How much does the company match?", "stock units"):
+        assert retrieve_chunks(query, CHUNKS, top_k=1)[0]["index"] == old_linear_scan(CHUNKS, query, 1)[0]
+
+
+def test_search_many_matches_individual_searches():
+    index = BM25Index.from_documents(CHUNKS, normalize_tokens)
+    questions = ["employer match", "vest schedule", "paid time off"]
+    batched = retrieve_many_from_index(questions, index, CHUNKS, top_k=2)
+    for question, hits in zip(questions, batched):
+        assert hits == retrieve_chunks(question, CHUNKS, top_k=2)
+
+
+def test_persisted_postings_rank_like_in_memory_postings(tmp_path):
+    postings, lengths = build_postings(CHUNKS, normalize_tokens)
+    store = HandbookIndex(str(tmp_path / "index.sqlite3"), memory_entries=2, max_handbooks=2)
+    record = HandbookRecord(
+        index_key="key",
+        content_hash="hash",
+        text=" ".join(CHUNKS),
+        sections=(),
+        conflicts=False,
+        chunks=tuple(CHUNKS),
+        chunk_lengths=tuple(lengths),
+    )
+    store.put(record, postings)
+    persisted = BM25Index(lengths, postings_lookup=lambda tokens: store.postings("key", tokens))
+    in_memory = BM25Index(lengths, postings=postings)
+    query = normalize_tokens("employer match vesting")
+    assert persisted.search(query, 3) == in_memory.search(query, 3)
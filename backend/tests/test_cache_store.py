@@ -0,0 +1,85 @@
+import time
+
+from utils.cache_store import DirectoryCache, MemoryLRUCache, SQLiteCache, TieredCache
+
+
+def test_memory_cache_expires_entries_after_ttl():
+    cache = MemoryLRUCache(max_entries=4, ttl_seconds=0.05)
+    cache.set("a", {"value": 1})
+    assert cache.get("a") == {"value": 1}
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryLRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_memory_cache_returns_copies():
+    cache = MemoryLRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", {"items": [1]})
+    cache.get("a")["items"].append(2)
+    assert cache.get("a") == {"items": [1]}
+
+
+def test_sqlite_cache_expires_and_evicts_by_size(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_bytes=40)
+    cache.set("a", "x" * 15)
+    cache.set("b", "y" * 15)
+    cache.get("a")
+    cache.set("c", "z" * 15)
+    assert cache.get("a") == "x" * 15
+    assert cache.get("b") is None
+    assert cache.get("c") == "z" * 15
+
+    expiring = SQLiteCache(str(tmp_path / "ttl.sqlite3"), ttl_seconds=0.05, max_bytes=1000)
+    expiring.set("a", 1)
+    time.sleep(0.06)
+    assert expiring.get("a") is None
+
+
+def test_directory_cache_expires_and_evicts_by_size(tmp_path):
+    cache = DirectoryCache(str(tmp_path / "responses"), ttl_seconds=60, max_bytes=10_000)
+    cache.set("aa01", {"text": "first"})
+    assert cache.get("aa01") == {"text": "first"}
+
+    expiring = DirectoryCache(str(tmp_path / "ttl"), ttl_seconds=0.05, max_bytes=10_000)
+    expiring.set("bb01", 1)
+    time.sleep(0.06)
+    assert expiring.get("bb01") is None
+
+    small = DirectoryCache(str(tmp_path / "small"), ttl_seconds=60, max_bytes=60)
+    small.set("cc01", "a")
+    time.sleep(0.02)
+    small.set("cc02", "b")
+    assert small.get("cc01") is None
+    assert small.get("cc02") == "b"
+
+
+def test_tiered_cache_promotes_disk_hits_and_counts(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_bytes=10_000)
+    TieredCache(MemoryLRUCache(4, 60), disk).set("k", {"v": 1})
+
+    cache = TieredCache(MemoryLRUCache(4, 60), disk)
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == round(2 / 3, 4)
+
+
+def test_tiered_cache_entries_expire_in_both_tiers(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05, max_bytes=10_000)
+    cache = TieredCache(MemoryLRUCache(4, 0.05), disk)
+    cache.set("k", 1)
+    time.sleep(0.06)
+    assert cache.get("k") is None
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from agents.extractor_agent import ExtractorAgent, ExtractorConfig, GeminiClient, NoopTracer
+from utils.cache_store import MemoryLRUCache, TieredCache
+
+FIELDS = (("employee_name", "string"), ("gross_pay", "number"))
+
+
+def gemini_response(payload):
+    return json.dumps({"candidates": [{"content": {"parts": [{"text": json.dumps(payload)}]}}]})
+
+
+def make_agent(responses):
+    client = GeminiClient(
+        ExtractorConfig(api_key="k", model="m", api_version="v1", base_url="http://gemini.invalid", timeout_seconds=1)
+    )
+    calls = []
+
+    def generate(payload):
+        calls.append(payload)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    async def generate_async(payload):
+        return generate(payload)
+
+    client._generate_content = generate
+    client._generate_content_async = generate_async
+    cache = TieredCache(MemoryLRUCache(max_entries=8, ttl_seconds=60))
+    return ExtractorAgent(client, NoopTracer(), cache), calls
+
+
+def test_cache_status_is_returned_beside_the_result(tmp_path):
+    document = tmp_path / "paystub.txt"
+    document.write_text("Gross pay 4000")
+    agent, calls = make_agent([gemini_response({"employee_name": "Ada", "gross_pay": 4000})])
+
+    first, first_hit = agent.extract_with_cache_status(str(document), FIELDS)
+    second, second_hit = agent.extract_with_cache_status(str(document), FIELDS)
+
+    assert (first_hit, second_hit) == (False, True)
+    assert first == second
+    assert len(calls) == 1
+    assert "_extraction_cached" not in first
+    assert agent.extract_from_file(str(document), FIELDS) == first
+
+
+def test_async_cache_status_matches_sync(tmp_path):
+    document = tmp_path / "paystub.txt"
+    document.write_text("Gross pay 4000")
+    agent, _ = make_agent([gemini_response({"employee_name": "Ada", "gross_pay": 4000})])
+
+    async def run():
+        first = await agent.extract_with_cache_status_async(str(document), FIELDS)
+        second = await agent.extract_with_cache_status_async(str(document), FIELDS)
+        return first, second
+
+    (first, first_hit), (second, second_hit) = asyncio.run(run())
+    assert (first_hit, second_hit) == (False, True)
+    assert first == second
+    assert "_extraction_cached" not in second
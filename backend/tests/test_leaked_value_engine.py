@@ -0,0 +1,91 @@
+import datetime
+import random
+
+import numpy as np
+import pytest
+
+from agents.leaked_value_engine import (
+    INTEGRITY_STATUS_NAMES,
+    analyze_cohort,
+    cohort_from_paystubs,
+    round_like_python,
+)
+from agents.strategist_agent import MatchFormula, compute_leaked_value, verify_paystub_math
+
+FLAT = MatchFormula(
+    source_hash="flat",
+    tiered=False,
+    tiers=(),
+    max_match_percent=0.0,
+    max_contribution_percent=0.0,
+    match_rate=0.5,
+    match_up_to=0.06,
+)
+TIERED = MatchFormula(
+    source_hash="tiered",
+    tiered=True,
+    tiers=((1.0, 0.03), (0.5, 0.02)),
+    max_match_percent=0.04,
+    max_contribution_percent=0.05,
+    match_rate=0.8,
+    match_up_to=0.05,
+)
+
+
+def random_paystubs(count, seed):
+    rng = random.Random(seed)
+    start = datetime.date(2025, 1, 1)
+    paystubs = []
+    for _ in range(count):
+        gross = rng.choice([0.0, round(rng.uniform(500, 20000), 2), rng.uniform(500, 20000)])
+        days = rng.choice([None, 7, 14, 15, 22, 30, 31])
+        taxes = round(gross * rng.uniform(0, 0.3), 2)
+        deductions = round(gross * rng.uniform(0, 0.1), 2)
+        paystub = {
+            "gross_pay": gross,
+            "pre_tax_401k": round(gross * rng.choice([0, 0.01, 0.03, 0.045, 0.06, 0.1]), 2),
+            "roth_401k": rng.choice([0, 0, round(rng.uniform(0, 200), 2)]),
+            "net_pay": round(gross - taxes - rng.choice([deductions, 0.0, 5.0]), 2),
+            "total_taxes": rng.choice([taxes, 0.0]),
+            "total_deductions": deductions,
+        }
+        if days is not None:
+            paystub["pay_period_start"] = start.isoformat()
+            paystub["pay_period_end"] = (start + datetime.timedelta(days=days - 1)).isoformat()
+        paystubs.append(paystub)
+    return paystubs
+
+
+@pytest.mark.parametrize("formula", [FLAT, TIERED], ids=["flat", "tiered"])
+def test_cohort_engine_matches_scalar_leaked_value(formula):
+    paystubs = random_paystubs(2000, seed=11)
+    result = analyze_cohort(cohort_from_paystubs(paystubs), formula)
+    for index, paystub in enumerate(paystubs):
+        expected = compute_leaked_value(paystub, formula)
+        assert float(result.annual_opportunity_cost[index]) == expected["annual_opportunity_cost"]
+        assert float(result.gap_rate[index]) == expected["gap_rate"]
+        assert int(result.pay_periods_per_year[index]) == expected["pay_periods_per_year"]
+        assert round(float(result.contribution_rate[index]), 4) == expected["current_401k_rate"]
+
+
+def test_cohort_engine_matches_scalar_payroll_integrity():
+    paystubs = random_paystubs(500, seed=5)
+    result = analyze_cohort(cohort_from_paystubs(paystubs), FLAT)
+    for index, paystub in enumerate(paystubs):
+        expected = verify_paystub_math(paystub)
+        assert INTEGRITY_STATUS_NAMES[result.integrity_status[index]] == expected["status"]
+
+
+def test_round_like_python_matches_round_on_halves_and_edges():
+    rng = np.random.default_rng(3)
+    values = np.concatenate(
+        [
+            rng.uniform(-1e6, 1e6, 20000),
+            np.round(rng.uniform(0, 1e5, 20000), 3),
+            np.array([0.125, 2.675, 1.005, -0.5, 0.5, 1.5, 2.5, -0.001, 1e20, 1e-20, np.inf, -np.inf]),
+        ]
+    )
+    for digits in (2, 4):
+        expected = [round(value, digits) for value in values.tolist()]
+        assert round_like_python(values, digits).tolist() == expected
+    assert np.isnan(round_like_python(np.array([np.nan]), 2)[0])
@@ -0,0 +1,121 @@
+import io
+import random
+from dataclasses import replace
+
+import pytest
+
+PyPDF2 = pytest.importorskip("PyPDF2")
+
+from agents.extractor_agent import NoopTracer
+from agents.policy_scout_agent import PolicyScoutAgent, load_policy_scout_config
+from constants.policy_constants import KEYWORDS
+from utils.pdf_text import prune_pdf
+from utils.request_body import build_json_body
+
+
+def write_pdf(path, page_objects):
+    """Assemble a PDF from (page dictionary, content stream, extra objects) tuples."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    kids = []
+    for page, content, extras in page_objects:
+        page_id = len(objects) + 1
+        kids.append(f"{page_id} 0 R")
+        extra_ids = [page_id + 2 + index for index in range(len(extras))]
+        objects.append(page.format(contents=page_id + 1, extras=extra_ids).encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.extend(extras)
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(out)
+
+
+# Image-only pages, like a scanner produces: no text layer at all
+def scanned_pages(count, seed=1):
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(count):
+        image = (
+            b"<< /Type /XObject /Subtype /Image /Width 120 /Height 120 /ColorSpace /DeviceGray "
+            b"/BitsPerComponent 8 /Length 14400 >>\nstream\n" + rng.randbytes(14400) + b"\nendstream"
+        )
+        page = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            "/Resources << /XObject << /Im0 {extras[0]} 0 R >> >> /Contents {contents} 0 R >>"
+        )
+        pages.append((page, b"q 612 0 0 792 0 0 cm /Im0 Do Q", [image]))
+    return pages
+
+
+def text_pages(texts):
+    font = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    page = (
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 {extras[0]} 0 R >> >> /Contents {contents} 0 R >>"
+    )
+    return [(page, f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode(), [font]) for text in texts]
+
+
+def add_outline(source, target, entries):
+    writer = PyPDF2.PdfWriter()
+    for page in PyPDF2.PdfReader(str(source)).pages:
+        writer.add_page(page)
+    for title, page in entries:
+        writer.add_outline_item(title, page)
+    with open(target, "wb") as file:
+        writer.write(file)
+
+
+@pytest.fixture
+def scanned_handbook(tmp_path):
+    plain = tmp_path / "scanned.pdf"
+    write_pdf(plain, scanned_pages(40))
+    bookmarked = tmp_path / "scanned_bookmarked.pdf"
+    add_outline(plain, bookmarked, [("Introduction", 0), ("Dress Code", 12), ("401(k) Employer Match and Vesting", 30)])
+    return plain, bookmarked
+
+
+def test_bookmarked_scan_is_pruned_to_the_matching_section(scanned_handbook):
+    _, bookmarked = scanned_handbook
+    pruned = prune_pdf(str(bookmarked), KEYWORDS, max_pages=6)
+    assert pruned is not None
+    assert pruned.pages == [29, 30, 31]
+    assert pruned.total_pages == 40
+    assert len(PyPDF2.PdfReader(io.BytesIO(pruned.data)).pages) == 3
+    # 3 of 40 image pages: an order of magnitude smaller
+    assert len(pruned.data) * 10 < bookmarked.stat().st_size
+
+
+def test_scan_without_bookmarks_is_not_pruned(scanned_handbook):
+    plain, _ = scanned_handbook
+    assert prune_pdf(str(plain), KEYWORDS, max_pages=6) is None
+
+
+def test_text_pages_are_ranked_by_matching_terms(tmp_path):
+    texts = [f"Page {index}: parking, dress code and the company picnic." for index in range(30)]
+    texts[17] = "Employer match: 100% of the first 4% you contribute."
+    texts[18] = "Employer contributions follow a 3 year cliff vesting schedule."
+    path = tmp_path / "handbook.pdf"
+    write_pdf(path, text_pages(texts))
+    pruned = prune_pdf(str(path), KEYWORDS, max_pages=4)
+    assert pruned is not None
+    assert {17, 18} <= set(pruned.pages)
+    assert len(pruned.pages) <= 4
+
+
+def test_policy_fallback_request_shrinks_for_a_bookmarked_scan(scanned_handbook):
+    _, bookmarked = scanned_handbook
+    config = load_policy_scout_config(str(bookmarked))
+    pruning = PolicyScoutAgent(None, NoopTracer(), replace(config, fallback_max_pages=6))
+    whole_file = PolicyScoutAgent(None, NoopTracer(), replace(config, fallback_max_pages=0))
+    question = "How much does the employer match?"
+    pruned_body = pruning._prepare_file_fallback(question, "no extractable text").request_body
+    whole_body = whole_file._prepare_file_fallback(question, "no extractable text").request_body
+    assert build_json_body(pruned_body).content_length * 10 < build_json_body(whole_body).content_length
@@ -0,0 +1,94 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pipeline
+from utils.url_download import DownloadedFile
+
+
+class StubPolicy:
+    async def answer_async(self, question):
+        return {"question": question, "answer": "The company matches 100% up to 6% of pay.", "sources": []}
+
+
+class StubExtractor:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def extract_from_file_async(self, path, schema_fields=None, content_hash=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Later employees finish first, so results arrive out of input order
+            await asyncio.sleep(0.01 * (10 - int(path.rsplit("-", 1)[1])))
+            if path.endswith("-3"):
+                raise RuntimeError("Extraction failed after retries: gross pay missing")
+            return {"employee_name": path, "gross_pay": 1000.0}
+        finally:
+            self.in_flight -= 1
+
+
+class StubStrategist:
+    async def synthesize_async(self, paystub, policy_answer, rsu_data=None, match_formula=None):
+        return {"recommendation": f"Raise {paystub['employee_name']}", "recommendation_source": "template"}
+
+
+class StubGuardrail:
+    async def enforce_async(self, content, source=None):
+        return {"status": "allowed", "content": content}
+
+
+def run_batch(monkeypatch, employees, max_concurrency):
+    extractor = StubExtractor()
+    agents = SimpleNamespace(
+        policy_scout=lambda path, sha256: StubPolicy(),
+        extractor=extractor,
+        strategist=StubStrategist(),
+        guardrail=StubGuardrail(),
+    )
+    monkeypatch.setattr(pipeline, "get_agent_registry", lambda: SimpleNamespace(current=lambda: agents))
+
+    def open_employee(stack, employee):
+        return DownloadedFile(path=f"paystub-{employee}", size_bytes=1, sha256=None), None
+
+    async def collect():
+        handbook = DownloadedFile(path="handbook.pdf", size_bytes=1, sha256="h")
+        return [
+            event
+            async for event in pipeline.iter_batch_events(
+                handbook, employees, open_employee, "What is the match?", max_concurrency
+            )
+        ]
+
+    return asyncio.run(collect()), extractor
+
+
+def test_batch_events_frame_results_and_errors(monkeypatch):
+    events, extractor = run_batch(monkeypatch, list(range(6)), max_concurrency=3)
+
+    assert [event["type"] for event in events[:2]] == ["start", "policy"]
+    assert events[0]["total"] == 6
+    assert events[-1]["type"] == "complete"
+    assert (events[-1]["completed"], events[-1]["failed"]) == (5, 1)
+    # Every event must survive NDJSON framing
+    for event in events:
+        assert json.loads(json.dumps(event)) == event
+
+    body = events[2:-1]
+    assert sorted(event["index"] for event in body) == list(range(6))
+    assert [event["index"] for event in body] != list(range(6))
+    errors = [event for event in body if event["type"] == "error"]
+    assert [event["index"] for event in errors] == [3]
+    assert "gross pay missing" in errors[0]["error"]
+    results = {event["index"]: event["result"] for event in body if event["type"] == "result"}
+    assert results[4]["recommendation"] == "Raise paystub-4"
+
+    progress = [event["progress"]["completed"] + event["progress"]["failed"] for event in body]
+    assert progress == list(range(1, 7))
+    assert extractor.max_in_flight <= 3
+
+
+def test_batch_with_no_employees_completes(monkeypatch):
+    events, _ = run_batch(monkeypatch, [], max_concurrency=4)
+    assert [event["type"] for event in events] == ["start", "policy", "complete"]
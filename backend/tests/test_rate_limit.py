@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from utils.rate_limit import RateLimiter, TokenBuckets, estimate_tokens, request_priority
+
+
+def test_token_buckets_refill_continuously():
+    buckets = TokenBuckets(rpm=60, tpm=600)
+    state = buckets.full(now=0.0)
+    state["requests"] = 0.0
+    # One request per second refills
+    assert buckets.take(state, tokens=1, now=0.0) == pytest.approx(1.0)
+    assert buckets.take(state, tokens=1, now=0.5) == pytest.approx(0.5)
+    assert buckets.take(state, tokens=1, now=1.0) == 0.0
+    assert state["requests"] == pytest.approx(0.0)
+
+
+def test_token_buckets_wait_for_tokens_and_cap_oversized_requests():
+    buckets = TokenBuckets(rpm=0, tpm=60)
+    state = buckets.full(now=0.0)
+    assert buckets.take(state, tokens=50, now=0.0) == 0.0
+    # 40 more tokens need 30 more than the 10 left, at one token per second
+    assert buckets.take(state, tokens=40, now=0.0) == pytest.approx(30.0)
+    # A request larger than the bucket waits for a full bucket rather than forever
+    assert buckets.take(state, tokens=1000, now=50.0) == 0.0
+    assert state["tokens"] == pytest.approx(0.0)
+
+
+def test_disabled_limiter_never_waits():
+    limiter = RateLimiter(rpm=0, tpm=0)
+    assert not limiter.enabled
+    assert limiter.acquire(10**9) == 0.0
+
+
+def test_interactive_callers_go_ahead_of_batch_callers():
+    limiter = RateLimiter(rpm=120)
+    limiter._state["requests"] = 0.0
+    order = []
+
+    def acquire(priority):
+        limiter.acquire(1, priority=priority)
+        order.append(priority)
+
+    batch = threading.Thread(target=acquire, args=("batch",))
+    interactive = threading.Thread(target=acquire, args=("interactive",))
+    batch.start()
+    time.sleep(0.05)
+    interactive.start()
+    batch.join(5)
+    interactive.join(5)
+    assert order == ["interactive", "batch"]
+
+
+def test_aged_batch_callers_are_served_in_arrival_order():
+    limiter = RateLimiter(rpm=120, batch_max_wait_seconds=0.0)
+    limiter._state["requests"] = 0.0
+    order = []
+
+    def acquire(priority):
+        limiter.acquire(1, priority=priority)
+        order.append(priority)
+
+    batch = threading.Thread(target=acquire, args=("batch",))
+    interactive = threading.Thread(target=acquire, args=("interactive",))
+    batch.start()
+    time.sleep(0.05)
+    interactive.start()
+    batch.join(5)
+    interactive.join(5)
+    assert order == ["batch", "interactive"]
+
+
+def test_shared_state_file_is_used_by_every_limiter(tmp_path):
+    path = str(tmp_path / "buckets.json")
+    first = RateLimiter(rpm=60, state_file=path)
+    second = RateLimiter(rpm=60, state_file=path)
+    for _ in range(60):
+        assert first._shared.take(1) == 0.0
+    assert second._shared.take(1) > 0.0
+
+
+def test_estimate_tokens_counts_text_and_inline_bytes():
+    payload = {
+        "contents": [
+            {"parts": [{"text": "x" * 400}, {"inline_data": {"mime_type": "application/pdf", "data": "A" * 6400}}]}
+        ]
+    }
+    # 400 chars at 4 per token, 4800 decoded bytes at 64 per token
+    assert estimate_tokens(payload) == 100 + 75
+
+
+def test_request_priority_rejects_unknown_names():
+    with pytest.raises(RuntimeError):
+        with request_priority("urgent"):
+            pass
+
+
+def test_async_acquire_with_state_file_does_not_block_the_event_loop(tmp_path):
+    import asyncio
+    import fcntl
+
+    path = str(tmp_path / "buckets.json")
+    limiter = RateLimiter(rpm=600, state_file=path)
+
+    async def scenario():
+        gaps = []
+
+        async def heartbeat():
+            last = time.monotonic()
+            for _ in range(30):
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        # Another process holds the shared file for 300 ms
+        locked = threading.Event()
+
+        def hold():
+            with open(path, "a+") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                locked.set()
+                time.sleep(0.3)
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        locked.wait(5)
+        beat = asyncio.ensure_future(heartbeat())
+        acquire = asyncio.ensure_future(limiter.acquire_async(1))
+        await acquire
+        await beat
+        holder.join(5)
+        return max(gaps)
+
+    assert asyncio.run(scenario()) < 0.15
@@ -0,0 +1,192 @@
+import asyncio
+import time
+import urllib.error
+
+import pytest
+
+from utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    RetryBudget,
+    RetryPolicy,
+    retry_budget,
+)
+
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay_seconds=0.0, max_delay_seconds=0.0)
+
+
+def http_error(code):
+    return urllib.error.HTTPError("http://gemini/models/m:generateContent", code, "error", {}, None)
+
+
+def failing(*errors, result="ok"):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return func, calls
+
+
+def trip(caller, key="m"):
+    func, _ = failing(http_error(503))
+    with pytest.raises(urllib.error.HTTPError):
+        caller.call(key, func)
+    assert caller.breaker(key).state == "open"
+
+
+def test_retries_retryable_errors_then_succeeds():
+    caller = ResilientCaller(policy=NO_WAIT, circuit_failures=10)
+    func, calls = failing(http_error(503), urllib.error.URLError("reset"))
+    assert caller.call("m", func) == "ok"
+    assert len(calls) == 3
+    assert caller.breaker("m").state == "closed"
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    caller = ResilientCaller(policy=NO_WAIT)
+    func, calls = failing(http_error(404))
+    with pytest.raises(urllib.error.HTTPError):
+        caller.call("m", func)
+    assert len(calls) == 1
+
+
+def test_exhausted_retries_raise_the_last_error():
+    caller = ResilientCaller(policy=NO_WAIT, circuit_failures=10)
+    func, calls = failing(*[http_error(503)] * 5)
+    with pytest.raises(urllib.error.HTTPError) as raised:
+        caller.call("m", func)
+    assert raised.value.code == 503
+    assert len(calls) == 3
+
+
+def test_retry_budget_is_shared_across_calls():
+    caller = ResilientCaller(policy=NO_WAIT, circuit_failures=10)
+    with retry_budget(max_retries=1, deadline_seconds=60) as budget:
+        func, calls = failing(http_error(503), http_error(503))
+        with pytest.raises(urllib.error.HTTPError):
+            caller.call("m", func)
+        assert len(calls) == 2
+        assert budget.spent == 1
+        func, calls = failing(http_error(503))
+        with pytest.raises(urllib.error.HTTPError):
+            caller.call("m", func)
+        assert len(calls) == 1
+
+
+def test_retry_budget_honours_deadline():
+    budget = RetryBudget(max_retries=5, deadline_seconds=0.0)
+    assert not budget.try_spend(0.1)
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    caller = ResilientCaller(policy=RetryPolicy(max_attempts=1), circuit_failures=2, circuit_reset_seconds=60)
+    for _ in range(2):
+        func, _ = failing(http_error(503))
+        with pytest.raises(urllib.error.HTTPError):
+            caller.call("m", func)
+    func, calls = failing()
+    with pytest.raises(CircuitOpenError, match="retry in 60s"):
+        caller.call("m", func)
+    assert calls == []
+
+
+def test_half_open_probe_success_closes_the_circuit():
+    caller = ResilientCaller(policy=RetryPolicy(max_attempts=1), circuit_failures=1, circuit_reset_seconds=0.05)
+    trip(caller)
+    time.sleep(0.06)
+    assert caller.call("m", lambda: "ok") == "ok"
+    assert caller.breaker("m").state == "closed"
+
+
+def test_half_open_probe_failure_reopens_the_circuit():
+    caller = ResilientCaller(policy=RetryPolicy(max_attempts=3), circuit_failures=1, circuit_reset_seconds=0.05)
+    trip(caller)
+    time.sleep(0.06)
+    func, calls = failing(http_error(503))
+    with pytest.raises(urllib.error.HTTPError):
+        caller.call("m", func)
+    # A failed probe re-opens at once instead of spending the remaining attempts
+    assert len(calls) == 1
+    assert caller.breaker("m").state == "open"
+
+
+def test_only_one_probe_runs_while_half_open():
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError, match="probe is in progress"):
+        breaker.before_call()
+
+
+def test_upstream_client_error_during_probe_closes_the_circuit():
+    caller = ResilientCaller(policy=RetryPolicy(max_attempts=1), circuit_failures=1, circuit_reset_seconds=0.05)
+    trip(caller)
+    time.sleep(0.06)
+    func, _ = failing(http_error(404))
+    with pytest.raises(urllib.error.HTTPError):
+        caller.call("m", func)
+    assert caller.breaker("m").state == "closed"
+
+
+def test_local_error_during_probe_leaves_the_circuit_half_open():
+    caller = ResilientCaller(policy=RetryPolicy(max_attempts=1), circuit_failures=1, circuit_reset_seconds=0.05)
+    trip(caller)
+    time.sleep(0.06)
+    func, _ = failing(RuntimeError("Unknown request priority: urgent"))
+    with pytest.raises(RuntimeError):
+        caller.call("m", func)
+    breaker = caller.breaker("m")
+    assert breaker.state == "half_open"
+    # The slot is free again, so the next call probes the model
+    assert caller.call("m", lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_cancelled_probe_frees_the_slot():
+    caller = ResilientCaller(policy=RetryPolicy(max_attempts=1), circuit_failures=1, circuit_reset_seconds=0.05)
+    trip(caller)
+    time.sleep(0.06)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    async def scenario():
+        probe = asyncio.ensure_future(caller.call_async("m", hang))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert caller.breaker("m").state == "half_open"
+        return await caller.call_async("m", ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert caller.breaker("m").state == "closed"
+
+
+def test_async_calls_retry_like_sync_calls():
+    caller = ResilientCaller(policy=NO_WAIT, circuit_failures=10)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise http_error(429)
+        return "ok"
+
+    assert asyncio.run(caller.call_async("m", flaky)) == "ok"
+    assert len(attempts) == 3
+
+
+def test_retry_policy_prefers_retry_after():
+    error = urllib.error.HTTPError("http://gemini", 429, "busy", {"Retry-After": "3"}, None)
+    policy = RetryPolicy(base_delay_seconds=0.5, max_delay_seconds=10)
+    assert policy.delay(0, error) == 3.0
+    assert 0 <= policy.delay(4) <= 8.0
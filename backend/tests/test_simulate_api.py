@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from agents.strategist_agent import MatchFormula
+
+FORMULA = MatchFormula(
+    source_hash="flat",
+    tiered=False,
+    tiers=(),
+    max_match_percent=0.0,
+    max_contribution_percent=0.0,
+    match_rate=0.5,
+    match_up_to=0.06,
+).to_dict()
+PAYSTUB = {
+    "gross_pay": 4000.0,
+    "pre_tax_401k": 120.0,
+    "pay_period_start": "2025-01-01",
+    "pay_period_end": "2025-01-14",
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(api.app)
+
+
+def simulate(client, **overrides):
+    return client.post("/simulate", json={"paystub": PAYSTUB, "match_formula": FORMULA, **overrides})
+
+
+def test_simulate_returns_sweep_and_projection(client):
+    response = simulate(client, horizon_years=3, annual_return=0.05, tenure_years=1)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["projection"]["years"]) == 3
+    assert body["sweep"]["full_match_rate"] == 0.06
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"annual_return": -1.0},
+        {"annual_return": -2.5},
+        {"salary_growth": -1.0},
+        {"salary_growth": 1e6},
+        {"tenure_years": -1},
+        {"contribution_rate": -0.1},
+        {"contribution_rate": 1.5},
+        {"horizon_years": 500},
+        {"step": 0},
+    ],
+)
+def test_simulate_rejects_out_of_range_inputs(client, overrides):
+    assert simulate(client, **overrides).status_code == 422
+
+
+@pytest.mark.parametrize("match_formula", [{"foo": 1}, {"tiers": [[1, 0.03]]}, {**FORMULA, "tiers": 5}])
+def test_simulate_rejects_malformed_match_formula(client, match_formula):
+    assert simulate(client, match_formula=match_formula).status_code == 422
+
+
+def test_simulate_rejects_inputs_that_overflow(client):
+    response = simulate(client, paystub={**PAYSTUB, "gross_pay": 1e308}, horizon_years=50, annual_return=1.0)
+    assert response.status_code == 422
+    assert "non-finite" in response.json()["detail"]
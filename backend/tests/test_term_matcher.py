@@ -0,0 +1,79 @@
+import random
+import re
+
+from constants.app_defaults import DEFAULT_GUARDRAIL_BLOCKLIST
+from utils.term_matcher import TermMatcher
+
+
+def spans(matcher, text):
+    return [(match.start, match.end, match.text) for match in matcher.find_all(text)]
+
+
+# The single regex the guardrail used before the matcher
+def regex_baseline(terms, text):
+    pattern = r"\b(" + "|".join(map(re.escape, terms)) + r")\b"
+    return re.findall(pattern, text, re.I)
+
+
+def test_overlapping_terms_prefer_the_longest_at_a_position():
+    matcher = TermMatcher(("bit", "bitcoin", "coin"))
+    assert spans(matcher, "bitcoin and bit") == [(0, 7, "bitcoin"), (12, 15, "bit")]
+    # "coin" inside "bitcoin" is not on a word boundary
+    assert spans(matcher, "bitcoin") == [(0, 7, "bitcoin")]
+
+
+def test_terms_must_sit_on_word_boundaries():
+    matcher = TermMatcher(("eth", "meta"))
+    assert spans(matcher, "method metadata meta-analysis") == [(16, 20, "meta")]
+    assert spans(matcher, "ETH_USD eth") == [(8, 11, "eth")]
+
+
+def test_multi_word_terms():
+    matcher = TermMatcher(("bit coin", "coin", "stock tips"))
+    text = "Hot  stock tips: buy bit coin, not coin."
+    assert spans(matcher, text) == [
+        (5, 15, "stock tips"),
+        (21, 29, "bit coin"),
+        (35, 39, "coin"),
+    ]
+
+
+def test_terms_at_start_and_end_of_text():
+    matcher = TermMatcher(("tesla", "nvda"))
+    assert spans(matcher, "Tesla beats NVDA") == [(0, 5, "Tesla"), (12, 16, "NVDA")]
+    assert spans(matcher, "nvda") == [(0, 4, "nvda")]
+
+
+def test_spans_index_the_original_text_when_lowercasing_changes_length():
+    # "İ" lower-cases to two characters, shifting every later index in the folded copy
+    text = "İİ Tesla İ and btc."
+    matcher = TermMatcher(("tesla", "btc", "i"))
+    matches = matcher.find_all(text)
+    assert [(match.start, match.end) for match in matches] == [(3, 8), (9, 10), (15, 18)]
+    for match in matches:
+        assert text[match.start : match.end] == match.text
+    assert [match.text for match in matches] == ["Tesla", "İ", "btc"]
+
+
+def test_case_insensitive_with_original_casing_in_results():
+    matcher = TermMatcher(("Amazon",))
+    assert spans(matcher, "AMAZON amazon AmAzOn") == [(0, 6, "AMAZON"), (7, 13, "amazon"), (14, 20, "AmAzOn")]
+
+
+def test_matches_the_regex_baseline_on_the_default_blocklist():
+    rng = random.Random(19)
+    filler = ["buy", "index", "funds", "method", "metadata", "bitcoins", "apples", "ethics", "the", "401k"]
+    vocabulary = list(DEFAULT_GUARDRAIL_BLOCKLIST) + filler
+    separators = [" ", ", ", ". ", "\n", "-", "/", " (", ") "]
+    matcher = TermMatcher(DEFAULT_GUARDRAIL_BLOCKLIST)
+    for _ in range(500):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 25))]
+        words = [word.upper() if rng.random() < 0.2 else word.title() if rng.random() < 0.2 else word for word in words]
+        text = "".join(word + rng.choice(separators) for word in words)
+        assert [match.text for match in matcher.find_all(text)] == regex_baseline(DEFAULT_GUARDRAIL_BLOCKLIST, text)
+
+
+def test_empty_inputs():
+    assert TermMatcher(()).find_all("tesla") == []
+    assert TermMatcher(("tesla",)).find_all("") == []
+    assert TermMatcher(("  ", "tesla", "tesla")).terms == ("tesla",)
@@ -0,0 +1,104 @@
+import heapq
+import math
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from constants.app_defaults import DEFAULT_BM25_B, DEFAULT_BM25_K1
+
+Postings = Dict[str, Dict[int, int]]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index of {token: {doc_index: term_frequency}}.
+    Postings can live in memory or be fetched per query from a persistent
+    store, so a search only touches the posting lists of the query terms.
+    """
+
+    def __init__(
+        self,
+        doc_lengths: Sequence[int],
+        postings: Postings | None = None,
+        postings_lookup: Callable[[Iterable[str]], Postings] | None = None,
+        k1: float = DEFAULT_BM25_K1,
+        b: float = DEFAULT_BM25_B,
+    ) -> None:
+        if postings is None and postings_lookup is None:
+            raise RuntimeError("BM25Index needs postings or a postings lookup")
+        self.doc_lengths = list(doc_lengths)
+        self.doc_count = len(self.doc_lengths)
+        self.avg_doc_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+        self.k1 = k1
+        self.b = b
+        self._postings = postings
+        self._postings_lookup = postings_lookup
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: Sequence[str],
+        tokenize: Callable[[str], List[str]],
+        k1: float = DEFAULT_BM25_K1,
+        b: float = DEFAULT_BM25_B,
+    ) -> "BM25Index":
+        postings, doc_lengths = build_postings(documents, tokenize)
+        return cls(doc_lengths, postings=postings, k1=k1, b=b)
+
+    # Return up to top_k (doc_index, score) pairs, best first; ties keep document order
+    def search(self, query_tokens: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        if not query_tokens or top_k <= 0 or not self.doc_count:
+            return []
+        query_counts = Counter(query_tokens)
+        postings = self._fetch(query_counts.keys())
+        scores = self._score(query_counts, postings)
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(doc_index, score) for doc_index, score in best]
+
+    # Run several queries with one postings fetch for the union of their terms
+    def search_many(self, queries: Sequence[Sequence[str]], top_k: int) -> List[List[Tuple[int, float]]]:
+        vocabulary = {token for query in queries for token in query}
+        postings = self._fetch(vocabulary)
+        results = []
+        for query_tokens in queries:
+            if not query_tokens or top_k <= 0 or not self.doc_count:
+                results.append([])
+                continue
+            scores = self._score(Counter(query_tokens), postings)
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+            results.append([(doc_index, score) for doc_index, score in best])
+        return results
+
+    def idf(self, document_frequency: int) -> float:
+        return math.log(1.0 + (self.doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _fetch(self, tokens: Iterable[str]) -> Postings:
+        if self._postings is not None:
+            return {token: self._postings[token] for token in tokens if token in self._postings}
+        return self._postings_lookup(tokens)
+
+    def _score(self, query_counts: Counter, postings: Postings) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for token, query_tf in query_counts.items():
+            doc_tfs = postings.get(token)
+            if not doc_tfs:
+                continue
+            idf = self.idf(len(doc_tfs))
+            for doc_index, tf in doc_tfs.items():
+                length_norm = 1.0 - self.b + self.b * (self.doc_lengths[doc_index] / self.avg_doc_length)
+                term_score = idf * (tf * (self.k1 + 1.0)) / (tf + self.k1 * length_norm)
+                scores[doc_index] = scores.get(doc_index, 0.0) + query_tf * term_score
+        return scores
+
+
+# Build {token: {doc_index: tf}} postings and token counts per document
+def build_postings(
+    documents: Sequence[str], tokenize: Callable[[str], List[str]]
+) -> Tuple[Postings, List[int]]:
+    postings: Postings = {}
+    doc_lengths = []
+    for doc_index, document in enumerate(documents):
+        tokens = tokenize(document)
+        doc_lengths.append(len(tokens))
+        for token, tf in Counter(tokens).items():
+            postings.setdefault(token, {})[doc_index] = tf
+    return postings, doc_lengths
@@ -0,0 +1,307 @@
+import copy
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+
+# Directory for local caches and indexes; override with VESTING_BUDDY_CACHE_DIR
+def default_cache_dir() -> str:
+    return os.getenv("VESTING_BUDDY_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "vesting-buddy")
+
+
+class MemoryLRUCache:
+    """
+    In-process LRU cache with a per-entry TTL.
+    Values are deep-copied in and out so callers can mutate what they get back.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(max_entries, 0)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries == 0:
+            return
+        stored = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    On-disk JSON value cache backed by SQLite.
+    Entries expire after ttl_seconds; once the stored payload exceeds
+    max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries(accessed_at)"
+        )
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return None
+            self._connection.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, now + self.ttl_seconds, now),
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM cache_entries")
+
+    def _evict(self, now: float) -> None:
+        self._connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT key, size FROM cache_entries ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM cache_entries WHERE key = ?", stale)
+
+
+class DirectoryCache:
+    """
+    On-disk JSON value cache with one zlib-compressed file per key.
+    Suited to large values such as raw LLM responses, and safe to share
+    between processes since every write is an atomic rename. Access time
+    is tracked through file mtimes; past max_bytes the oldest files go.
+    """
+
+    SUFFIX = ".json.z"
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._scan())
+
+    def get(self, key: str) -> Any | None:
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, "rb") as file:
+                entry = json.loads(zlib.decompress(file.read()))
+        except (OSError, ValueError, zlib.error):
+            return None
+        if entry["expires_at"] <= time.time():
+            self.delete(key)
+            return None
+        try:
+            os.utime(file_path)
+        except OSError:
+            pass
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        encoded = json.dumps({"expires_at": time.time() + self.ttl_seconds, "value": value}, ensure_ascii=False)
+        data = zlib.compress(encoded.encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return
+        file_path = self._file_path(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            previous = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            os.replace(temp_path, file_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            self._total_bytes += len(data) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        file_path = self._file_path(key)
+        try:
+            size = os.path.getsize(file_path)
+            os.remove(file_path)
+        except OSError:
+            return
+        with self._lock:
+            self._total_bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for file_path, _, _ in self._scan():
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    # Keys are hex digests; a two-character fan-out keeps directories small
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + self.SUFFIX)
+
+    def _scan(self) -> list[Tuple[str, float, int]]:
+        entries = []
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if not name.endswith(self.SUFFIX):
+                    continue
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entries.append((file_path, stat.st_mtime, stat.st_size))
+        return entries
+
+    # Rescan so files written by other processes count too, then drop least recently used
+    def _evict(self) -> None:
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for file_path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file_path)
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional persistent tier, with hit/miss counters.
+    Disk hits are promoted into memory.
+    """
+
+    def __init__(self, memory: MemoryLRUCache, disk: SQLiteCache | DirectoryCache | None = None) -> None:
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def get(self, key: str) -> Any | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits", "memory_hits")
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._count("hits", "disk_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self._count("writes")
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        return stats
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
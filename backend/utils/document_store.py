@@ -0,0 +1,256 @@
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from constants.app_defaults import DEFAULT_DOCUMENT_STORE_MAX_BYTES, DEFAULT_DOWNLOAD_MAX_BYTES
+from utils.cache_store import default_cache_dir
+from utils.url_download import download_url, remove_temp_file
+
+_DOCUMENT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+_SUFFIX_PATTERN = re.compile(r"^\.[0-9A-Za-z]{1,5}$")
+
+
+@dataclass(frozen=True)
+class StoredDocument:
+    document_id: str
+    path: str
+    suffix: str
+    size_bytes: int
+    refcount: int
+
+
+def is_document_id(value: str) -> bool:
+    return bool(_DOCUMENT_ID_PATTERN.match(value or ""))
+
+
+# Keep the extension so MIME sniffing and handbook parsing still work; unknown types fall back to .bin
+def normalize_suffix(filename: str | None) -> str:
+    suffix = os.path.splitext(filename or "")[1].lower()
+    return suffix if _SUFFIX_PATTERN.match(suffix) else ".bin"
+
+
+class DocumentWriter:
+    """
+    Streams an upload into a temp file inside the store, hashing as it goes.
+    commit() deduplicates by content hash and returns the stored document.
+    """
+
+    def __init__(self, store: "DocumentStore", suffix: str, max_size_bytes: int) -> None:
+        self.store = store
+        self.suffix = suffix
+        self.max_size_bytes = max_size_bytes
+        self.size_bytes = 0
+        self._digest = hashlib.sha256()
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=store.incoming_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size_bytes += len(chunk)
+        if self.size_bytes > self.max_size_bytes:
+            self.abort()
+            raise RuntimeError(f"Upload size exceeds max {self.max_size_bytes} bytes")
+        self._file.write(chunk)
+        self._digest.update(chunk)
+
+    def commit(self, source_url: str | None = None) -> StoredDocument:
+        self._file.close()
+        return self.store.add_file(
+            self.path, self.suffix, self._digest.hexdigest(), self.size_bytes, source_url=source_url
+        )
+
+    def abort(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        remove_temp_file(self.path)
+
+
+class DocumentStore:
+    """
+    Content-addressed document store on local disk.
+    Documents are keyed by their sha256, so repeat uploads are deduplicated
+    and only bump a reference count. When the stored bytes exceed max_bytes
+    the least recently used documents are evicted, unreferenced ones first;
+    documents leased by an in-flight request are never evicted.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int, max_document_bytes: int) -> None:
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.max_document_bytes = max_document_bytes
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.incoming_dir = os.path.join(root_dir, "incoming")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._leases: dict[str, int] = {}
+        self._connection = sqlite3.connect(
+            os.path.join(root_dir, "documents.sqlite3"), check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "document_id TEXT PRIMARY KEY, suffix TEXT NOT NULL, size INTEGER NOT NULL, "
+            "refcount INTEGER NOT NULL, source_url TEXT, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS documents_accessed ON documents(accessed_at)"
+        )
+
+    def writer(self, filename: str | None = None) -> DocumentWriter:
+        return DocumentWriter(self, normalize_suffix(filename), self.max_document_bytes)
+
+    # Download a URL into the store; the streamed hash doubles as the document ID
+    def register_url(self, url: str) -> StoredDocument:
+        downloaded = download_url(url, max_size_bytes=self.max_document_bytes)
+        return self.add_file(
+            downloaded.path,
+            normalize_suffix(downloaded.path),
+            downloaded.sha256,
+            downloaded.size_bytes,
+            source_url=url,
+        )
+
+    # Move a fully written file into the store, or drop it if the content is already stored
+    def add_file(
+        self, path: str, suffix: str, document_id: str, size_bytes: int, source_url: str | None = None
+    ) -> StoredDocument:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT suffix FROM documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+            if row is not None and os.path.isfile(self._object_path(document_id, row[0])):
+                remove_temp_file(path)
+                self._connection.execute(
+                    "UPDATE documents SET refcount = refcount + 1, accessed_at = ? WHERE document_id = ?",
+                    (now, document_id),
+                )
+            else:
+                target = self._object_path(document_id, suffix)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO documents "
+                    "(document_id, suffix, size, refcount, source_url, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, 1, ?, ?, ?)",
+                    (document_id, suffix, size_bytes, source_url, now, now),
+                )
+            self._evict(keep=document_id)
+            return self._load(document_id)
+
+    def get(self, document_id: str) -> StoredDocument | None:
+        if not is_document_id(document_id):
+            return None
+        with self._lock:
+            return self._load(document_id)
+
+    # Pin a document for the duration of a request and yield it
+    @contextmanager
+    def lease(self, document_id: str) -> Iterator[StoredDocument]:
+        with self._lock:
+            document = self._load(document_id) if is_document_id(document_id) else None
+            if document is None:
+                raise KeyError(document_id)
+            self._connection.execute(
+                "UPDATE documents SET accessed_at = ? WHERE document_id = ?", (time.time(), document_id)
+            )
+            self._leases[document_id] = self._leases.get(document_id, 0) + 1
+        try:
+            yield document
+        finally:
+            with self._lock:
+                remaining = self._leases.get(document_id, 1) - 1
+                if remaining:
+                    self._leases[document_id] = remaining
+                else:
+                    self._leases.pop(document_id, None)
+
+    # Drop one reference; the file goes once nothing references or leases it
+    def release(self, document_id: str) -> StoredDocument | None:
+        with self._lock:
+            document = self._load(document_id) if is_document_id(document_id) else None
+            if document is None:
+                return None
+            refcount = max(document.refcount - 1, 0)
+            self._connection.execute(
+                "UPDATE documents SET refcount = ? WHERE document_id = ?", (refcount, document_id)
+            )
+            if refcount == 0 and document_id not in self._leases:
+                self._remove(document_id, document.suffix)
+            return StoredDocument(
+                document_id=document.document_id,
+                path=document.path,
+                suffix=document.suffix,
+                size_bytes=document.size_bytes,
+                refcount=refcount,
+            )
+
+    def _load(self, document_id: str) -> StoredDocument | None:
+        row = self._connection.execute(
+            "SELECT suffix, size, refcount FROM documents WHERE document_id = ?", (document_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        suffix, size, refcount = row
+        path = self._object_path(document_id, suffix)
+        if not os.path.isfile(path):
+            # File removed behind our back (e.g. temp dir cleanup); forget the row
+            self._connection.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+            return None
+        return StoredDocument(
+            document_id=document_id, path=path, suffix=suffix, size_bytes=size, refcount=refcount
+        )
+
+    def _evict(self, keep: str) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT document_id, suffix, size FROM documents ORDER BY refcount > 0, accessed_at ASC"
+        ).fetchall()
+        for document_id, suffix, size in rows:
+            if total <= self.max_bytes:
+                break
+            if document_id == keep or document_id in self._leases:
+                continue
+            self._remove(document_id, suffix)
+            total -= size
+
+    def _remove(self, document_id: str, suffix: str) -> None:
+        self._connection.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+        remove_temp_file(self._object_path(document_id, suffix))
+
+    def _object_path(self, document_id: str, suffix: str) -> str:
+        return os.path.join(self.objects_dir, document_id[:2], f"{document_id}{suffix}")
+
+
+_DOCUMENT_STORE: DocumentStore | None = None
+_DOCUMENT_STORE_LOADED = False
+_DOCUMENT_STORE_LOCK = threading.Lock()
+
+
+# Return the process-wide document store, or None when DOCUMENT_STORE_ENABLED is off
+def get_document_store() -> DocumentStore | None:
+    global _DOCUMENT_STORE, _DOCUMENT_STORE_LOADED
+    with _DOCUMENT_STORE_LOCK:
+        if _DOCUMENT_STORE_LOADED:
+            return _DOCUMENT_STORE
+        _DOCUMENT_STORE_LOADED = True
+        if (os.getenv("DOCUMENT_STORE_ENABLED") or "true").lower() not in {"1", "true", "yes"}:
+            return None
+        try:
+            _DOCUMENT_STORE = DocumentStore(
+                os.getenv("DOCUMENT_STORE_PATH") or os.path.join(default_cache_dir(), "documents"),
+                max_bytes=int(os.getenv("DOCUMENT_STORE_MAX_BYTES") or DEFAULT_DOCUMENT_STORE_MAX_BYTES),
+                max_document_bytes=int(os.getenv("DOCUMENT_MAX_BYTES") or DEFAULT_DOWNLOAD_MAX_BYTES),
+            )
+        except (OSError, sqlite3.Error):
+            _DOCUMENT_STORE = None
+        return _DOCUMENT_STORE
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+
+@dataclass(frozen=True)
+class HandbookRecord:
+    index_key: str
+    content_hash: str
+    text: str
+    sections: Tuple[str, ...]
+    conflicts: bool
+    chunks: Tuple[str, ...]
+    chunk_lengths: Tuple[int, ...]
+
+
+class HandbookIndex:
+    """
+    Persistent store of parsed handbooks keyed by content hash and chunking settings.
+    Keeps the normalized text, policy sections, chunks and per-chunk token
+    postings in SQLite, with a small in-memory LRU of recently used records.
+    """
+
+    def __init__(self, path: str, memory_entries: int, max_handbooks: int) -> None:
+        self.path = path
+        self.memory_entries = max(memory_entries, 0)
+        self.max_handbooks = max(max_handbooks, 1)
+        self._records: "OrderedDict[str, HandbookRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS handbooks (
+                index_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                text TEXT NOT NULL,
+                sections TEXT NOT NULL,
+                conflicts INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS handbook_chunks (
+                index_key TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (index_key, chunk_index)
+            );
+            CREATE TABLE IF NOT EXISTS handbook_postings (
+                index_key TEXT NOT NULL,
+                token TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (index_key, token, chunk_index)
+            );
+            """
+        )
+
+    def get(self, index_key: str) -> HandbookRecord | None:
+        with self._lock:
+            record = self._records.get(index_key)
+            if record is not None:
+                self._records.move_to_end(index_key)
+                return record
+            row = self._connection.execute(
+                "SELECT content_hash, text, sections, conflicts FROM handbooks WHERE index_key = ?",
+                (index_key,),
+            ).fetchone()
+            if row is None:
+                return None
+            content_hash, text, sections, conflicts = row
+            chunk_rows = self._connection.execute(
+                "SELECT text, length FROM handbook_chunks WHERE index_key = ? ORDER BY chunk_index",
+                (index_key,),
+            ).fetchall()
+            self._connection.execute(
+                "UPDATE handbooks SET accessed_at = ? WHERE index_key = ?", (time.time(), index_key)
+            )
+            record = HandbookRecord(
+                index_key=index_key,
+                content_hash=content_hash,
+                text=text,
+                sections=tuple(json.loads(sections)),
+                conflicts=bool(conflicts),
+                chunks=tuple(chunk_text for chunk_text, _ in chunk_rows),
+                chunk_lengths=tuple(length for _, length in chunk_rows),
+            )
+            self._remember(record)
+            return record
+
+    def put(self, record: HandbookRecord, postings: Dict[str, Dict[int, int]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._delete(record.index_key)
+                self._connection.execute(
+                    "INSERT INTO handbooks (index_key, content_hash, text, sections, conflicts, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        record.index_key,
+                        record.content_hash,
+                        record.text,
+                        json.dumps(list(record.sections), ensure_ascii=False),
+                        int(record.conflicts),
+                        now,
+                        now,
+                    ),
+                )
+                self._connection.executemany(
+                    "INSERT INTO handbook_chunks (index_key, chunk_index, text, length) VALUES (?, ?, ?, ?)",
+                    [
+                        (record.index_key, i, chunk, record.chunk_lengths[i])
+                        for i, chunk in enumerate(record.chunks)
+                    ],
+                )
+                self._connection.executemany(
+                    "INSERT INTO handbook_postings (index_key, token, chunk_index, tf) VALUES (?, ?, ?, ?)",
+                    [
+                        (record.index_key, token, chunk_index, tf)
+                        for token, chunk_tfs in postings.items()
+                        for chunk_index, tf in chunk_tfs.items()
+                    ],
+                )
+                self._evict()
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._remember(record)
+
+    # Return {token: {chunk_index: tf}} for the requested tokens only
+    def postings(self, index_key: str, tokens: Iterable[str]) -> Dict[str, Dict[int, int]]:
+        unique = sorted(set(tokens))
+        if not unique:
+            return {}
+        placeholders = ",".join("?" for _ in unique)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT token, chunk_index, tf FROM handbook_postings "
+                f"WHERE index_key = ? AND token IN ({placeholders})",
+                (index_key, *unique),
+            ).fetchall()
+        result: Dict[str, Dict[int, int]] = {}
+        for token, chunk_index, tf in rows:
+            result.setdefault(token, {})[chunk_index] = tf
+        return result
+
+    def _remember(self, record: HandbookRecord) -> None:
+        if self.memory_entries == 0:
+            return
+        self._records[record.index_key] = record
+        self._records.move_to_end(record.index_key)
+        while len(self._records) > self.memory_entries:
+            self._records.popitem(last=False)
+
+    def _delete(self, index_key: str) -> None:
+        self._records.pop(index_key, None)
+        for table in ("handbooks", "handbook_chunks", "handbook_postings"):
+            self._connection.execute(f"DELETE FROM {table} WHERE index_key = ?", (index_key,))
+
+    def _evict(self) -> None:
+        rows = self._connection.execute(
+            "SELECT index_key FROM handbooks ORDER BY accessed_at DESC LIMIT -1 OFFSET ?",
+            (self.max_handbooks,),
+        ).fetchall()
+        for (index_key,) in rows:
+            self._delete(index_key)
+
@@ -0,0 +1,20 @@
+import hashlib
+import json
+from typing import Any, Callable
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+# Hash a file's content without loading it into memory
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Hash any JSON-serialisable value in a key-order independent way; default maps other objects
+def canonical_hash(value: Any, default: Callable[[Any], Any] | None = None) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
@@ -0,0 +1,450 @@
+import asyncio
+import email.message
+import http.client
+import io
+import os
+import ssl
+import threading
+import time
+import urllib.error
+import weakref
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, Union
+from urllib.parse import urlsplit
+
+from constants.app_defaults import (
+    DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS,
+    DEFAULT_HTTP_IDLE_TIMEOUT_SECONDS,
+    DEFAULT_HTTP_POOL_SIZE,
+)
+
+PoolKey = Tuple[str, str, int]
+# bytes, or a re-iterable sequence of chunks with a content_length attribute (see utils.request_body.JsonBody)
+RequestBody = Union[bytes, Iterable[Union[bytes, memoryview]]]
+
+# Errors raised when a kept-alive connection was closed by the server while idle
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+@lru_cache(maxsize=1)
+def get_ssl_context() -> ssl.SSLContext | None:
+    """
+    Build the process-wide TLS context once.
+    Loading the CA bundle is expensive, so every connection shares this context.
+    """
+    cafile = os.getenv("SSL_CERT_FILE") or os.getenv("REQUESTS_CA_BUNDLE")
+    try:
+        import certifi
+
+        cafile = certifi.where()
+    except Exception:
+        pass
+    if cafile:
+        return ssl.create_default_context(cafile=cafile)
+    return None
+
+
+def _pool_key(scheme: str, host: str, port: int | None) -> PoolKey:
+    scheme = (scheme or "https").lower()
+    if scheme not in {"http", "https"}:
+        raise urllib.error.URLError(f"Unsupported URL scheme: {scheme}")
+    if port is None:
+        port = 443 if scheme == "https" else 80
+    return scheme, host, port
+
+
+def _body_length(body: RequestBody) -> int:
+    return len(body) if isinstance(body, bytes) else body.content_length
+
+
+class _IdleConnection:
+    def __init__(self, connection: http.client.HTTPConnection) -> None:
+        self.connection = connection
+        self.released_at = time.monotonic()
+
+
+class HttpTransport:
+    """
+    Keep-alive HTTP/1.1 connection pool keyed by (scheme, host, port).
+    Up to pool_size idle connections are kept per origin; extra concurrent
+    requests open short-lived connections instead of waiting.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_HTTP_POOL_SIZE,
+        connect_timeout_seconds: float = DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS,
+        idle_timeout_seconds: float = DEFAULT_HTTP_IDLE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.pool_size = max(pool_size, 0)
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._pools: Dict[PoolKey, List[_IdleConnection]] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: RequestBody | None = None,
+        headers: Dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> bytes:
+        """
+        Send a request and return the response body.
+        Chunked bodies are written piece by piece with a Content-Length, so
+        large documents are never joined into one buffer.
+        Raises urllib.error.HTTPError for 4xx/5xx and urllib.error.URLError for
+        transport failures so callers keep urllib's error semantics.
+        """
+        parts = urlsplit(url)
+        key = _pool_key(parts.scheme, parts.hostname or "", parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request_headers = dict(headers or {})
+        request_headers.setdefault("Connection", "keep-alive")
+        if body is not None and not isinstance(body, bytes):
+            # Without it http.client would switch to chunked transfer encoding
+            request_headers["Content-Length"] = str(_body_length(body))
+
+        connection, reused = self._acquire(key)
+        try:
+            try:
+                status, reason, response_headers, data, will_close = self._exchange(
+                    connection, method, target, body, request_headers, timeout
+                )
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a fresh one
+                connection = self._connect(key)
+                status, reason, response_headers, data, will_close = self._exchange(
+                    connection, method, target, body, request_headers, timeout
+                )
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise urllib.error.URLError(exc) from exc
+
+        if will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, reason, response_headers, io.BytesIO(data))
+        return data
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for pool in pools:
+            for idle in pool:
+                idle.connection.close()
+
+    def _acquire(self, key: PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        stale: List[http.client.HTTPConnection] = []
+        connection = None
+        with self._lock:
+            pool = self._pools.get(key) or []
+            while pool:
+                idle = pool.pop()
+                if now - idle.released_at > self.idle_timeout_seconds:
+                    stale.append(idle.connection)
+                    continue
+                connection = idle.connection
+                break
+        for old in stale:
+            old.close()
+        if connection is not None:
+            return connection, True
+        try:
+            return self._connect(key), False
+        except OSError as exc:
+            raise urllib.error.URLError(exc) from exc
+
+    def _connect(self, key: PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=self.connect_timeout_seconds, context=get_ssl_context()
+            )
+        else:
+            connection = http.client.HTTPConnection(
+                host, port, timeout=self.connect_timeout_seconds
+            )
+        connection.connect()
+        return connection
+
+    def _release(self, key: PoolKey, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            if len(pool) < self.pool_size:
+                pool.append(_IdleConnection(connection))
+                return
+        connection.close()
+
+    def _exchange(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        target: str,
+        body: RequestBody | None,
+        headers: Dict[str, str],
+        timeout: float | None,
+    ):
+        if connection.sock is None:
+            connection.connect()
+        if timeout is not None:
+            connection.sock.settimeout(timeout)
+        connection.request(method, target, body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        return response.status, response.reason, response.headers, data, response.will_close
+
+
+class _AsyncConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.released_at = time.monotonic()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncHttpTransport:
+    """
+    asyncio counterpart of HttpTransport built on asyncio streams.
+    Connections belong to the event loop that opened them, so use
+    get_async_http_transport() to get the instance for the running loop.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_HTTP_POOL_SIZE,
+        connect_timeout_seconds: float = DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS,
+        idle_timeout_seconds: float = DEFAULT_HTTP_IDLE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.pool_size = max(pool_size, 0)
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._pools: Dict[PoolKey, List[_AsyncConnection]] = {}
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: RequestBody | None = None,
+        headers: Dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> bytes:
+        """
+        Send a request and return the response body.
+        Accepts the same bodies and raises the same urllib errors as HttpTransport.request.
+        """
+        parts = urlsplit(url)
+        key = _pool_key(parts.scheme, parts.hostname or "", parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        head = self._build_head(method, target, key, body, headers)
+
+        try:
+            if timeout is None:
+                status, reason, response_headers, data = await self._send(key, head, body)
+            else:
+                status, reason, response_headers, data = await asyncio.wait_for(
+                    self._send(key, head, body), timeout
+                )
+        except asyncio.TimeoutError as exc:
+            raise urllib.error.URLError(TimeoutError("timed out")) from exc
+        except (OSError, http.client.HTTPException, asyncio.IncompleteReadError) as exc:
+            raise urllib.error.URLError(exc) from exc
+
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, reason, response_headers, io.BytesIO(data))
+        return data
+
+    def close(self) -> None:
+        pools = list(self._pools.values())
+        self._pools = {}
+        for pool in pools:
+            for connection in pool:
+                connection.close()
+
+    def _build_head(
+        self,
+        method: str,
+        target: str,
+        key: PoolKey,
+        body: RequestBody | None,
+        headers: Dict[str, str] | None,
+    ) -> bytes:
+        scheme, host, port = key
+        default_port = 443 if scheme == "https" else 80
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host if port == default_port else f'{host}:{port}'}"]
+        request_headers = {"Connection": "keep-alive", "Accept-Encoding": "identity"}
+        request_headers.update(headers or {})
+        if body is not None or method in {"POST", "PUT", "PATCH"}:
+            request_headers["Content-Length"] = str(_body_length(body) if body is not None else 0)
+        lines.extend(f"{name}: {value}" for name, value in request_headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, key: PoolKey, head: bytes, body: RequestBody | None):
+        connection, reused = await self._acquire(key)
+        try:
+            try:
+                status, reason, response_headers, data, will_close = await self._exchange(
+                    connection, head, body
+                )
+            except (*_STALE_CONNECTION_ERRORS, asyncio.IncompleteReadError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a fresh one
+                connection = await self._connect(key)
+                status, reason, response_headers, data, will_close = await self._exchange(
+                    connection, head, body
+                )
+        except BaseException:
+            # Never return a half-used connection to the pool (includes cancellation)
+            connection.close()
+            raise
+        if will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+        return status, reason, response_headers, data
+
+    async def _acquire(self, key: PoolKey) -> Tuple[_AsyncConnection, bool]:
+        now = time.monotonic()
+        pool = self._pools.get(key) or []
+        while pool:
+            connection = pool.pop()
+            if now - connection.released_at > self.idle_timeout_seconds or connection.reader.at_eof():
+                connection.close()
+                continue
+            return connection, True
+        return await self._connect(key), False
+
+    async def _connect(self, key: PoolKey) -> _AsyncConnection:
+        scheme, host, port = key
+        tls: ssl.SSLContext | bool | None = None
+        if scheme == "https":
+            tls = get_ssl_context() or True
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=tls), self.connect_timeout_seconds
+        )
+        return _AsyncConnection(reader, writer)
+
+    def _release(self, key: PoolKey, connection: _AsyncConnection) -> None:
+        pool = self._pools.setdefault(key, [])
+        if len(pool) < self.pool_size:
+            connection.released_at = time.monotonic()
+            pool.append(connection)
+            return
+        connection.close()
+
+    async def _exchange(self, connection: _AsyncConnection, head: bytes, body: RequestBody | None):
+        connection.writer.write(head)
+        if isinstance(body, bytes):
+            connection.writer.write(body)
+        elif body is not None:
+            for chunk in body:
+                connection.writer.write(chunk)
+                # Drain per chunk so the transport buffer never holds a copy of the whole document
+                await connection.writer.drain()
+        await connection.writer.drain()
+
+        reader = connection.reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+        try:
+            version, status_text, *reason_parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+            status = int(status_text)
+        except ValueError as exc:
+            raise http.client.BadStatusLine(status_line.decode("latin-1", errors="replace")) from exc
+        reason = reason_parts[0] if reason_parts else ""
+
+        response_headers = email.message.Message()
+        while True:
+            line = await reader.readline()
+            if line in {b"\r\n", b"\n", b""}:
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip()] = value.strip()
+
+        will_close = (response_headers.get("Connection") or "").lower() == "close" or version == "HTTP/1.0"
+        if (response_headers.get("Transfer-Encoding") or "").lower() == "chunked":
+            data = await self._read_chunked(reader)
+        elif response_headers.get("Content-Length") is not None:
+            data = await reader.readexactly(int(response_headers["Content-Length"]))
+        else:
+            data = await reader.read()
+            will_close = True
+        return status, reason, response_headers, data, will_close
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        parts: List[bytes] = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Consume optional trailers up to the terminating blank line
+                while (await reader.readline()) not in {b"\r\n", b"\n", b""}:
+                    pass
+                break
+            parts.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return b"".join(parts)
+
+
+_TRANSPORT: HttpTransport | None = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+# Return the shared per-process transport, configured from env on first use
+def get_http_transport() -> HttpTransport:
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = HttpTransport(
+                pool_size=int(os.getenv("HTTP_POOL_SIZE") or DEFAULT_HTTP_POOL_SIZE),
+                connect_timeout_seconds=float(
+                    os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS") or DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS
+                ),
+                idle_timeout_seconds=float(
+                    os.getenv("HTTP_IDLE_TIMEOUT_SECONDS") or DEFAULT_HTTP_IDLE_TIMEOUT_SECONDS
+                ),
+            )
+        return _TRANSPORT
+
+
+_ASYNC_TRANSPORTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHttpTransport]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Return the shared async transport for the running event loop
+def get_async_http_transport() -> AsyncHttpTransport:
+    loop = asyncio.get_running_loop()
+    transport = _ASYNC_TRANSPORTS.get(loop)
+    if transport is None:
+        sync_transport = get_http_transport()
+        transport = AsyncHttpTransport(
+            pool_size=sync_transport.pool_size,
+            connect_timeout_seconds=sync_transport.connect_timeout_seconds,
+            idle_timeout_seconds=sync_transport.idle_timeout_seconds,
+        )
+        _ASYNC_TRANSPORTS[loop] = transport
+    return transport
@@ -0,0 +1,230 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from constants.app_defaults import DEFAULT_METRICS_LATENCY_BUCKETS
+
+STAGE_DURATION_SECONDS = "vesting_buddy_stage_duration_seconds"
+LLM_REQUEST_DURATION_SECONDS = "vesting_buddy_llm_request_duration_seconds"
+
+# Innermost running stage, so LLM calls can be attributed to the agent step that made them
+_CURRENT_STAGE: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_stage", default="none")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_METRICS_LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum, count
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+                self._series[key] = series
+            series[0][slot] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def snapshot(self, **labels: str) -> Dict[str, float]:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return {"count": 0, "sum": 0.0}
+            return {"count": series[1][1], "sum": series[1][0]}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, (total, count)) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                    )
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, help_text, labelnames), Counter)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_METRICS_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, help_text, labelnames, buckets), Histogram)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, name: str, factory: Callable, kind: type):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            if not isinstance(metric, kind):
+                raise RuntimeError(f"Metric {name} is already registered as {type(metric).__name__}")
+            return metric
+
+
+_METRICS_REGISTRY: MetricsRegistry | None = None
+_METRICS_REGISTRY_LOCK = threading.Lock()
+
+
+# Process-wide metrics rendered by /metrics
+def get_metrics_registry() -> MetricsRegistry:
+    global _METRICS_REGISTRY
+    with _METRICS_REGISTRY_LOCK:
+        if _METRICS_REGISTRY is None:
+            _METRICS_REGISTRY = MetricsRegistry()
+        return _METRICS_REGISTRY
+
+
+def current_stage() -> str:
+    return _CURRENT_STAGE.get()
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    started: float
+    duration_ms: float | None = None
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 3)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[StageTiming]:
+    """
+    Time a pipeline stage into vesting_buddy_stage_duration_seconds.
+    Stages nest (policy_scout contains handbook_parse), so durations of an
+    outer stage include its inner ones. duration_ms is set on exit.
+    """
+    timing = StageTiming(stage=stage, started=time.perf_counter())
+    token = _CURRENT_STAGE.set(stage)
+    outcome = "ok"
+    try:
+        yield timing
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        _CURRENT_STAGE.reset(token)
+        elapsed = time.perf_counter() - timing.started
+        timing.duration_ms = round(elapsed * 1000, 3)
+        get_metrics_registry().histogram(
+            STAGE_DURATION_SECONDS, "Duration of pipeline stages", ("stage", "outcome")
+        ).observe(elapsed, stage=stage, outcome=outcome)
+
+
+# Decorator form of stage_timer for sync and async functions
+def timed_stage(stage: str):
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe_llm_request(kind: str, model: str, outcome: str, seconds: float) -> None:
+    get_metrics_registry().histogram(
+        LLM_REQUEST_DURATION_SECONDS,
+        "Duration of each Gemini HTTP call, including retries and fallback lookups",
+        ("stage", "kind", "model", "outcome"),
+    ).observe(seconds, stage=current_stage(), kind=kind, model=model, outcome=outcome)
+
+
+def count(name: str, help_text: str, **labels: str) -> None:
+    get_metrics_registry().counter(name, help_text, tuple(sorted(labels))).inc(**labels)
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import threading
+from typing import Tuple
+
+from constants.app_defaults import (
+    DEFAULT_MODEL_LIST_TTL_SECONDS,
+    DEFAULT_MODEL_ROUTE_MAX_ENTRIES,
+    DEFAULT_MODEL_ROUTE_TTL_SECONDS,
+)
+from utils.cache_store import MemoryLRUCache
+from utils.hashing import canonical_hash
+
+
+class ModelRouter:
+    """
+    Remembers which (api_version, model) endpoint actually serves a configured
+    model, and which fallback model each API version offers.
+    Routes expire after route_ttl_seconds so a model that comes back is retried;
+    the models catalogue lookup is cached for models_ttl_seconds.
+    Keys include a hash of the API key, never the key itself.
+    """
+
+    def __init__(
+        self,
+        route_ttl_seconds: float = DEFAULT_MODEL_ROUTE_TTL_SECONDS,
+        models_ttl_seconds: float = DEFAULT_MODEL_LIST_TTL_SECONDS,
+        max_entries: int = DEFAULT_MODEL_ROUTE_MAX_ENTRIES,
+    ) -> None:
+        self._routes = MemoryLRUCache(max_entries, route_ttl_seconds)
+        self._fallbacks = MemoryLRUCache(max_entries, models_ttl_seconds)
+
+    def route(self, base_url: str, api_key: str, api_version: str, model: str) -> Tuple[str, str] | None:
+        cached = self._routes.get(self._route_key(base_url, api_key, api_version, model))
+        return (cached["api_version"], cached["model"]) if cached else None
+
+    def remember(
+        self, base_url: str, api_key: str, api_version: str, model: str, routed_version: str, routed_model: str
+    ) -> None:
+        self._routes.set(
+            self._route_key(base_url, api_key, api_version, model),
+            {"api_version": routed_version, "model": routed_model},
+        )
+
+    def forget(self, base_url: str, api_key: str, api_version: str, model: str) -> None:
+        self._routes.delete(self._route_key(base_url, api_key, api_version, model))
+
+    # (known, model); model is None when the catalogue was fetched but offered no fallback
+    def fallback_model(self, base_url: str, api_key: str, api_version: str) -> Tuple[bool, str | None]:
+        cached = self._fallbacks.get(self._catalogue_key(base_url, api_key, api_version))
+        return (False, None) if cached is None else (True, cached["model"])
+
+    def store_fallback_model(self, base_url: str, api_key: str, api_version: str, model: str | None) -> None:
+        self._fallbacks.set(self._catalogue_key(base_url, api_key, api_version), {"model": model})
+
+    def clear(self) -> None:
+        self._routes.clear()
+        self._fallbacks.clear()
+
+    @staticmethod
+    def _catalogue_key(base_url: str, api_key: str, api_version: str) -> str:
+        return canonical_hash(
+            {
+                "base_url": base_url,
+                "api_key_sha256": hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+                "api_version": api_version,
+            }
+        )
+
+    @classmethod
+    def _route_key(cls, base_url: str, api_key: str, api_version: str, model: str) -> str:
+        return canonical_hash({"catalogue": cls._catalogue_key(base_url, api_key, api_version), "model": model})
+
+
+_MODEL_ROUTER: ModelRouter | None = None
+_MODEL_ROUTER_LOCK = threading.Lock()
+
+
+# Process-wide routing table shared by every GeminiClient, so it survives agent reloads
+def get_model_router() -> ModelRouter:
+    global _MODEL_ROUTER
+    with _MODEL_ROUTER_LOCK:
+        if _MODEL_ROUTER is None:
+            _MODEL_ROUTER = ModelRouter(
+                route_ttl_seconds=float(os.getenv("MODEL_ROUTE_TTL_SECONDS") or DEFAULT_MODEL_ROUTE_TTL_SECONDS),
+                models_ttl_seconds=float(os.getenv("MODEL_LIST_TTL_SECONDS") or DEFAULT_MODEL_LIST_TTL_SECONDS),
+            )
+        return _MODEL_ROUTER
@@ -0,0 +1,238 @@
+import io
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Sequence, Tuple
+
+from constants.app_defaults import (
+    DEFAULT_POLICY_PDF_BATCH_PAGES,
+    DEFAULT_POLICY_PDF_PARALLEL_MIN_PAGES,
+)
+
+PDF_SUPPORT_ERROR = "PDF support requires PyPDF2 or pdfplumber"
+PDF_PRUNE_SUPPORT_ERROR = "PDF page pruning requires PyPDF2"
+
+_PROCESS_POOL: ProcessPoolExecutor | None = None
+_PROCESS_POOL_WORKERS = 0
+_PROCESS_POOL_LOCK = threading.Lock()
+
+
+def iter_pdf_pages(
+    path: str,
+    workers: int = 0,
+    min_parallel_pages: int = DEFAULT_POLICY_PDF_PARALLEL_MIN_PAGES,
+    batch_pages: int = DEFAULT_POLICY_PDF_BATCH_PAGES,
+) -> Iterator[str]:
+    """
+    Yield the text of each PDF page in order.
+    Large documents are split into page batches extracted by a process pool;
+    only a bounded number of batches is in flight, and closing the generator
+    cancels the rest.
+    """
+    if workers > 1:
+        page_count = count_pdf_pages(path)
+        if page_count >= min_parallel_pages:
+            yield from _iter_pages_parallel(path, page_count, workers, max(batch_pages, 1))
+            return
+    yield from _iter_pages_serial(path)
+
+
+# Join page text, stopping as soon as stop_when(page_text) returns True
+def read_pdf_text(
+    path: str,
+    stop_when: Callable[[str], bool] | None = None,
+    workers: int = 0,
+    min_parallel_pages: int = DEFAULT_POLICY_PDF_PARALLEL_MIN_PAGES,
+    batch_pages: int = DEFAULT_POLICY_PDF_BATCH_PAGES,
+) -> str:
+    pages = iter_pdf_pages(path, workers, min_parallel_pages, batch_pages)
+    parts: List[str] = []
+    try:
+        for text in pages:
+            parts.append(text)
+            if stop_when is not None and stop_when(text):
+                break
+    finally:
+        pages.close()
+    return "\n".join(parts)
+
+
+def count_pdf_pages(path: str) -> int:
+    try:
+        from PyPDF2 import PdfReader
+
+        return len(PdfReader(path).pages)
+    except Exception:
+        pass
+    try:
+        import pdfplumber
+    except Exception as exc:
+        raise RuntimeError(PDF_SUPPORT_ERROR) from exc
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+@dataclass
+class PrunedPdf:
+    data: bytes
+    pages: List[int]
+    total_pages: int
+
+
+def prune_pdf(path: str, terms: Sequence[str], max_pages: int, neighbours: int = 1) -> PrunedPdf | None:
+    """
+    Copy the pages most likely to answer a question into a new, smaller PDF.
+    Pages are ranked by how many distinct terms their text contains, with a
+    boost for pages that outline (bookmark) titles matching a term point at.
+    Each hit also pulls in up to `neighbours` following pages, and the
+    previous one, since sections run across page breaks. Returns None when
+    nothing matched or every page would be kept.
+    Scanned pages have no text to score, so for a scanned handbook the
+    outline is the only signal: without bookmarks nothing is pruned. There
+    is no OCR here.
+    """
+    try:
+        from PyPDF2 import PdfReader, PdfWriter
+    except Exception as exc:
+        raise RuntimeError(PDF_PRUNE_SUPPORT_ERROR) from exc
+    reader = PdfReader(path)
+    total = len(reader.pages)
+    lowered = [term.lower() for term in terms if term]
+    scores: Dict[int, float] = {}
+    for index, page in enumerate(reader.pages):
+        try:
+            text = (page.extract_text() or "").lower()
+        except Exception:
+            continue
+        hits = [text.count(term) for term in lowered]
+        distinct = sum(1 for hit in hits if hit)
+        if distinct:
+            # Distinct terms dominate; raw counts only break ties
+            scores[index] = distinct + min(sum(hits), 99) / 100
+    for title, index in _outline_pages(reader):
+        if 0 <= index < total and any(term in title.lower() for term in lowered):
+            scores[index] = scores.get(index, 0.0) + 2
+    selected: List[int] = []
+    for index in sorted(scores, key=lambda page: (-scores[page], page)):
+        for page in [index, *range(index + 1, index + neighbours + 1), index - 1]:
+            if len(selected) >= max_pages:
+                break
+            if 0 <= page < total and page not in selected:
+                selected.append(page)
+    if not selected or len(selected) >= total:
+        return None
+    pages = sorted(selected)
+    writer = PdfWriter()
+    for index in pages:
+        writer.add_page(reader.pages[index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return PrunedPdf(data=buffer.getvalue(), pages=pages, total_pages=total)
+
+
+# (title, page index) for every outline entry, flattening nested outlines
+def _outline_pages(reader: Any) -> Iterator[Tuple[str, int]]:
+    try:
+        stack = list(reader.outline or [])
+    except Exception:
+        return
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+            continue
+        try:
+            yield str(item.title or ""), reader.get_destination_page_number(item)
+        except Exception:
+            continue
+
+
+# Process pool entry point: text for pages [start, end)
+def extract_page_range(path: str, start: int, end: int) -> List[str]:
+    return list(_iter_pages_serial(path, start, end))
+
+
+def _iter_pages_serial(path: str, start: int = 0, end: int | None = None) -> Iterator[str]:
+    next_page = start
+    try:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(path)
+        stop = len(reader.pages) if end is None else min(end, len(reader.pages))
+        while next_page < stop:
+            text = reader.pages[next_page].extract_text() or ""
+            next_page += 1
+            yield text
+        return
+    except Exception:
+        # Resume with pdfplumber from the page PyPDF2 could not handle
+        pass
+    try:
+        import pdfplumber
+    except Exception as exc:
+        raise RuntimeError(PDF_SUPPORT_ERROR) from exc
+    with pdfplumber.open(path) as pdf:
+        stop = len(pdf.pages) if end is None else min(end, len(pdf.pages))
+        for index in range(next_page, stop):
+            page = pdf.pages[index]
+            text = page.extract_text() or ""
+            # Drop parsed layout objects so memory does not grow with page count
+            if hasattr(page, "close"):
+                page.close()
+            yield text
+
+
+def _iter_pages_parallel(path: str, page_count: int, workers: int, batch_pages: int) -> Iterator[str]:
+    try:
+        executor = _get_process_pool(workers)
+    except (OSError, ValueError, NotImplementedError):
+        yield from _iter_pages_serial(path)
+        return
+    pending: Deque[Future] = deque()
+    next_start = 0
+    pages_done = 0
+    max_in_flight = workers * 2
+    try:
+        while next_start < page_count or pending:
+            while next_start < page_count and len(pending) < max_in_flight:
+                end = min(next_start + batch_pages, page_count)
+                pending.append(executor.submit(extract_page_range, path, next_start, end))
+                next_start = end
+            batch = pending.popleft().result()
+            for text in batch:
+                pages_done += 1
+                yield text
+    except (BrokenProcessPool, OSError):
+        _reset_process_pool()
+        for future in pending:
+            future.cancel()
+        pending.clear()
+        yield from _iter_pages_serial(path, pages_done)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    global _PROCESS_POOL, _PROCESS_POOL_WORKERS
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is None or _PROCESS_POOL_WORKERS != workers:
+            if _PROCESS_POOL is not None:
+                _PROCESS_POOL.shutdown(wait=False, cancel_futures=True)
+            # spawn avoids forking a process that already runs server threads
+            _PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _PROCESS_POOL_WORKERS = workers
+        return _PROCESS_POOL
+
+
+def _reset_process_pool() -> None:
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is not None:
+            _PROCESS_POOL.shutdown(wait=False, cancel_futures=True)
+        _PROCESS_POOL = None
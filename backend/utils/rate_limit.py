@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple
+
+from constants.app_defaults import (
+    DEFAULT_RATE_LIMIT_BATCH_MAX_WAIT_SECONDS,
+    DEFAULT_RATE_LIMIT_CHARS_PER_TOKEN,
+    DEFAULT_RATE_LIMIT_INLINE_BYTES_PER_TOKEN,
+    RATE_LIMIT_PRIORITIES,
+)
+from utils.metrics import get_metrics_registry
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process limiter
+    fcntl = None
+
+# Interactive requests (/chat, /analyze, /analyze/stream) unless a batch job says otherwise
+_PRIORITY: contextvars.ContextVar[str] = contextvars.ContextVar("llm_priority", default="interactive")
+
+
+def current_priority() -> str:
+    return _PRIORITY.get()
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    if priority not in RATE_LIMIT_PRIORITIES:
+        raise RuntimeError(f"Unknown request priority: {priority}")
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+# Rough input token count: prompt characters plus inline file bytes, decoded from base64 length
+def estimate_tokens(
+    payload: Any,
+    chars_per_token: float = DEFAULT_RATE_LIMIT_CHARS_PER_TOKEN,
+    inline_bytes_per_token: float = DEFAULT_RATE_LIMIT_INLINE_BYTES_PER_TOKEN,
+) -> int:
+    text_chars = 0
+    inline_bytes = 0
+    stack = [payload]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            inline = value.get("inline_data") or value.get("inlineData")
+            if isinstance(inline, dict):
+                inline_bytes += (len(inline.get("data") or "") * 3) // 4
+            text = value.get("text")
+            if isinstance(text, str):
+                text_chars += len(text)
+            stack.extend(item for key, item in value.items() if key not in {"inline_data", "inlineData", "text"})
+        elif isinstance(value, list):
+            stack.extend(value)
+    return max(1, math.ceil(text_chars / chars_per_token + inline_bytes / inline_bytes_per_token))
+
+
+class TokenBuckets:
+    """
+    Two token buckets refilled continuously: one for requests per minute and
+    one for input tokens per minute. A limit of 0 disables that bucket.
+    State is a plain dict so it can live in memory or in a shared file.
+    """
+
+    def __init__(self, rpm: int, tpm: int) -> None:
+        self.rpm = max(rpm, 0)
+        self.tpm = max(tpm, 0)
+
+    def full(self, now: float) -> Dict[str, float]:
+        return {"requests": float(self.rpm), "tokens": float(self.tpm), "updated": now}
+
+    # Take one request and `tokens` if both buckets allow it; otherwise return seconds to wait
+    def take(self, state: Dict[str, float], tokens: int, now: float) -> float:
+        elapsed = max(now - state["updated"], 0.0)
+        state["requests"] = min(float(self.rpm), state["requests"] + elapsed * self.rpm / 60)
+        state["tokens"] = min(float(self.tpm), state["tokens"] + elapsed * self.tpm / 60)
+        state["updated"] = now
+        # A request bigger than the whole bucket waits for a full bucket, not forever
+        tokens = min(tokens, self.tpm)
+        wait = 0.0
+        if self.rpm and state["requests"] < 1:
+            wait = max(wait, (1 - state["requests"]) * 60 / self.rpm)
+        if self.tpm and state["tokens"] < tokens:
+            wait = max(wait, (tokens - state["tokens"]) * 60 / self.tpm)
+        if wait > 0:
+            return wait
+        if self.rpm:
+            state["requests"] -= 1
+        if self.tpm:
+            state["tokens"] -= tokens
+        return 0.0
+
+
+class FileBucketState:
+    """
+    Bucket state shared by every process on the host through a small JSON
+    file, updated under an exclusive flock. Uses wall-clock time, since
+    monotonic clocks are not comparable across processes.
+    """
+
+    def __init__(self, path: str, buckets: TokenBuckets) -> None:
+        self.path = path
+        self.buckets = buckets
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def take(self, tokens: int) -> float:
+        with open(self.path, "a+", encoding="utf-8") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                now = time.time()
+                try:
+                    state = json.loads(handle.read() or "null") or self.buckets.full(now)
+                except ValueError:
+                    state = self.buckets.full(now)
+                wait = self.buckets.take(state, tokens, now)
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+                return wait
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """
+    Client-side RPM/TPM limiter for Gemini calls.
+    Callers queue in order of arrival within a priority, and interactive
+    callers go ahead of batch ones; a batch caller that has waited longer
+    than batch_max_wait_seconds is served in arrival order so batch jobs
+    cannot starve. With state_file set, the buckets are shared by every
+    process using the same file; queue order applies within a process.
+    """
+
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        state_file: str | None = None,
+        batch_max_wait_seconds: float = DEFAULT_RATE_LIMIT_BATCH_MAX_WAIT_SECONDS,
+    ) -> None:
+        self.buckets = TokenBuckets(rpm, tpm)
+        self.batch_max_wait_seconds = batch_max_wait_seconds
+        self._shared = FileBucketState(state_file, self.buckets) if state_file and fcntl is not None else None
+        self._state = self.buckets.full(time.monotonic())
+        self._waiting: Dict[int, Tuple[str, float]] = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.buckets.rpm or self.buckets.tpm)
+
+    def acquire(self, tokens: int, priority: str | None = None) -> float:
+        if not self.enabled:
+            return 0.0
+        priority = priority or current_priority()
+        started = time.monotonic()
+        ticket = self._enqueue(priority, started)
+        try:
+            with self._condition:
+                while True:
+                    wait = self._try_take(ticket, tokens)
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+        finally:
+            self._dequeue(ticket)
+        return self._observe_wait(priority, started)
+
+    async def acquire_async(self, tokens: int, priority: str | None = None) -> float:
+        if not self.enabled:
+            return 0.0
+        priority = priority or current_priority()
+        started = time.monotonic()
+        ticket = self._enqueue(priority, started)
+        try:
+            while True:
+                with self._condition:
+                    # The shared state file is flocked and rewritten; only the head caller touches it, off the loop
+                    offload = self._shared is not None and self._is_head(ticket)
+                    if not offload:
+                        wait = self._try_take(ticket, tokens)
+                if offload:
+                    wait = await asyncio.to_thread(self._locked_try_take, ticket, tokens)
+                if wait <= 0:
+                    break
+                # Re-check at least every 50 ms so a sync caller releasing the head is noticed
+                await asyncio.sleep(min(wait, 0.05))
+        finally:
+            self._dequeue(ticket)
+        return self._observe_wait(priority, started)
+
+    def _locked_try_take(self, ticket: int, tokens: int) -> float:
+        with self._condition:
+            return self._try_take(ticket, tokens)
+
+    def _enqueue(self, priority: str, started: float) -> int:
+        ticket = next(self._sequence)
+        with self._condition:
+            self._waiting[ticket] = (priority, started)
+        return ticket
+
+    def _dequeue(self, ticket: int) -> None:
+        with self._condition:
+            self._waiting.pop(ticket, None)
+            self._condition.notify_all()
+
+    # Seconds to wait, or 0 once this ticket is first in line and the buckets allowed it
+    def _try_take(self, ticket: int, tokens: int) -> float:
+        now = time.monotonic()
+        if not self._is_head(ticket, now):
+            return 0.05
+        if self._shared is not None:
+            return self._shared.take(tokens)
+        return self.buckets.take(self._state, tokens, now)
+
+    def _is_head(self, ticket: int, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return min(self._waiting, key=lambda waiting: self._queue_position(waiting, now)) == ticket
+
+    def _queue_position(self, ticket: int, now: float) -> Tuple[int, int]:
+        priority, started = self._waiting[ticket]
+        aged = now - started >= self.batch_max_wait_seconds
+        rank = 0 if aged else RATE_LIMIT_PRIORITIES.index(priority)
+        return rank, ticket
+
+    def _observe_wait(self, priority: str, started: float) -> float:
+        waited = time.monotonic() - started
+        get_metrics_registry().histogram(
+            "vesting_buddy_llm_rate_limit_wait_seconds",
+            "Time Gemini calls waited for client-side RPM/TPM quota",
+            ("priority",),
+        ).observe(waited, priority=priority)
+        return waited
+
+
+_RATE_LIMITER: RateLimiter | None = None
+_RATE_LIMITER_LOCK = threading.Lock()
+
+
+# Process-wide limiter; GEMINI_RPM_LIMIT and GEMINI_TPM_LIMIT default to 0 (off)
+def get_rate_limiter() -> RateLimiter:
+    global _RATE_LIMITER
+    with _RATE_LIMITER_LOCK:
+        if _RATE_LIMITER is None:
+            _RATE_LIMITER = RateLimiter(
+                rpm=int(os.getenv("GEMINI_RPM_LIMIT") or 0),
+                tpm=int(os.getenv("GEMINI_TPM_LIMIT") or 0),
+                state_file=os.getenv("GEMINI_RATE_LIMIT_STATE_FILE") or None,
+                batch_max_wait_seconds=float(
+                    os.getenv("GEMINI_RATE_LIMIT_BATCH_MAX_WAIT_SECONDS") or DEFAULT_RATE_LIMIT_BATCH_MAX_WAIT_SECONDS
+                ),
+            )
+        return _RATE_LIMITER
@@ -0,0 +1,123 @@
+import binascii
+import hashlib
+import json
+import mmap
+import threading
+import uuid
+from typing import Any, Iterator, List
+
+# Multiple of 3, so every block but the last encodes without padding
+ENCODE_BLOCK_BYTES = 3 * 256 * 1024
+
+
+class InlineData:
+    """
+    Base64 content of one document, encoded once and shared by every request
+    that embeds it: validation retries, transport retries and fallback
+    models all send these same bytes. Place it as the "data" value of an
+    inline_data part; build_json_body streams it without copying.
+    """
+
+    def __init__(self, encoded: bytes | bytearray) -> None:
+        self.encoded = encoded
+        self._sha256: str | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "InlineData":
+        with open(path, "rb") as file:
+            try:
+                # Map the file so the raw bytes never become a second in-memory copy
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return cls.from_bytes(mapped)
+            except ValueError:
+                # Empty files cannot be mapped
+                return cls(b"")
+
+    # Encode block by block into one preallocated buffer; b64encode of the whole input peaks far higher
+    @classmethod
+    def from_bytes(cls, data: bytes | mmap.mmap) -> "InlineData":
+        view = memoryview(data)
+        encoded = bytearray(4 * ((len(view) + 2) // 3))
+        position = 0
+        try:
+            for start in range(0, len(view), ENCODE_BLOCK_BYTES):
+                block = binascii.b2a_base64(view[start : start + ENCODE_BLOCK_BYTES], newline=False)
+                encoded[position : position + len(block)] = block
+                position += len(block)
+        finally:
+            # An exported view would stop the mmap from closing
+            view.release()
+        return cls(encoded)
+
+    # Length of the base64 text, as len() of the equivalent str would be
+    def __len__(self) -> int:
+        return len(self.encoded)
+
+    @property
+    def raw_size(self) -> int:
+        padding = self.encoded[-2:].count(b"=") if self.encoded else 0
+        return len(self.encoded) * 3 // 4 - padding
+
+    # Stand-in for the data in hashes such as response cache keys
+    @property
+    def sha256(self) -> str:
+        with self._lock:
+            if self._sha256 is None:
+                self._sha256 = hashlib.sha256(self.encoded).hexdigest()
+            return self._sha256
+
+    def decode(self) -> str:
+        return bytes(self.encoded).decode("ascii")
+
+
+class JsonBody:
+    """
+    Request body made of JSON envelope pieces and InlineData buffers.
+    Iterating yields the pieces in order, so the document bytes go to the
+    socket as a memoryview instead of being joined into one payload.
+    It can be iterated any number of times; content_length is the total.
+    """
+
+    def __init__(self, chunks: List[bytes | memoryview]) -> None:
+        self.chunks = chunks
+        # Not __len__: list() and friends would take it as a length hint and preallocate
+        self.content_length = sum(len(chunk) if isinstance(chunk, bytes) else chunk.nbytes for chunk in chunks)
+
+    def __iter__(self) -> Iterator[bytes | memoryview]:
+        return iter(self.chunks)
+
+    def tobytes(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+# Serialise a payload that may contain InlineData values into a streamable body
+def build_json_body(payload: Any) -> JsonBody:
+    inline: List[InlineData] = []
+    marker = f"__inline_{uuid.uuid4().hex}_"
+
+    def placeholder(value: Any) -> str:
+        if not isinstance(value, InlineData):
+            raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+        inline.append(value)
+        return f"{marker}{len(inline) - 1}"
+
+    text = json.dumps(payload, default=placeholder)
+    if not inline:
+        return JsonBody([text.encode("utf-8")])
+    chunks: List[bytes | memoryview] = []
+    for index, item in enumerate(inline):
+        # The placeholder was serialised as a JSON string; base64 needs no escaping, so keep the quotes
+        head, text = text.split(f'"{marker}{index}"', 1)
+        chunks.append((head + '"').encode("utf-8"))
+        chunks.append(memoryview(item.encoded).toreadonly())
+        text = '"' + text
+    chunks.append(text.encode("utf-8"))
+    return JsonBody(chunks)
+
+
+# json default for hashing payloads: documents are represented by their digest
+def inline_data_fingerprint(value: Any) -> Any:
+    if isinstance(value, InlineData):
+        return {"inline_sha256": value.sha256}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
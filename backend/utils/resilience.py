@@ -0,0 +1,433 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import math
+import os
+import random
+import threading
+import time
+import urllib.error
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Iterator, TypeVar
+
+from constants.app_defaults import (
+    DEFAULT_LLM_CIRCUIT_FAILURES,
+    DEFAULT_LLM_CIRCUIT_RESET_SECONDS,
+    DEFAULT_LLM_HEDGE_MIN_DELAY_SECONDS,
+    DEFAULT_LLM_HEDGE_MIN_SAMPLES,
+    DEFAULT_LLM_HEDGE_QUANTILE,
+    DEFAULT_LLM_LATENCY_WINDOW,
+    DEFAULT_LLM_RETRY_ATTEMPTS,
+    DEFAULT_LLM_RETRY_BASE_DELAY_SECONDS,
+    DEFAULT_LLM_RETRY_BUDGET,
+    DEFAULT_LLM_RETRY_DEADLINE_SECONDS,
+    DEFAULT_LLM_RETRY_MAX_DELAY_SECONDS,
+)
+from utils.metrics import count
+
+T = TypeVar("T")
+
+# Rate limits, overload and gateway errors; anything else (400, 403, 404) will fail again
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+_CURRENT_BUDGET: contextvars.ContextVar["RetryBudget | None"] = contextvars.ContextVar(
+    "llm_retry_budget", default=None
+)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code in RETRYABLE_STATUS_CODES
+    # Connection failures and timeouts from the transport
+    return isinstance(exc, (urllib.error.URLError, TimeoutError, ConnectionError))
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    headers = getattr(exc, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        # HTTP-date form; fall back to our own backoff
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = DEFAULT_LLM_RETRY_ATTEMPTS
+    base_delay_seconds: float = DEFAULT_LLM_RETRY_BASE_DELAY_SECONDS
+    max_delay_seconds: float = DEFAULT_LLM_RETRY_MAX_DELAY_SECONDS
+
+    # Full jitter: uniform in [0, base * 2^attempt], capped; a server Retry-After wins
+    def delay(self, attempt: int, exc: BaseException | None = None) -> float:
+        retry_after = retry_after_seconds(exc) if exc is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay_seconds)
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** max(attempt, 0)))
+        return random.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """
+    Retries and wall-clock time one logical request may spend on LLM calls.
+    Shared through a contextvar, so a validation retry in the extractor and
+    the transport retries underneath it draw from the same budget.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_LLM_RETRY_BUDGET,
+        deadline_seconds: float = DEFAULT_LLM_RETRY_DEADLINE_SECONDS,
+    ) -> None:
+        self.max_retries = max_retries
+        self.deadline = time.monotonic() + deadline_seconds
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def remaining_seconds(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    # Take one retry if there is one left and the wait still ends before the deadline
+    def try_spend(self, delay_seconds: float = 0.0) -> bool:
+        with self._lock:
+            if self.spent >= self.max_retries or delay_seconds >= self.remaining_seconds():
+                return False
+            self.spent += 1
+            return True
+
+
+def current_retry_budget() -> RetryBudget | None:
+    return _CURRENT_BUDGET.get()
+
+
+@contextmanager
+def retry_budget(
+    max_retries: int | None = None, deadline_seconds: float | None = None
+) -> Iterator[RetryBudget]:
+    # An enclosing budget keeps applying; nested scopes never grant extra retries
+    active = _CURRENT_BUDGET.get()
+    if active is not None:
+        yield active
+        return
+    budget = RetryBudget(
+        max_retries if max_retries is not None else _env_int("LLM_RETRY_BUDGET", DEFAULT_LLM_RETRY_BUDGET),
+        deadline_seconds
+        if deadline_seconds is not None
+        else _env_float("LLM_RETRY_DEADLINE_SECONDS", DEFAULT_LLM_RETRY_DEADLINE_SECONDS),
+    )
+    token = _CURRENT_BUDGET.set(budget)
+    try:
+        yield budget
+    finally:
+        _CURRENT_BUDGET.reset(token)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one model.
+    After failure_threshold retryable failures the circuit opens and calls
+    fail fast; after reset_seconds a single probe is let through, and its
+    outcome closes or re-opens the circuit. A probe that ends without an
+    upstream answer (cancelled, or failed locally) frees the slot for the next.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_LLM_CIRCUIT_FAILURES,
+        reset_seconds: float = DEFAULT_LLM_CIRCUIT_RESET_SECONDS,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    # Raise CircuitOpenError when calls should fail fast; returns True when this call is the half-open probe
+    def before_call(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return False
+            wait = self._opened_at + self.reset_seconds - time.monotonic()
+            if self.state == "open" and wait <= 0:
+                self._transition("half_open")
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+        if wait > 0:
+            detail = f"retry in {math.ceil(wait)}s"
+        else:
+            # Half-open: another caller's probe decides whether the circuit closes
+            detail = "a recovery probe is in progress, retry once it completes"
+        raise CircuitOpenError(f"Gemini model {self.name} is unavailable after repeated failures; {detail}")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self.state != "closed":
+                self._transition("closed")
+
+    # Give the probe slot back without a verdict, so the next caller can probe
+    def release_probe(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self.state != "open":
+                    self._transition("open")
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        count("vesting_buddy_llm_circuit_transitions_total", "Circuit breaker state changes", model=self.name, state=state)
+
+
+class LatencyTracker:
+    def __init__(self, window: int = DEFAULT_LLM_LATENCY_WINDOW) -> None:
+        self._samples: Deque[float] = deque(maxlen=max(window, 1))
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    # None until min_samples calls have been seen, so hedging never starts on a guess
+    def quantile(self, q: float, min_samples: int = DEFAULT_LLM_HEDGE_MIN_SAMPLES) -> float | None:
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ResilientCaller:
+    """
+    Runs LLM calls with jittered exponential backoff on retryable errors,
+    a per-request retry budget, a circuit breaker per model and, when
+    enabled, a hedged second request fired once the first has taken longer
+    than the model's recent p95 latency. Non-retryable errors (404 and other
+    4xx) are raised unchanged so model fallback still sees them.
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        circuit_failures: int = DEFAULT_LLM_CIRCUIT_FAILURES,
+        circuit_reset_seconds: float = DEFAULT_LLM_CIRCUIT_RESET_SECONDS,
+        hedge_enabled: bool = False,
+        hedge_quantile: float = DEFAULT_LLM_HEDGE_QUANTILE,
+        hedge_min_delay_seconds: float = DEFAULT_LLM_HEDGE_MIN_DELAY_SECONDS,
+    ) -> None:
+        self.policy = policy or RetryPolicy()
+        self.circuit_failures = circuit_failures
+        self.circuit_reset_seconds = circuit_reset_seconds
+        self.hedge_enabled = hedge_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(key, self.circuit_failures, self.circuit_reset_seconds)
+                self._breakers[key] = breaker
+            return breaker
+
+    def latency(self, key: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._latencies.get(key)
+            if tracker is None:
+                tracker = LatencyTracker()
+                self._latencies[key] = tracker
+            return tracker
+
+    def hedge_delay(self, key: str) -> float | None:
+        if not self.hedge_enabled or self.breaker(key).state != "closed":
+            return None
+        quantile = self.latency(key).quantile(self.hedge_quantile)
+        return None if quantile is None else max(quantile, self.hedge_min_delay_seconds)
+
+    def call(self, key: str, func: Callable[[], T]) -> T:
+        breaker = self.breaker(key)
+        with retry_budget() as budget:
+            attempt = 0
+            while True:
+                probe = breaker.before_call()
+                started = time.perf_counter()
+                try:
+                    result = self._attempt(key, func, budget)
+                except Exception as exc:
+                    delay = self._on_failure(breaker, exc, attempt, budget, probe)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                except BaseException:
+                    # Cancelled or interrupted: nothing was learned about the model
+                    if probe:
+                        breaker.release_probe()
+                    raise
+                breaker.record_success()
+                self.latency(key).observe(time.perf_counter() - started)
+                return result
+
+    async def call_async(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        breaker = self.breaker(key)
+        with retry_budget() as budget:
+            attempt = 0
+            while True:
+                probe = breaker.before_call()
+                started = time.perf_counter()
+                try:
+                    result = await self._attempt_async(key, func, budget)
+                except Exception as exc:
+                    delay = self._on_failure(breaker, exc, attempt, budget, probe)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                except BaseException:
+                    # Cancelled or interrupted: nothing was learned about the model
+                    if probe:
+                        breaker.release_probe()
+                    raise
+                breaker.record_success()
+                self.latency(key).observe(time.perf_counter() - started)
+                return result
+
+    # Delay before the next attempt, or None when the error should be raised
+    def _on_failure(
+        self, breaker: CircuitBreaker, exc: BaseException, attempt: int, budget: RetryBudget, probe: bool = False
+    ) -> float | None:
+        if not is_retryable(exc):
+            if isinstance(exc, urllib.error.HTTPError):
+                # The model answered; a 404 or 400 says nothing about its health
+                breaker.record_success()
+            elif probe:
+                # Raised locally before any upstream answer, e.g. by the rate limiter
+                breaker.release_probe()
+            return None
+        breaker.record_failure()
+        if breaker.state == "open":
+            # This failure tripped the breaker; report it rather than a bare circuit error
+            count("vesting_buddy_llm_retries_total", "Gemini call retries by outcome", outcome="circuit_open")
+            return None
+        if attempt + 1 >= self.policy.max_attempts:
+            count("vesting_buddy_llm_retries_total", "Gemini call retries by outcome", outcome="exhausted")
+            return None
+        delay = self.policy.delay(attempt, exc)
+        if not budget.try_spend(delay):
+            count("vesting_buddy_llm_retries_total", "Gemini call retries by outcome", outcome="budget_exhausted")
+            return None
+        count("vesting_buddy_llm_retries_total", "Gemini call retries by outcome", outcome="retried")
+        return delay
+
+    def _attempt(self, key: str, func: Callable[[], T], budget: RetryBudget) -> T:
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return func()
+        executor = self._hedge_executor()
+        # Each thread needs its own context copy; metrics stage and budget come along
+        primary = executor.submit(contextvars.copy_context().run, func)
+        done, _ = concurrent.futures.wait([primary], timeout=delay)
+        if done or not budget.try_spend():
+            return primary.result()
+        count_hedge("fired")
+        hedge = executor.submit(contextvars.copy_context().run, func)
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The slower request keeps running in its thread; its result is discarded
+                    count_hedge("won_primary" if future is primary else "won_hedge")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _attempt_async(self, key: str, func: Callable[[], Awaitable[T]], budget: RetryBudget) -> T:
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return await func()
+        primary = asyncio.ensure_future(func())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not budget.try_spend():
+            return await primary
+        count_hedge("fired")
+        hedge = asyncio.ensure_future(func())
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        count_hedge("won_primary" if task is primary else "won_hedge")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+            return self._executor
+
+
+def count_hedge(outcome: str) -> None:
+    count("vesting_buddy_llm_hedges_total", "Hedged Gemini requests by outcome", outcome=outcome)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name) or default)
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name) or default)
+
+
+_RESILIENT_CALLER: ResilientCaller | None = None
+_RESILIENT_CALLER_LOCK = threading.Lock()
+
+
+# Process-wide caller shared by every GeminiClient, so breakers and latency history survive reloads
+def get_resilient_caller() -> ResilientCaller:
+    global _RESILIENT_CALLER
+    with _RESILIENT_CALLER_LOCK:
+        if _RESILIENT_CALLER is None:
+            _RESILIENT_CALLER = ResilientCaller(
+                policy=RetryPolicy(
+                    max_attempts=_env_int("LLM_RETRY_ATTEMPTS", DEFAULT_LLM_RETRY_ATTEMPTS),
+                    base_delay_seconds=_env_float("LLM_RETRY_BASE_DELAY_SECONDS", DEFAULT_LLM_RETRY_BASE_DELAY_SECONDS),
+                    max_delay_seconds=_env_float("LLM_RETRY_MAX_DELAY_SECONDS", DEFAULT_LLM_RETRY_MAX_DELAY_SECONDS),
+                ),
+                circuit_failures=_env_int("LLM_CIRCUIT_FAILURES", DEFAULT_LLM_CIRCUIT_FAILURES),
+                circuit_reset_seconds=_env_float("LLM_CIRCUIT_RESET_SECONDS", DEFAULT_LLM_CIRCUIT_RESET_SECONDS),
+                hedge_enabled=(os.getenv("LLM_HEDGE_ENABLED") or "false").lower() in {"1", "true", "yes"},
+                hedge_quantile=_env_float("LLM_HEDGE_QUANTILE", DEFAULT_LLM_HEDGE_QUANTILE),
+            )
+        return _RESILIENT_CALLER
@@ -0,0 +1,142 @@
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+from constants.app_defaults import (
+    DEFAULT_STARTUP_BUDGET_MS,
+    DEFAULT_STARTUP_MODE,
+    DEFAULT_STARTUP_REPORT_TOP,
+    STARTUP_MODES,
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+# "eager" builds agents and configures opik at startup; "budget" defers both to first use
+def startup_mode() -> str:
+    mode = (os.getenv("STARTUP_MODE") or DEFAULT_STARTUP_MODE).strip().lower()
+    return mode if mode in STARTUP_MODES else DEFAULT_STARTUP_MODE
+
+
+# Comma separated STARTUP_PREWARM targets, e.g. "opik,agents,pdf"
+def prewarm_targets() -> List[str]:
+    raw = os.getenv("STARTUP_PREWARM") or ""
+    return [target.strip().lower() for target in raw.split(",") if target.strip()]
+
+
+def import_modules(*names: str) -> None:
+    for name in names:
+        importlib.import_module(name)
+
+
+def run_prewarm(targets: Sequence[str], warmers: Mapping[str, Callable[[], Any]]) -> Dict[str, float | None]:
+    """
+    Run the named warmers and return how long each took in ms.
+    Unknown targets are ignored; a warmer that fails records None so a
+    missing optional dependency never breaks startup.
+    """
+    timings: Dict[str, float | None] = {}
+    for target in targets:
+        warmer = warmers.get(target)
+        if warmer is None:
+            continue
+        started = time.perf_counter()
+        try:
+            warmer()
+            timings[target] = round((time.perf_counter() - started) * 1000, 2)
+        except Exception:
+            timings[target] = None
+    return timings
+
+
+# Warm in a daemon thread so startup returns before the slow imports finish
+def start_prewarm(
+    targets: Sequence[str], warmers: Mapping[str, Callable[[], Any]], results: Dict[str, float | None]
+) -> threading.Thread | None:
+    if not targets:
+        return None
+    thread = threading.Thread(
+        target=lambda: results.update(run_prewarm(targets, warmers)), name="startup-prewarm", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+# Top-level module and package names that live in the backend directory
+def local_module_names() -> set[str]:
+    names = set()
+    for entry in os.listdir(BACKEND_DIR):
+        path = os.path.join(BACKEND_DIR, entry)
+        if entry.endswith(".py"):
+            names.add(entry[:-3])
+        elif os.path.isdir(path) and not entry.startswith((".", "__")):
+            names.add(entry)
+    return names
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append(
+            {
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            }
+        )
+    return entries
+
+
+def import_time_report(
+    module: str = "api",
+    top: int = DEFAULT_STARTUP_REPORT_TOP,
+    budget_ms: float = DEFAULT_STARTUP_BUDGET_MS,
+    env: Mapping[str, str] | None = None,
+) -> Dict[str, Any]:
+    """
+    Import module in a fresh interpreter under -X importtime.
+    Returns the module's cumulative import time, the wall clock of the
+    whole interpreter run, and the top entries by self time.
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        tail = completed.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"Import of {module} failed: {tail[0]}")
+    entries = parse_importtime(completed.stderr)
+    local = local_module_names()
+    local_ms = sum(entry["self_ms"] for entry in entries if entry["module"].split(".")[0] in local)
+    module_entry = next((entry for entry in reversed(entries) if entry["module"] == module), None)
+    import_ms = module_entry["cumulative_ms"] if module_entry else 0.0
+    return {
+        "module": module,
+        "import_ms": round(import_ms, 2),
+        "interpreter_wall_ms": round(wall_ms, 2),
+        "budget_ms": budget_ms,
+        "within_budget": import_ms <= budget_ms,
+        "modules_imported": len(entries),
+        # Self time spent in this repo's own modules, as opposed to FastAPI, pydantic and friends
+        "local_import_ms": round(local_ms, 2),
+        "slowest": [
+            {**entry, "self_ms": round(entry["self_ms"], 2), "cumulative_ms": round(entry["cumulative_ms"], 2)}
+            for entry in sorted(entries, key=lambda entry: entry["self_ms"], reverse=True)[: max(top, 0)]
+        ],
+    }
@@ -0,0 +1,125 @@
+import functools
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from utils.hashing import canonical_hash
+
+
+@dataclass(frozen=True)
+class TermMatch:
+    term: str
+    start: int
+    end: int
+    text: str
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class TermMatcher:
+    """
+    Case-insensitive Aho-Corasick matcher for large blocklists.
+    Matches must sit on word boundaries wherever the term itself starts or
+    ends with a word character, so "eth" does not fire inside "method".
+    Overlapping hits resolve leftmost-longest; offsets index the original text.
+    """
+
+    def __init__(self, terms: Tuple[str, ...]) -> None:
+        self.terms = tuple(dict.fromkeys(term for term in (t.strip() for t in terms) if term))
+        self.fingerprint = canonical_hash(list(self.terms))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        for index, term in enumerate(self.terms):
+            self._insert(term.lower(), index)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def find_all(self, text: str) -> List[TermMatch]:
+        if not self.terms or not text:
+            return []
+        lowered, offsets = self._lower_with_offsets(text)
+        candidates: List[Tuple[int, int, int]] = []
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._outputs[state]:
+                term_length = len(self.terms[index].lower())
+                start = offsets[position - term_length + 1]
+                # End after the original character holding the last matched one, even mid-expansion
+                end = offsets[position] + 1
+                if self._on_boundaries(text, start, end):
+                    candidates.append((start, end, index))
+        # Leftmost-longest, non-overlapping
+        candidates.sort(key=lambda item: (item[0], item[0] - item[1]))
+        matches: List[TermMatch] = []
+        last_end = -1
+        for start, end, index in candidates:
+            if start >= last_end:
+                matches.append(TermMatch(term=self.terms[index], start=start, end=end, text=text[start:end]))
+                last_end = end
+        return matches
+
+    def search(self, text: str) -> TermMatch | None:
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+    def _insert(self, term: str, index: int) -> None:
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = link if link != next_state else 0
+                # Inherit shorter terms that end here so the scan never walks the failure chain
+                self._outputs[next_state].extend(self._outputs[self._fail[next_state]])
+
+    def _on_boundaries(self, text: str, start: int, end: int) -> bool:
+        if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(text[end - 1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    @staticmethod
+    def _lower_with_offsets(text: str) -> Tuple[str, List[int]]:
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered, list(range(len(text)))
+        # Some characters lower-case to several ("İ" -> "i̇"); map every lowered index back
+        parts: List[str] = []
+        offsets: List[int] = []
+        for position, char in enumerate(text):
+            piece = char.lower()
+            parts.append(piece)
+            offsets.extend([position] * len(piece))
+        return "".join(parts), offsets
+
+
+# One compiled matcher per distinct blocklist, shared across requests
+@functools.lru_cache(maxsize=16)
+def get_term_matcher(terms: Tuple[str, ...]) -> TermMatcher:
+    return TermMatcher(terms)
@@ -0,0 +1,272 @@
+import atexit
+import fnmatch
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+from constants.app_defaults import (
+    DEFAULT_TRACE_BATCH_SPANS,
+    DEFAULT_TRACE_BUFFER_SPANS,
+    DEFAULT_TRACE_FLUSH_SECONDS,
+    DEFAULT_TRACE_MAX_FIELD_CHARS,
+    DEFAULT_TRACE_SAMPLE_RATE,
+)
+from utils.metrics import get_metrics_registry
+
+_TRUNCATED_SUFFIX = "…[truncated {} chars]"
+_MAX_PAYLOAD_DEPTH = 6
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    payload: Dict[str, Any]
+    start_time: datetime
+    context: Dict[str, Any] = field(default_factory=dict)
+    queued_at: float = 0.0
+
+
+def count_spans(outcome: str, amount: int = 1) -> None:
+    get_metrics_registry().counter(
+        "vesting_buddy_trace_spans_total", "Trace spans by export outcome", ("outcome",)
+    ).inc(amount, outcome=outcome)
+
+
+# Bound every string in a payload; a full prompt becomes a prefix plus its original length
+def truncate_payload(value: Any, max_chars: int, depth: int = 0) -> Any:
+    if isinstance(value, str):
+        if max_chars > 0 and len(value) > max_chars:
+            return value[:max_chars] + _TRUNCATED_SUFFIX.format(len(value) - max_chars)
+        return value
+    if depth >= _MAX_PAYLOAD_DEPTH:
+        return repr(value)[:max_chars] if max_chars > 0 else repr(value)
+    if isinstance(value, dict):
+        return {key: truncate_payload(item, max_chars, depth + 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate_payload(item, max_chars, depth + 1) for item in value]
+    return value
+
+
+# "step=rate" pairs; step names may use glob patterns such as "*_preview=0.1"
+def parse_sample_rates(raw: str) -> Tuple[Tuple[str, float], ...]:
+    rates = []
+    for item in raw.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates.append((name.strip(), min(max(float(rate), 0.0), 1.0)))
+    return tuple(rates)
+
+
+class TraceExporter:
+    """
+    Ring buffer of spans shipped in batches by a background thread.
+    record() never blocks: unsampled spans are skipped, payloads are
+    truncated before queueing, and when the buffer is full the oldest
+    span is overwritten and counted as dropped.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[SpanRecord]], None],
+        capacity: int = DEFAULT_TRACE_BUFFER_SPANS,
+        batch_size: int = DEFAULT_TRACE_BATCH_SPANS,
+        flush_seconds: float = DEFAULT_TRACE_FLUSH_SECONDS,
+        max_field_chars: int = DEFAULT_TRACE_MAX_FIELD_CHARS,
+        sample_rate: float = DEFAULT_TRACE_SAMPLE_RATE,
+        step_sample_rates: Tuple[Tuple[str, float], ...] = (),
+        capture_context: Callable[[], Dict[str, Any]] | None = None,
+    ) -> None:
+        self.sink = sink
+        self.batch_size = max(batch_size, 1)
+        self.flush_seconds = flush_seconds
+        self.max_field_chars = max_field_chars
+        self.sample_rate = sample_rate
+        self.step_sample_rates = step_sample_rates
+        self.capture_context = capture_context
+        self._buffer: Deque[SpanRecord] = deque(maxlen=max(capacity, 1))
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def sample_rate_for(self, name: str) -> float:
+        for pattern, rate in self.step_sample_rates:
+            if fnmatch.fnmatchcase(name, pattern):
+                return rate
+        return self.sample_rate
+
+    def record(self, name: str, payload: Dict[str, Any]) -> bool:
+        rate = self.sample_rate_for(name)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            count_spans("sampled_out")
+            return False
+        span = SpanRecord(
+            name=name,
+            payload=truncate_payload(payload, self.max_field_chars),
+            start_time=datetime.now(timezone.utc),
+            context=self.capture_context() if self.capture_context else {},
+            queued_at=time.monotonic(),
+        )
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._buffer) == self._buffer.maxlen:
+                count_spans("dropped")
+            self._buffer.append(span)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+        count_spans("queued")
+        return True
+
+    # Wait until everything queued so far has been handed to the sink
+    def flush(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            try:
+                while self._buffer or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining if remaining is not None else self.flush_seconds)
+            finally:
+                self._flush_requested = False
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._condition:
+            if self._closed:
+                return
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        sink_flush = getattr(self.sink, "flush", None)
+        if sink_flush is not None:
+            try:
+                sink_flush()
+            except Exception:
+                pass
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._buffer)
+
+    # Block until a full batch, the oldest span is flush_seconds old, or a flush is requested
+    def _take_batch(self) -> List[SpanRecord] | None:
+        with self._condition:
+            while True:
+                if not self._buffer:
+                    if self._closed:
+                        return None
+                    self._condition.wait(self.flush_seconds)
+                    continue
+                age = time.monotonic() - self._buffer[0].queued_at
+                if (
+                    len(self._buffer) >= self.batch_size
+                    or self._flush_requested
+                    or self._closed
+                    or age >= self.flush_seconds
+                ):
+                    break
+                self._condition.wait(self.flush_seconds - age)
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                self.sink(batch)
+                count_spans("exported", len(batch))
+            except Exception:
+                # Tracing must never take the service down; the batch is lost
+                count_spans("failed", len(batch))
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+
+
+class OpikSpanSink:
+    """
+    Ships spans with the Opik client, attached to the trace and span that
+    were active when they were recorded, so batching keeps the tree intact.
+    """
+
+    def __init__(self) -> None:
+        self._client = None
+
+    # Runs on the request thread: only reads ids from opik's context
+    def capture_context(self) -> Dict[str, Any]:
+        try:
+            from opik import opik_context
+
+            span = opik_context.get_current_span_data()
+            trace = opik_context.get_current_trace_data()
+        except Exception:
+            return {}
+        context: Dict[str, Any] = {}
+        if trace is not None:
+            context["trace_id"] = trace.id
+        if span is not None:
+            context["parent_span_id"] = span.id
+            context["trace_id"] = span.trace_id
+        return context
+
+    def __call__(self, batch: List[SpanRecord]) -> None:
+        if self._client is None:
+            import opik
+
+            self._client = opik.Opik()
+        for span in batch:
+            if not span.context.get("trace_id"):
+                # Recorded outside any tracked call: keep it as its own trace, like @track would
+                self._client.trace(name=span.name, input=span.payload, start_time=span.start_time)
+                continue
+            self._client.span(
+                trace_id=span.context["trace_id"],
+                parent_span_id=span.context.get("parent_span_id"),
+                name=span.name,
+                input=span.payload,
+                start_time=span.start_time,
+                end_time=span.start_time,
+            )
+
+    def flush(self) -> None:
+        if self._client is not None:
+            self._client.flush()
+
+
+_TRACE_EXPORTER: TraceExporter | None = None
+_TRACE_EXPORTER_LOCK = threading.Lock()
+
+
+# Process-wide exporter shipping to Opik, configured by TRACE_* env vars
+def get_trace_exporter() -> TraceExporter:
+    global _TRACE_EXPORTER
+    with _TRACE_EXPORTER_LOCK:
+        if _TRACE_EXPORTER is None:
+            sink = OpikSpanSink()
+            _TRACE_EXPORTER = TraceExporter(
+                sink,
+                capacity=int(os.getenv("TRACE_BUFFER_SPANS") or DEFAULT_TRACE_BUFFER_SPANS),
+                batch_size=int(os.getenv("TRACE_BATCH_SPANS") or DEFAULT_TRACE_BATCH_SPANS),
+                flush_seconds=float(os.getenv("TRACE_FLUSH_SECONDS") or DEFAULT_TRACE_FLUSH_SECONDS),
+                max_field_chars=int(os.getenv("TRACE_MAX_FIELD_CHARS") or DEFAULT_TRACE_MAX_FIELD_CHARS),
+                sample_rate=float(os.getenv("TRACE_SAMPLE_RATE") or DEFAULT_TRACE_SAMPLE_RATE),
+                step_sample_rates=parse_sample_rates(os.getenv("TRACE_SAMPLE_RATES") or ""),
+                capture_context=sink.capture_context,
+            )
+        return _TRACE_EXPORTER
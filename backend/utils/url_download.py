@@ -1,18 +1,38 @@
+import hashlib
 import os
 import tempfile
 import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Sequence
 from urllib.parse import urlparse
 
+from constants.app_defaults import (
+    DEFAULT_DOWNLOAD_CHUNK_BYTES,
+    DEFAULT_DOWNLOAD_MAX_BYTES,
+    DEFAULT_DOWNLOAD_MAX_WORKERS,
+)
 
-def download_url_to_temp(
+
+@dataclass(frozen=True)
+class DownloadedFile:
+    path: str
+    size_bytes: int
+    sha256: str | None
+
+
+def download_url(
     url: str,
-    max_size_bytes: int = 20 * 1024 * 1024,
+    max_size_bytes: int = DEFAULT_DOWNLOAD_MAX_BYTES,
     timeout_seconds: int = 60,
     allowed_schemes: tuple[str, ...] = ("https", "http"),
-) -> str:
+    compute_hash: bool = True,
+    chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_BYTES,
+) -> DownloadedFile:
     """
-    Download a URL to a temporary file and return its path.
+    Stream a URL into a temporary file, hashing it on the way when requested.
+    At most one chunk is held in memory; the partial file is removed on failure.
     Caller is responsible for deleting the file when done.
     """
     parsed = urlparse(url)
@@ -26,29 +46,90 @@ def download_url_to_temp(
         suffix = ".bin"
 
     req = urllib.request.Request(url, headers={"User-Agent": "VestingBuddy-Backend/1.0"})
+    digest = hashlib.sha256() if compute_hash else None
+    total = 0
+    path = None
     try:
         with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
             if resp.length is not None and resp.length > max_size_bytes:
                 raise RuntimeError(f"Content length {resp.length} exceeds max {max_size_bytes}")
-            total = 0
-            chunks = []
-            while True:
-                chunk = resp.read(64 * 1024)
-                if not chunk:
-                    break
-                total += len(chunk)
-                if total > max_size_bytes:
-                    raise RuntimeError(f"Download size exceeds max {max_size_bytes} bytes")
-                chunks.append(chunk)
-    except urllib.error.HTTPError as e:
-        raise RuntimeError(f"Download failed: HTTP {e.code} {e.reason}") from e
-    except urllib.error.URLError as e:
-        raise RuntimeError(f"Download failed: {e.reason}") from e
-
-    data = b"".join(chunks)
-    fd, path = tempfile.mkstemp(suffix=suffix)
-    try:
-        os.write(fd, data)
-    finally:
-        os.close(fd)
-    return path
+            fd, path = tempfile.mkstemp(suffix=suffix)
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = resp.read(chunk_size)
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                    if total > max_size_bytes:
+                        raise RuntimeError(f"Download size exceeds max {max_size_bytes} bytes")
+                    out.write(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+    except BaseException as exc:
+        remove_temp_file(path)
+        if isinstance(exc, urllib.error.HTTPError):
+            raise RuntimeError(f"Download failed: HTTP {exc.code} {exc.reason}") from exc
+        if isinstance(exc, urllib.error.URLError):
+            raise RuntimeError(f"Download failed: {exc.reason}") from exc
+        raise
+    return DownloadedFile(path=path, size_bytes=total, sha256=digest.hexdigest() if digest else None)
+
+
+def download_url_to_temp(
+    url: str,
+    max_size_bytes: int = DEFAULT_DOWNLOAD_MAX_BYTES,
+    timeout_seconds: int = 60,
+    allowed_schemes: tuple[str, ...] = ("https", "http"),
+) -> str:
+    """
+    Download a URL to a temporary file and return its path.
+    Caller is responsible for deleting the file when done.
+    """
+    return download_url(
+        url,
+        max_size_bytes=max_size_bytes,
+        timeout_seconds=timeout_seconds,
+        allowed_schemes=allowed_schemes,
+        compute_hash=False,
+    ).path
+
+
+def download_urls(
+    urls: Sequence[str | None],
+    max_workers: int = DEFAULT_DOWNLOAD_MAX_WORKERS,
+    **kwargs,
+) -> List[DownloadedFile | None]:
+    """
+    Download several URLs concurrently, preserving order; None entries are skipped.
+    If any download fails the others are removed and the first error is raised.
+    """
+    targets = [url for url in urls if url]
+    if not targets:
+        return [None for _ in urls]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as executor:
+        futures = [executor.submit(download_url, url, **kwargs) if url else None for url in urls]
+        outcomes = []
+        error = None
+        for future in futures:
+            if future is None:
+                outcomes.append(None)
+                continue
+            try:
+                outcomes.append(future.result())
+            except Exception as exc:
+                outcomes.append(None)
+                error = error or exc
+    if error is not None:
+        for downloaded in outcomes:
+            if downloaded is not None:
+                remove_temp_file(downloaded.path)
+        raise error
+    return outcomes
+
+
+def remove_temp_file(path: str | None) -> None:
+    if path and os.path.isfile(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass